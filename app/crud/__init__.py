@@ -1,4 +1,4 @@
-from .chart import get_chart_data
-from .news import get_recent_news
-from .prediction import run_prediction
-from .explanation import generate_explanation
+from .chart import get_chart_data, get_chart_data_async
+from .news import get_recent_news, get_recent_news_async
+from .prediction import run_prediction, run_prediction_async, run_prediction_batch, run_prediction_batch_async
+from .explanation import generate_explanation, generate_explanation_async
@@ -0,0 +1,88 @@
+# app/crud/aggregate.py
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db.models.chart_data import ChartData
+from db.upsert import bulk_upsert
+
+from app.crud.bars import bars_to_records, resample_bars
+
+# 일봉에서 파생되는 interval (주봉 W-MON, 월봉 MS)
+AGG_INTERVALS = (7, 30)
+
+def period_start(d: date, interval: int) -> date:
+    """d 가 속한 주(월요일) / 월(1일)의 시작일"""
+    if interval == 7:
+        return d - timedelta(days=d.weekday())
+    if interval == 30:
+        return d.replace(day=1)
+    return d
+
+def next_period_start(d: date, interval: int) -> date:
+    """d 가 속한 기간 다음 기간의 시작일"""
+    if interval == 7:
+        return period_start(d, 7) + timedelta(days=7)
+    if interval == 30:
+        return (d.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return d + timedelta(days=1)
+
+def covered_from(history_start: date, interval: int) -> date:
+    """일봉이 history_start 부터 있을 때 온전히 집계되는 첫 기간의 시작일"""
+    start = period_start(history_start, interval)
+    return start if start >= history_start else next_period_start(history_start, interval)
+
+def rebuild_aggregates(db: Session,
+                       ticker_id: int,
+                       since: Optional[date] = None,
+                       intervals: Iterable[int] = AGG_INTERVALS,
+                       complete_only: bool = False) -> int:
+    """
+    저장된 일봉(interval=1)으로 주봉/월봉을 집계해 upsert. 커밋은 호출자가 함
+    - since: 새로 들어온 일봉 중 가장 이른 날짜. 그 날짜가 속한 기간부터만 다시 계산
+      (change 기준이 되는 직전 기간 일봉까지만 추가로 읽음). None 이면 전체 재집계
+    - 일봉 이력이 기간 경계에서 시작해야 첫 기간 bar 가 온전함 (chart.backfill_start 참고)
+    - complete_only: 첫 일봉보다 먼저 시작하는 기간(이력 앞부분이 잘린 기간)은 집계하지 않음
+      최근 일봉만 보관하던 DB 를 재집계할 때 upstream 에서 받은 온전한 주봉/월봉을
+      일부 일봉의 집계로 덮어쓰지 않도록. 상장 직후 종목처럼 이력이 실제로 거기서 시작하면 첫 기간이 빠짐
+    반환: upsert 한 행 수
+    """
+    history_start = None
+    if complete_only:
+        history_start = db.execute(
+            select(func.min(ChartData.date)).where(ChartData.ticker_id == ticker_id, ChartData.interval == 1)
+        ).scalar()
+
+    total = 0
+    for interval in intervals:
+        first = period_start(since, interval) if since else None
+        if history_start:
+            complete = covered_from(history_start, interval)
+            first = max(first, complete) if first else complete
+        query = select(
+            ChartData.date, ChartData.open, ChartData.high,
+            ChartData.low, ChartData.close, ChartData.volume,
+        ).where(ChartData.ticker_id == ticker_id, ChartData.interval == 1)
+        if first:
+            query = query.where(ChartData.date >= period_start(first - timedelta(days=1), interval))
+        daily = db.execute(query.order_by(ChartData.date)).all()
+        if not daily:
+            continue
+
+        df = pd.DataFrame(
+            daily, columns=["Date", "Open", "High", "Low", "Close", "Volume"]
+        ).set_index("Date")
+        df.index = pd.to_datetime(df.index)
+
+        rows = bars_to_records(resample_bars(df, interval), first or date.min)
+        total += bulk_upsert(
+            db,
+            ChartData,
+            [{"ticker_id": ticker_id, "interval": interval, **r} for r in rows],
+        )
+    return total
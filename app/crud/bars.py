@@ -0,0 +1,74 @@
+# app/crud/bars.py
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# interval -> pandas resample rule (주봉은 월요일, 월봉은 1일 기준 label)
+RESAMPLE_RULES = {7: "W-MON", 30: "MS"}
+
+OHLCV_AGG = {
+    "Open":   "first",
+    "High":   "max",
+    "Low":    "min",
+    "Close":  "last",
+    "Volume": "sum",
+}
+
+def resample_bars(df: pd.DataFrame, interval: int) -> pd.DataFrame:
+    """일봉 frame 을 주봉(W-MON)/월봉(MS)으로 집계. interval=1 이면 그대로 반환"""
+    if interval == 1 or df.empty:
+        return df
+    return (
+        df.resample(RESAMPLE_RULES[interval], label="left", closed="left")
+        .agg(OHLCV_AGG)
+        .dropna()
+    )
+
+def bars_to_columns(df: pd.DataFrame, start: date) -> Dict[str, np.ndarray]:
+    """
+    OHLCV frame → start 이후 bar 의 컬럼별 배열
+    - 가격은 소수 둘째 자리로 반올림 후 float64, volume 은 int64
+    - change = 직전 bar 종가 대비 변화율(pct_change) 소수 넷째 자리.
+      start 이전 bar 는 첫 change 의 기준으로만 쓰이고, 직전 종가가 없거나 0 이면 0
+    """
+    if df is None or df.empty:
+        return {k: np.array([]) for k in ("date", "open", "high", "low", "close", "volume", "change")}
+
+    df = df.dropna(subset=["Close"])
+    prices = df[["Open", "High", "Low", "Close"]].to_numpy(dtype="float64").round(2)
+    close = prices[:, 3]
+
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.round((close - prev_close) / prev_close, 4)
+    change[~np.isfinite(change)] = 0.0
+
+    volume = (
+        df["Volume"].fillna(0).to_numpy(dtype="int64")
+        if "Volume" in df else np.zeros(len(df), dtype="int64")
+    )
+
+    dates = df.index.date
+    keep = dates >= start
+    return {
+        "date":   dates[keep],
+        "open":   prices[keep, 0],
+        "high":   prices[keep, 1],
+        "low":    prices[keep, 2],
+        "close":  close[keep],
+        "volume": volume[keep],
+        "change": change[keep],
+    }
+
+def bars_to_records(df: pd.DataFrame, start: date) -> List[Dict]:
+    """bars_to_columns 결과를 ChartData 저장용 dict 목록으로 (numpy scalar 가 아닌 python 타입)"""
+    cols = bars_to_columns(df, start)
+    keys = list(cols)
+    values = [cols["date"].tolist()] + [cols[k].tolist() for k in keys[1:]]
+    return [dict(zip(keys, row)) for row in zip(*values)]
@@ -0,0 +1,188 @@
+# app/crud/cache.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Protocol
+
+try:
+    import redis
+except ImportError:  # 공유 캐시는 선택 사항
+    redis = None
+
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "1024"))
+# 예: redis://localhost:6379/0  (비어 있으면 in-process LRU 만 사용)
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "")
+
+class LRUCache:
+    """만료 시각(epoch sec)을 가진 thread-safe in-process LRU"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SharedBackend(Protocol):
+    """worker 간 공유 캐시 (문자열 값 + TTL)"""
+
+    def get(self, key: str) -> Optional[str]: ...
+    def set(self, key: str, value: str, ttl: int) -> None: ...
+    def delete(self, key: str) -> None: ...
+
+class DictBackend:
+    """테스트·로컬 개발용 공유 backend 대역 (같은 프로세스 안에서만 공유)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, tuple[float, str]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= time.time():
+                self._data.pop(key, None)
+                return None
+            return item[1]
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+class RedisBackend:
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND_URL is set but the redis package is not installed")
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+class ResponseCache:
+    """
+    2단계 read-through 캐시: in-process LRU(L1) → 공유 backend(L2)
+    - 값은 JSON 직렬화 가능한 응답 데이터 (ORM 객체 X)
+    - 만료 시각은 호출자가 지정 (예: 다음 장 마감)
+    - 반환값은 여러 요청이 공유하므로 읽기 전용으로 취급
+    """
+
+    def __init__(self, namespace: str, maxsize: int, backend: SharedBackend | None = None) -> None:
+        self.namespace = namespace
+        self.local = LRUCache(maxsize)
+        self.backend = backend
+        self._stats_lock = threading.Lock()
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+    def _shared_key(self, key: Hashable) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        return ":".join([self.namespace, *map(str, parts)])
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self.local.get(key)
+        if value is not None:
+            self._count("l1_hits")
+            return value
+
+        if self.backend is not None:
+            raw = self.backend.get(self._shared_key(key))
+            if raw is not None:
+                entry = json.loads(raw)
+                self.local.set(key, entry["value"], entry["expires_at"])
+                self._count("l2_hits")
+                return entry["value"]
+
+        self._count("misses")
+        return None
+
+    def peek(self, key: Hashable) -> Any | None:
+        """get 과 같은 값을 반환하되 hit/miss 통계를 세지 않고 L1 을 채우지 않음 (ETag 계산 등 부가 조회용)"""
+        value = self.local.get(key)
+        if value is None and self.backend is not None:
+            raw = self.backend.get(self._shared_key(key))
+            if raw is not None:
+                value = json.loads(raw)["value"]
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: float) -> None:
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            return
+        self.local.set(key, value, expires_at)
+        if self.backend is not None:
+            self.backend.set(
+                self._shared_key(key),
+                json.dumps({"expires_at": expires_at, "value": value}),
+                ttl,
+            )
+
+    def invalidate(self, key: Hashable) -> None:
+        self.local.delete(key)
+        if self.backend is not None:
+            self.backend.delete(self._shared_key(key))
+
+    def clear(self) -> None:
+        """in-process 캐시와 통계만 초기화 (공유 backend 는 TTL 에 맡김)"""
+        self.local.clear()
+        with self._stats_lock:
+            for k in self._stats:
+                self._stats[k] = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["size"] = len(self.local)
+        return stats
+
+def _backend_from_env() -> SharedBackend | None:
+    return RedisBackend(CACHE_BACKEND_URL) if CACHE_BACKEND_URL else None
+
+# (ticker_code, interval) -> get_chart_data 결과
+chart_cache = ResponseCache("chart", CHART_CACHE_SIZE, _backend_from_env())
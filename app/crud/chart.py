@@ -1,19 +1,39 @@
 # app/crud/chart.py
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Dict
 
 import yfinance as yf
 import FinanceDataReader as fdr
 from sqlalchemy import select, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from db.session import SessionLocal
 from db.models.chart_data import ChartData
-from db.models.ticker import Ticker
+from db.models.ingest_watermark import IngestWatermark
+from db.upsert import bulk_upsert
 
-from app.crud.utils import get_session
+from app.crud.utils import get_async_session, get_session
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.crud.cache import chart_cache
+from app.crud.market_calendar import INGEST_DELAY, last_session_close, next_session_close
+from app.crud.providers import get_provider
+from app.crud.bars import bars_to_records, resample_bars
+from app.crud.aggregate import AGG_INTERVALS, rebuild_aggregates
+from app.crud.stream import update_hub
+from app.metrics import metrics
+
+# INGEST_SCHEDULER 가 켜져 있으면("inprocess"/"external") 수집은 scheduler 가 맡고
+# 요청 경로는 DB 만 읽음
+CHART_FETCH_ON_REQUEST = os.getenv("INGEST_SCHEDULER", "off") == "off"
+# scheduler 모드에서 직전 장 마감분 수집이 아직 끝나지 않은 종목의 응답 캐시 보관 시간 (초)
+CHART_PENDING_TTL_SEC = int(os.getenv("CHART_PENDING_TTL_SEC", "60"))
+# 일봉 최초 수집 기간 (월봉 30개 분량)
+DAILY_BACKFILL_DAYS = 30 * 31
 
 def get_chart_data(ticker_code: str,
                    interval: int = 1,
@@ -21,70 +41,184 @@ def get_chart_data(ticker_code: str,
     """
     ticker_code에 대해 캐시된 최신 차트 행을 반환
 
-    DB에 캐시된 최신 날짜 이후 행이 누락된 경우, 해당 데이터 소스
-    (미국의 경우 yfinance, 코스피의 경우 FDR)에서 해당 간격만 가져온 후 유지 
+    DB에 캐시된 최신 날짜 이후 일봉이 누락된 경우, 해당 데이터 소스
+    (미국의 경우 yfinance, 코스피의 경우 FDR)에서 일봉만 가져온 후 유지하고
+    주봉/월봉은 저장된 일봉에서 다시 집계 
+    (scheduler 사용 시에는 upstream 호출 없이 DB 만 조회)
+
+    결과는 (ticker_code, interval) 키로 응답 캐시에 보관 (만료 시각은 _cache_expiry)
     """
+    cache_key = (ticker_code, interval)
+    cached = chart_cache.get(cache_key)
+    metrics.count_cache("get_chart_data", cached is not None)
+    if cached is not None:
+        return cached
 
     with get_session(session) as db:
-        ticker: Ticker | None = (
-            db.execute(select(Ticker).where(Ticker.ticker_code == ticker_code))
-            .scalar_one_or_none()
-        )
+        with metrics.stage("get_chart_data", "ticker_lookup"):
+            ticker: TickerInfo | None = ticker_registry.get(db, ticker_code)
+        if ticker is None:
+            return []
+
+        if CHART_FETCH_ON_REQUEST:
+            refresh_daily_bars(db, ticker)
+
+        with metrics.stage("get_chart_data", "cache_query"):
+            # watermark 를 bar 보다 먼저 읽어야 수집 완료로 본 캐시에 수집 전 bar 가 들어가지 않음
+            checked_at = None if CHART_FETCH_ON_REQUEST else ingest_checked_at(db, ticker.id)
+            result = recent_chart_rows(db, ticker.id, interval)
+        chart_cache.set(cache_key, result, _cache_expiry(ticker.market, checked_at))
+        return result
+
+async def get_chart_data_async(ticker_code: str,
+                               interval: int = 1,
+                               session: AsyncSession | None = None,
+                               sync_session: Session | None = None) -> List[Dict]:
+    """
+    get_chart_data 의 async 버전 (API 요청 경로)
+    - 캐시/DB 조회는 AsyncSession(session) 으로 이벤트 루프를 막지 않고 실행. session 은 조회에만 사용
+    - upstream 에서 새 일봉을 받아야 하면 sync get_chart_data 를 스레드에서 실행
+      저장은 sync_session 으로 (없으면 스레드에서 SessionLocal 로 새로 엶). 호출이 끝날 때까지 다른 곳에서 쓰지 않아야 함
+    """
+    cache_key = (ticker_code, interval)
+    cached = chart_cache.get(cache_key)
+    if cached is not None:
+        metrics.count_cache("get_chart_data", True)
+        return cached
+
+    async with get_async_session(session) as db:
+        with metrics.stage("get_chart_data", "ticker_lookup"):
+            ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
         if ticker is None:
+            metrics.count_cache("get_chart_data", False)
             return []
 
-        # latest cached date for this interval
-        latest: datetime.date | None = (
-            db.execute(
-                select(func.max(ChartData.date)).where(
-                    and_(ChartData.ticker_id == ticker.id, ChartData.interval == interval)
-                )
-            ).scalar_one()
+        if CHART_FETCH_ON_REQUEST:
+            today = datetime.now(timezone.utc).date()
+            with metrics.stage("get_chart_data", "cache_query"):
+                latest = await db.run_sync(latest_chart_date, ticker.id, 1)
+            if next_fetch_date(latest, 1, today) <= today:
+                # miss 는 sync 경로가 응답 캐시를 다시 확인하면서 셈
+                return await asyncio.to_thread(get_chart_data, ticker_code, interval, session=sync_session)
+
+        metrics.count_cache("get_chart_data", False)
+        with metrics.stage("get_chart_data", "cache_query"):
+            checked_at = None if CHART_FETCH_ON_REQUEST else await db.run_sync(ingest_checked_at, ticker.id)
+            result = await db.run_sync(recent_chart_rows, ticker.id, interval)
+        chart_cache.set(cache_key, result, _cache_expiry(ticker.market, checked_at))
+        return result
+
+def recent_chart_rows(db: Session, ticker_id: int, interval: int, limit: int = 30) -> List[Dict]:
+    """최근 limit 개 bar (날짜 오름차순)"""
+    rows = (
+        db.execute(
+            select(ChartData)
+            .where(and_(ChartData.ticker_id == ticker_id, ChartData.interval == interval))
+            .order_by(ChartData.date.desc())
+            .limit(limit)
         )
+        .scalars()
+        .all()
+    )
+    return [_row_to_dict(r) for r in reversed(rows)]
 
-        today = datetime.now(timezone.utc).date()
-        expected_next_date = (
-            latest + timedelta(days=interval) if latest else today - timedelta(days=interval * 30)
+def ingest_checked_at(db: Session, ticker_id: int) -> datetime | None:
+    """scheduler 가 이 종목 일봉 수집을 마지막으로 끝낸 실행의 시각 (UTC, naive). 수집 기록이 없으면 None"""
+    return db.execute(
+        select(IngestWatermark.checked_at).where(
+            IngestWatermark.ticker_id == ticker_id, IngestWatermark.interval == 1
         )
+    ).scalar_one_or_none()
+
+def _cache_expiry(market: str, checked_at: datetime | None = None, now: datetime | None = None) -> float:
+    """
+    응답 캐시 만료 시각 (epoch sec)
+    - 요청 경로에서 수집: 다음 장 마감
+    - scheduler 모드: 직전 장 마감(+INGEST_DELAY) 분 수집이 이 종목까지 끝났으면(checked_at) 다음 수집 시작 시각,
+      아직이면 CHART_PENDING_TTL_SEC 뒤
+      수집은 마감 + INGEST_DELAY 에 시작해 (KOSPI 는 한 종목씩) 몇 분 걸리고, 별도 프로세스의 scheduler 가 하는
+      invalidate 는 공유 backend 없이는 API 프로세스 캐시에 닿지 않으므로 수집 전 bar 를 다음 마감까지 들고 있지 않게 함
+    """
+    now = now or datetime.now(timezone.utc)
+    if CHART_FETCH_ON_REQUEST:
+        return next_session_close(market, now).timestamp()
+    covered_since = last_session_close(market, now, after=INGEST_DELAY).replace(tzinfo=None)
+    if checked_at is not None and checked_at >= covered_since:
+        return next_session_close(market, now, after=INGEST_DELAY).timestamp()
+    return now.timestamp() + CHART_PENDING_TTL_SEC
 
-        if expected_next_date <= today:
-            # fetch missing range
-            fetched_rows = (
-                _fetch_kospi(ticker_code, expected_next_date, today, interval)
-                if ticker.market.upper() == "KOSPI"
-                else _fetch_us(ticker_code, expected_next_date, today, interval)
-            )
-
-            # bulk insert
-            for row in fetched_rows:
-                db.add(
-                    ChartData(
-                        ticker_id=ticker.id,
-                        date=row["date"],
-                        interval=interval,
-                        open=row["open"],
-                        high=row["high"],
-                        low=row["low"],
-                        close=row["close"],
-                        volume=row["volume"],
-                        change=row["change"],
-                    )
-                )
-            db.commit()
-
-        # return last 30 records
-        rows = (
-            db.execute(
-                select(ChartData)
-                .where(and_(ChartData.ticker_id == ticker.id, ChartData.interval == interval))
-                .order_by(ChartData.date.desc())
-                .limit(30)
-            )
-            .scalars()
-            .all()
+def latest_chart_date(db: Session, ticker_id: int, interval: int) -> date | None:
+    """interval 별로 DB 에 저장된 마지막 bar 날짜"""
+    return db.execute(
+        select(func.max(ChartData.date)).where(
+            and_(ChartData.ticker_id == ticker_id, ChartData.interval == interval)
         )
-        rows = list(reversed(rows))
-        return [_row_to_dict(r) for r in rows]
+    ).scalar_one()
+
+def backfill_start(today: date) -> date:
+    """
+    일봉 최초 수집 시작일: 월봉 30개를 만들 수 있도록 약 31개월 전,
+    첫 주봉/월봉이 온전하도록 그 달 1일이 속한 주의 월요일로 맞춤
+    """
+    first = (today - timedelta(days=DAILY_BACKFILL_DAYS)).replace(day=1)
+    return first - timedelta(days=first.weekday())
+
+def next_fetch_date(latest: date | None, interval: int, today: date) -> date:
+    """
+    다음에 받아야 할 구간의 시작일
+    저장된 데이터가 없으면 일봉은 backfill_start, 그 외는 interval*30 일 전부터
+    """
+    if latest:
+        return latest + timedelta(days=interval)
+    if interval == 1:
+        return backfill_start(today)
+    return today - timedelta(days=interval * 30)
+
+def refresh_daily_bars(db: Session, ticker: TickerInfo) -> int:
+    """
+    upstream 에서 새 일봉만 받아 저장하고, 새 일봉이 속한 기간부터 주봉/월봉을 다시 집계 (커밋 포함)
+    반환: 저장한 일봉 수
+    """
+    today = datetime.now(timezone.utc).date()
+    with metrics.stage("refresh_daily_bars", "cache_query"):
+        start = next_fetch_date(latest_chart_date(db, ticker.id, 1), 1, today)
+    if start > today:
+        return 0
+
+    with metrics.stage("refresh_daily_bars", "upstream_fetch"):
+        fetched_rows = fetch_bars(ticker.market, ticker.ticker_code, start, today, 1)
+    if not fetched_rows:
+        return 0
+    with metrics.stage("refresh_daily_bars", "insert"):
+        store_chart_rows(db, ticker.id, 1, fetched_rows)
+        rebuild_aggregates(db, ticker.id, since=min(r["date"] for r in fetched_rows))
+        db.commit()
+
+    for interval in (1, *AGG_INTERVALS):
+        chart_cache.invalidate((ticker.ticker_code, interval))
+    update_hub.notify(ticker.ticker_code)
+    return len(fetched_rows)
+
+def fetch_bars(market: str,
+               ticker_code: str,
+               start: date,
+               end: date,
+               interval: int) -> List[Dict]:
+    """market 에 맞는 데이터 소스에서 [start, end] 구간 bar 를 가져옴"""
+    if market.upper() == "KOSPI":
+        return _fetch_kospi(ticker_code, start, end, interval)
+    return _fetch_us(ticker_code, start, end, interval)
+
+def store_chart_rows(db: Session, ticker_id: int, interval: int, rows: List[Dict]) -> int:
+    """
+    bulk upsert: 겹치는 (ticker_id, date, interval) 은 최신 값으로 갱신
+    커밋은 호출자가 함
+    """
+    return bulk_upsert(
+        db,
+        ChartData,
+        [{"ticker_id": ticker_id, "interval": interval, **row} for row in rows],
+    )
 
 def _row_to_dict(r: ChartData) -> Dict:
     return {
@@ -101,93 +235,49 @@ def _fetch_us(ticker: str,
               start: datetime.date, 
               end: datetime.date, 
               interval: int) -> List[Dict]:
-    yf_interval = {1: "1d", 7: "1wk", 30: "1mo"}[interval]
-    df = (
-        yf.Ticker(ticker)
-        .history(start=start - timedelta(days=interval*3), 
-                 end=end + timedelta(days=1), 
-                 interval=yf_interval)
-        .round(2)
-    )
-    if df.empty:
-        return []
-    
-    rows: List[Dict] = []
-    prev_close = None
-    
-    for dt, row in df.iterrows():
-        if(dt.date() < start):
-            prev_close = row["Close"]
-            continue
-        
-        change = (
-            round((row["Close"] - prev_close) / prev_close, 4)
-            if prev_close and prev_close != 0
-            else 0
+    with metrics.upstream("yfinance"):
+        df = get_provider("US").history(
+            ticker,
+            start - timedelta(days=interval*3),
+            end + timedelta(days=1),
+            interval,
         )
-        
-        rows.append({
-                "date": dt.date(),
-                "open": row["Open"],
-                "high": row["High"],
-                "low": row["Low"],
-                "close": row["Close"],
-                "volume": int(row.get("Volume", 0)),
-                "change": change,
-        })
-        prev_close = row["Close"]
-        
-    return rows
+    return bars_to_records(df, start)
+
+def fetch_bars_batch(market: str,
+                     ticker_codes: List[str],
+                     start: date,
+                     end: date,
+                     interval: int) -> Dict[str, List[Dict]]:
+    """
+    여러 종목의 [start, end] 구간 bar 를 가져옴
+    - US: provider.history_many 로 upstream 1회 호출 후 종목별로 분리
+    - KOSPI: FDR 에 batch API 가 없으므로 종목별 호출
+    """
+    if market.upper() == "KOSPI":
+        return {code: _fetch_kospi(code, start, end, interval) for code in ticker_codes}
+
+    with metrics.upstream("yfinance"):
+        frames = get_provider("US").history_many(
+            ticker_codes,
+            start - timedelta(days=interval*3),
+            end + timedelta(days=1),
+            interval,
+        )
+    return {code: bars_to_records(frames.get(code), start) for code in ticker_codes}
 
 def _fetch_kospi(ticker: str,
                  start: datetime.date, 
                  end: datetime.date, 
                  interval: int) -> List[Dict]:
     # 1) 일간 데이터 먼저 수집
-    df = fdr.DataReader(
-        ticker, 
-        start=start - timedelta(days=interval*3),
-        end=end + timedelta(days=1)).round(2)
+    with metrics.upstream("fdr"):
+        df = fdr.DataReader(
+            ticker, 
+            start=start - timedelta(days=interval*3),
+            end=end + timedelta(days=1))
     if df.empty:
         return []
 
-    # 2) 주간 및 월간이면 resampling
-    if interval != 1:
-        rule = {7: "W-MON", 30: "MS"}[interval]
-        df = (
-            df.resample(rule, label="left", closed="left")
-            .agg({
-                "Open":  "first",
-                "High":  "max",
-                "Low":   "min",
-                "Close": "last",
-                "Volume":"sum"
-            })
-            .dropna()
-        )
-
-    # 3) 전일 종가 대비 change 계산
-    rows: List[Dict] = []
-    prev_close = None
-    for dt, row in df.iterrows():
-        if dt.date() < start:
-            prev_close = row["Close"]
-            continue
-
-        change = (
-            round((row["Close"] - prev_close) / prev_close, 4)
-            if prev_close and prev_close != 0 else 0
-        )
-
-        rows.append({
-            "date":   dt.date(),
-            "open":   row["Open"],
-            "high":   row["High"],
-            "low":    row["Low"],
-            "close":  row["Close"],
-            "volume": int(row.get("Volume", 0)),
-            "change": change,
-        })
-        prev_close = row["Close"]
-
-    return rows
+    # 2) 주간 및 월간이면 resampling 후 전일 종가 대비 change 계산
+    return bars_to_records(resample_bars(df, interval), start)
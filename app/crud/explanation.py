@@ -1,20 +1,30 @@
 # app/crud/explanation.py
 from __future__ import annotations
 
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import date, timedelta
 
-import os
-import requests
-import json
+import asyncio
+import functools
+import logging
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from db.session import SessionLocal
-from db.models.ticker import Ticker
 from db.models.explanation import Explanation
-from app.crud.utils import get_session
+from app.crud import revalidate
+from app.crud.model_client import model_client
+from app.crud.utils import get_async_session, get_session
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.crud.singleflight import SingleFlight, db_advisory_lock
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (ticker, horizon, predicted_date) 별로 XAI API 호출을 하나로 묶음
+_flight = SingleFlight()
 
 def generate_explanation(
     ticker_code: str,
@@ -24,69 +34,173 @@ def generate_explanation(
     """
     ticker_code와 horizon_days를 받아 XAI 토큰 중요도 결과를 반환.
     기존 캐시가 있으면 DB에서, 없으면 외부 API에서 받아서 저장.
+    같은 키로 동시에 들어온 캐시 미스는 한 번의 API 호출 결과를 공유.
+    오늘 키가 없어도 MAX_STALE_DAYS 이내의 설명이 있으면 stale 로 바로 반환하고 백그라운드에서 갱신.
     반환:
         {
             "predicted_date": str,
             "tokens": List[str],
-            "token_scores": List[float]
+            "token_scores": List[float],
+            "stale": True    # 이전 설명으로 응답한 경우에만
         }
     """
     with get_session(session) as db:
         pred_date = date.today() + timedelta(days=horizon)
 
         # Ticker 검증
-        ticker: Ticker | None = db.execute(
-            select(Ticker).where(Ticker.ticker_code == ticker_code)
-        ).scalar_one_or_none()
+        with metrics.stage("generate_explanation", "ticker_lookup"):
+            ticker: TickerInfo | None = ticker_registry.get(db, ticker_code)
         if not ticker:
             return {"predicted_date": pred_date, "tokens": [], "token_scores": []}
 
         # 캐시 조회
-        existing: Explanation | None = db.execute(
-            select(Explanation)
-            .where(
-                Explanation.ticker_id == ticker.id,
-                Explanation.horizon_days == horizon,
-                Explanation.predicted_date == pred_date
-            )
-        ).scalar_one_or_none()
+        with metrics.stage("generate_explanation", "cache_query"):
+            existing = _find_cached(db, ticker.id, horizon, pred_date)
         if existing:
+            metrics.count_cache("generate_explanation", True)
             return {
                 "predicted_date": pred_date,
                 "tokens": existing.get_token(),
                 "token_scores": existing.get_token_score()
             }
 
-        # Build API URL
-        base_url = os.getenv("NGROK_API_URL", "")
-        if not base_url.endswith("/"):
-            base_url += "/"
-        api_url = base_url + "explain"
-        if not api_url:
+        stale = _serve_stale(db, ticker, horizon, pred_date)
+        if stale:
+            return stale
+
+        metrics.count_cache("generate_explanation", False)
+        result = _flight.do(
+            (ticker_code, horizon, pred_date),
+            lambda: _explain_and_store(db, ticker, horizon, pred_date),
+        )
+        return dict(result)
+
+async def generate_explanation_async(
+    ticker_code: str,
+    horizon: int,
+    session: AsyncSession | None = None,
+    sync_session: Session | None = None
+) -> Dict[str, object]:
+    """
+    generate_explanation 의 async 버전 (API 요청 경로)
+    - 캐시 조회는 AsyncSession(session) 으로, 캐시 미스(XAI API 호출 + 저장)는 sync generate_explanation 을 스레드에서 실행
+      session 은 조회에만 쓰고, 저장은 sync_session 으로 (없으면 스레드에서 SessionLocal 로 새로 엶)
+    - stale 응답도 이벤트 루프에서 처리하고 갱신만 백그라운드로 넘김
+    """
+    async with get_async_session(session) as db:
+        pred_date = date.today() + timedelta(days=horizon)
+
+        with metrics.stage("generate_explanation", "ticker_lookup"):
+            ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
+        if not ticker:
             return {"predicted_date": pred_date, "tokens": [], "token_scores": []}
 
-        # KOSPI 종목이면 .KS 붙여서 보냄
-        fetch_code = (
-            f"{ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker_code
+        with metrics.stage("generate_explanation", "cache_query"):
+            existing = await db.run_sync(_find_cached, ticker.id, horizon, pred_date)
+        if existing:
+            metrics.count_cache("generate_explanation", True)
+            return {
+                "predicted_date": pred_date,
+                "tokens": existing.get_token(),
+                "token_scores": existing.get_token_score()
+            }
+
+        stale = await db.run_sync(_serve_stale, ticker, horizon, pred_date)
+        if stale:
+            return stale
+
+    # hit/miss 는 sync 경로에서 다시 확인하면서 셈
+    return await asyncio.to_thread(generate_explanation, ticker_code, horizon, session=sync_session)
+
+def refresh_explanation(ticker_code: str, horizon: int) -> Dict[str, object]:
+    """stale 응답 후 백그라운드 갱신: 오늘 키를 XAI API 에서 받아 저장 (stale 응답 없이)"""
+    with get_session() as db:
+        pred_date = date.today() + timedelta(days=horizon)
+        ticker = ticker_registry.get(db, ticker_code)
+        if not ticker:
+            return {"predicted_date": pred_date, "tokens": [], "token_scores": []}
+        return dict(_flight.do(
+            (ticker_code, horizon, pred_date),
+            lambda: _explain_and_store(db, ticker, horizon, pred_date),
+        ))
+
+def _find_cached(db: Session, ticker_id: int, horizon: int, pred_date: date) -> Explanation | None:
+    return db.execute(
+        select(Explanation)
+        .where(
+            Explanation.ticker_id == ticker_id,
+            Explanation.horizon_days == horizon,
+            Explanation.predicted_date == pred_date
         )
+    ).scalar_one_or_none()
+
+def _find_latest(
+    db: Session,
+    ticker_id: int,
+    horizon: int,
+    since: Optional[date] = None,
+    before: Optional[date] = None,
+) -> Explanation | None:
+    """since <= predicted_date < before 범위에서 가장 최근 predicted_date 의 저장된 설명 (None 이면 제한 없음)"""
+    query = select(Explanation).where(Explanation.ticker_id == ticker_id, Explanation.horizon_days == horizon)
+    if since is not None:
+        query = query.where(Explanation.predicted_date >= since)
+    if before is not None:
+        query = query.where(Explanation.predicted_date < before)
+    return db.execute(query.order_by(Explanation.predicted_date.desc()).limit(1)).scalar_one_or_none()
+
+def _stale_result(row: Explanation) -> Dict[str, object]:
+    return {
+        "predicted_date": row.predicted_date,
+        "tokens": row.get_token(),
+        "token_scores": row.get_token_score(),
+        "stale": True
+    }
+
+def _serve_stale(db: Session, ticker: TickerInfo, horizon: int, pred_date: date) -> Dict[str, object] | None:
+    """
+    오늘 키(pred_date)가 없을 때 MAX_STALE_DAYS 이내의 가장 최근 설명이 있으면
+    백그라운드 갱신을 걸고 그 설명을 stale 로 반환. 없으면 None (호출자가 XAI API 를 기다림)
+    """
+    max_stale = revalidate.MAX_STALE_DAYS
+    if max_stale <= 0:
+        return None
+    row = _find_latest(db, ticker.id, horizon, since=pred_date - timedelta(days=max_stale), before=pred_date)
+    if row is None:
+        return None
+    metrics.count_cache("generate_explanation", True, stale=True)
+    revalidate.revalidator.submit(("exp", ticker.ticker_code, horizon, pred_date),
+                                  functools.partial(refresh_explanation, ticker.ticker_code, horizon))
+    return _stale_result(row)
+
+def _explain_and_store(
+    db: Session,
+    ticker: TickerInfo,
+    horizon: int,
+    pred_date: date
+) -> Dict[str, object]:
+    """single-flight leader 만 실행: 외부 API 호출 후 DB 저장"""
+    with db_advisory_lock(db, f"exp:{ticker.id}:{horizon}:{pred_date.isoformat()}"):
+        # 다른 worker 가 잠금을 잡고 있는 동안 이미 저장했을 수 있음
+        existing = _find_cached(db, ticker.id, horizon, pred_date)
+        if existing:
+            return {
+                "predicted_date": pred_date,
+                "tokens": existing.get_token(),
+                "token_scores": existing.get_token_score()
+            }
 
-        # 외부 API 호출
         try:
-            resp = requests.get(
-                api_url,
-                params={"ticker": fetch_code, "horizon_days": horizon},
-                headers={"ngrok-skip-browser-warning": "true"},
-                timeout=60
-            )
-            resp.raise_for_status()
-            payload = resp.json()
+            with metrics.stage("generate_explanation", "upstream_fetch"):
+                tokens, token_scores = fetch_explanation(ticker, horizon)
         except Exception as e:
-            print("XAI API error:", e)
+            # circuit 이 열려 있으면 네트워크 없이 바로 여기로 옴 → 마지막으로 저장된 설명으로 응답
+            logger.warning("XAI API error: %s", e)
+            latest = _find_latest(db, ticker.id, horizon)
+            if latest:
+                return _stale_result(latest)
             return {"predicted_date": pred_date, "tokens": [], "token_scores": []}
 
-        tokens = payload.get("token_list", [])
-        token_scores = payload.get("token_score_list", [])
-
         # Attempt to insert into DB
         try:
             explain = Explanation(
@@ -96,19 +210,14 @@ def generate_explanation(
             )
             explain.set_token(tokens)
             explain.set_token_score(token_scores)
-            db.add(explain)
-            db.commit()
+            with metrics.stage("generate_explanation", "insert"):
+                db.add(explain)
+                db.commit()
         except IntegrityError:
             # Race condition: another process inserted same record
             db.rollback()
-            
-            existing = db.execute(
-                select(Explanation).where(
-                    Explanation.ticker_id == ticker.id,
-                    Explanation.horizon_days == horizon,
-                    Explanation.predicted_date == pred_date
-                )
-            ).scalar_one_or_none()
+
+            existing = _find_cached(db, ticker.id, horizon, pred_date)
 
             if existing:
                 return {
@@ -125,3 +234,14 @@ def generate_explanation(
             "tokens": tokens,
             "token_scores": token_scores
         }
+
+def fetch_explanation(ticker: TickerInfo, horizon: int) -> Tuple[List[str], List[float]]:
+    """모델 서버 /explain 호출 → (tokens, token_scores). 실패하면 예외 (circuit 이 열려 있으면 CircuitOpenError)"""
+    # KOSPI 종목이면 .KS 붙여서 보냄
+    fetch_code = (
+        f"{ticker.ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker.ticker_code
+    )
+
+    with metrics.upstream("model_explain"):
+        payload = model_client.get_json("explain", {"ticker": fetch_code, "horizon_days": horizon})
+    return payload.get("token_list", []), payload.get("token_score_list", [])
@@ -0,0 +1,90 @@
+# app/crud/hangul.py
+"""
+종목명 검색용 한글 변환
+- decompose: 음절을 자모로 분해 (겹받침/겹모음도 낱자로) → 입력 중인 "삼성젅" 도 "삼성전자" 의 prefix
+- chosung:   초성 문자열 ("삼성전자" → "ㅅㅅㅈㅈ")
+- romanize:  국어의 로마자 표기법(단순화, 음운 변화 미반영) ("삼성전자" → "samseongjeonja")
+- fold_roman: 관용 표기와 맞추기 위한 정규화. 색인 키와 질의에 똑같이 적용
+  ("samseong" / "samsung" → "samsung", "hyeondae" / "hyundai" → "hyundae")
+"""
+from __future__ import annotations
+
+import re
+
+SYLLABLE_FIRST, SYLLABLE_LAST = 0xAC00, 0xD7A3
+
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+        "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+ROMAN_CHO = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+ROMAN_JUNG = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u",
+              "wo", "we", "wi", "yu", "eu", "ui", "i"]
+ROMAN_JONG = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l",
+              "m", "p", "p", "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+
+# 겹받침 / 겹모음 → 낱자 (두벌식 입력 순서)
+SPLIT = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+
+# fold_roman: 모음 관용 표기 → 자음 유/무성 구분 제거 → 연속 중복 문자 축약
+_FOLD_PAIRS = [("ch", "j"), ("sh", "s"), ("eo", "u"), ("oo", "u"), ("ee", "i"), ("ai", "ae")]
+_FOLD_CONSONANTS = str.maketrans("ktpr", "gdbl")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_REPEATS = re.compile(r"(.)\1+")
+
+def _syllable(ch: str):
+    code = ord(ch)
+    if SYLLABLE_FIRST <= code <= SYLLABLE_LAST:
+        code -= SYLLABLE_FIRST
+        return code // 588, (code // 28) % 21, code % 28
+    return None
+
+def is_jamo(ch: str) -> bool:
+    return "ㄱ" <= ch <= "ㅣ"
+
+def has_hangul(text: str) -> bool:
+    return any(_syllable(ch) or is_jamo(ch) for ch in text)
+
+def is_chosung_query(text: str) -> bool:
+    """초성(자음)만으로 된 질의인지 ("ㅅㅅ")"""
+    return bool(text) and all(ch in CHO for ch in text)
+
+def decompose(text: str) -> str:
+    out = []
+    for ch in text.lower():
+        parts = _syllable(ch)
+        if parts is None:
+            out.append(SPLIT.get(ch, ch))
+            continue
+        cho, jung, jong = parts
+        out.append(CHO[cho] + SPLIT.get(JUNG[jung], JUNG[jung]) + SPLIT.get(JONG[jong], JONG[jong]))
+    return "".join(out)
+
+def chosung(text: str) -> str:
+    out = []
+    for ch in text.lower():
+        parts = _syllable(ch)
+        out.append(CHO[parts[0]] if parts else ch)
+    return "".join(out)
+
+def romanize(text: str) -> str:
+    out = []
+    for ch in text.lower():
+        parts = _syllable(ch)
+        if parts is None:
+            out.append(ch)
+            continue
+        cho, jung, jong = parts
+        out.append(ROMAN_CHO[cho] + ROMAN_JUNG[jung] + ROMAN_JONG[jong])
+    return "".join(out)
+
+def fold_roman(text: str) -> str:
+    s = _NON_ALNUM.sub("", text.lower())
+    for a, b in _FOLD_PAIRS:
+        s = s.replace(a, b)
+    return _REPEATS.sub(r"\1", s.translate(_FOLD_CONSONANTS))
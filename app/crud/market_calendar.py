@@ -0,0 +1,46 @@
+# app/crud/market_calendar.py
+from __future__ import annotations
+
+import os
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# market -> (거래소 현지 timezone, 정규장 마감 시각)
+MARKET_SESSIONS = {
+    "US":    (ZoneInfo("America/New_York"), time(16, 0)),
+    "KOSPI": (ZoneInfo("Asia/Seoul"),       time(15, 30)),
+}
+
+# 장 마감 후 scheduler 가 수집을 시작하기까지의 여유 (upstream 에 종가가 반영되는 시간)
+INGEST_DELAY = timedelta(minutes=int(os.getenv("INGEST_DELAY_MIN", "30")))
+
+def _session_closes(market: str, start: datetime, step: int):
+    """start 의 현지 날짜부터 step(+1/-1) 방향으로 평일 마감 시각을 차례로 생성"""
+    tz, close_at = MARKET_SESSIONS.get(market.upper(), MARKET_SESSIONS["US"])
+    day = start.astimezone(tz).date()
+    while True:
+        if day.weekday() < 5:
+            yield datetime.combine(day, close_at, tzinfo=tz)
+        day += timedelta(days=step)
+
+def next_session_close(market: str,
+                       now: datetime | None = None,
+                       after: timedelta = timedelta(0)) -> datetime:
+    """
+    now 이후 가장 가까운 (정규장 마감 + after) 시각(UTC)을 반환
+    - 주말은 건너뜀. 공휴일은 고려하지 않음 (휴장일 마감 시각에 만료되어도 재조회 1회로 끝남)
+    - 알 수 없는 market 은 US 기준
+    """
+    now = now or datetime.now(timezone.utc)
+    for close in _session_closes(market, now - after, +1):
+        if close + after > now:
+            return (close + after).astimezone(timezone.utc)
+
+def last_session_close(market: str,
+                       now: datetime | None = None,
+                       after: timedelta = timedelta(0)) -> datetime:
+    """now 이전(포함) 가장 최근의 (정규장 마감 + after) 시각(UTC)"""
+    now = now or datetime.now(timezone.utc)
+    for close in _session_closes(market, now - after, -1):
+        if close + after <= now:
+            return (close + after).astimezone(timezone.utc)
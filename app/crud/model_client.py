@@ -0,0 +1,151 @@
+# app/crud/model_client.py
+"""
+모델 서버(NGROK_API_URL) HTTP client
+- requests.Session 하나를 공유해 keep-alive 연결을 재사용 (host 당 최대 MODEL_POOL_SIZE 개)
+- connect / read timeout 을 나눔: 서버가 내려가 있으면 connect 단계에서 빨리 실패하고,
+  추론이 오래 걸리는 read 는 따로 기다림
+- 연결 실패와 502 / 503 / 504 는 jitter 를 더한 지수 backoff 로 재시도 (urllib3 Retry)
+  read timeout 은 재시도하지 않음 (추론 중인 요청을 다시 보내면 대기만 늘어남)
+- 연속 실패가 MODEL_BREAKER_THRESHOLD 번이면 circuit 을 열고 MODEL_BREAKER_RESET_SEC 동안은
+  네트워크 없이 CircuitOpenError. 그 뒤 시험 호출 1개가 성공하면 닫음
+  호출자(crud)는 실패 시 DB 에 남은 마지막 값을 응답
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONNECT_TIMEOUT = float(os.getenv("MODEL_CONNECT_TIMEOUT", "3"))
+MODEL_READ_TIMEOUT = float(os.getenv("MODEL_READ_TIMEOUT", "30"))
+MODEL_RETRIES = int(os.getenv("MODEL_RETRIES", "2"))
+MODEL_RETRY_BACKOFF = float(os.getenv("MODEL_RETRY_BACKOFF", "0.5"))
+MODEL_POOL_SIZE = int(os.getenv("MODEL_POOL_SIZE", "16"))
+MODEL_BREAKER_THRESHOLD = int(os.getenv("MODEL_BREAKER_THRESHOLD", "5"))
+MODEL_BREAKER_RESET_SEC = float(os.getenv("MODEL_BREAKER_RESET_SEC", "30"))
+
+class CircuitOpenError(RuntimeError):
+    """circuit 이 열려 있어 모델 서버를 호출하지 않음"""
+
+class CircuitBreaker:
+    """
+    연속 실패 threshold 번 → open (reset_timeout 동안 allow() 가 False)
+    reset_timeout 이 지나면 half-open: 시험 호출 1개만 허용하고, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self,
+                 threshold: int = MODEL_BREAKER_THRESHOLD,
+                 reset_timeout: float = MODEL_BREAKER_RESET_SEC,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.reset_timeout or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("model server circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial
+            self._trial = False
+            if reopen or (self._opened_at is None and self._failures >= self.threshold):
+                self._opened_at = self._clock()
+                logger.warning("model server circuit open for %.0fs after %d failures",
+                               self.reset_timeout, self._failures)
+
+class ModelClient:
+    def __init__(self,
+                 base_url: Optional[str] = None,
+                 connect_timeout: float = MODEL_CONNECT_TIMEOUT,
+                 read_timeout: float = MODEL_READ_TIMEOUT,
+                 retries: int = MODEL_RETRIES,
+                 backoff: float = MODEL_RETRY_BACKOFF,
+                 pool_size: int = MODEL_POOL_SIZE,
+                 breaker: Optional[CircuitBreaker] = None) -> None:
+        # None 이면 호출할 때마다 NGROK_API_URL 을 읽음
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        # backoff_jitter 는 urllib3 2 부터 (requirements.txt 에 고정)
+        retry = Retry(
+            total=retries, connect=retries, read=0, status=retries,
+            backoff_factor=backoff, backoff_jitter=backoff,
+            status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,   # 재시도를 다 쓰면 마지막 응답을 돌려받아 raise_for_status 로 처리
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["ngrok-skip-browser-warning"] = "true"
+
+    def url(self, path: str) -> str:
+        base_url = self.base_url if self.base_url is not None else os.getenv("NGROK_API_URL", "")
+        if not base_url.endswith("/"):
+            base_url += "/"
+        return base_url + path
+
+    def get_json(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET {base_url}{path} → JSON
+        circuit 이 열려 있으면 CircuitOpenError, 그 외 실패는 requests 예외를 그대로 전파
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"model server circuit open ({path})")
+        try:
+            resp = self.session.get(self.url(path), params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            payload = resp.json()
+        except requests.HTTPError as e:
+            # 4xx 는 요청 문제일 뿐 서버는 응답하고 있으므로 circuit 에는 성공으로 셈
+            if e.response is not None and e.response.status_code < 500:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return payload
+
+    def close(self) -> None:
+        self.session.close()
+
+model_client = ModelClient()
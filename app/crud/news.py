@@ -1,141 +1,241 @@
 # app/crud/news.py
+"""
+뉴스 조회 / 수집
+- 요청 경로(get_recent_news*)는 yfinance 를 부르지 않고 최신 10건 메모리 index → DB 만 읽음
+- yfinance 확인은 app.scheduler.news.NewsPoller 가 백그라운드에서 refresh_news 로 실행
+  news_demand 의 최근 요청 빈도 순으로, 확인한 지 NEWS_FRESHNESS_SEC 가 지난 종목만
+"""
 from __future__ import annotations
 
-from typing import List, Dict
-from datetime import datetime, timezone
+import math
+import os
+import threading
+import time
+from typing import Callable, List, Dict, Tuple
+from datetime import timezone
 
 import yfinance as yf
 from dateutil import parser as date_parser
-from sqlalchemy import select, func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from db.session import SessionLocal
-from db.models.news import News
-from db.models.ticker import Ticker
+from db.models.news import News, hash_link
+from db.upsert import bulk_upsert
 
-from app.crud.utils import get_session
+from app.crud.cache import LRUCache
+from app.crud.stream import update_hub
+from app.crud.utils import get_async_session, get_session
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.metrics import metrics
+
+# 종목 뉴스를 yfinance 에서 다시 확인하는 주기 (초)
+NEWS_FRESHNESS_SEC = float(os.getenv("NEWS_FRESHNESS_SEC", "600"))
+# 최신 10건 index: 종목 수 / 보관 시간 (초). 다른 worker 가 저장한 뉴스는 이 시간 안에 반영
+NEWS_INDEX_SIZE = int(os.getenv("NEWS_INDEX_SIZE", "2048"))
+NEWS_INDEX_TTL_SEC = float(os.getenv("NEWS_INDEX_TTL_SEC", "60"))
+# 요청 빈도 점수의 반감기 (초)
+NEWS_DEMAND_HALF_LIFE_SEC = float(os.getenv("NEWS_DEMAND_HALF_LIFE_SEC", "900"))
+
+NewsVersion = Tuple[int, ...]
+
+class NewsDemand:
+    """
+    종목별 최근 요청 빈도: 요청마다 +1, 반감기마다 절반으로 줄어드는 점수
+    처음 요청된(또는 점수가 사라진 뒤 다시 요청된) 종목이 생기면 wakeup 을 set → poller 가 바로 확인
+    """
+
+    def __init__(self, half_life: float = NEWS_DEMAND_HALF_LIFE_SEC,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.half_life = half_life
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._scores: Dict[str, Tuple[float, float]] = {}   # code -> (점수, 갱신 시각)
+        self.wakeup = threading.Event()
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * math.pow(0.5, (now - updated) / self.half_life)
+
+    def hit(self, ticker_code: str) -> None:
+        now = self._clock()
+        with self._lock:
+            score, updated = self._scores.get(ticker_code, (0.0, now))
+            self._scores[ticker_code] = (self._decayed(score, updated, now) + 1.0, now)
+        if score == 0.0:
+            self.wakeup.set()
+
+    def ranked(self, min_score: float = 0.05) -> List[Tuple[str, float]]:
+        """점수 내림차순 (code, 점수). min_score 아래로 떨어진 종목은 잊음"""
+        now = self._clock()
+        with self._lock:
+            current = {code: self._decayed(s, u, now) for code, (s, u) in self._scores.items()}
+            for code, score in current.items():
+                if score < min_score:
+                    del self._scores[code]
+        return sorted(((c, s) for c, s in current.items() if s >= min_score), key=lambda item: -item[1])
+
+# 요청 빈도 (poller 우선순위)
+news_demand = NewsDemand()
+# ticker_id -> (최신 10건 id, 최신 10건 응답 dict)
+news_index = LRUCache(NEWS_INDEX_SIZE)
+
+async def get_recent_news_async(
+    ticker_code: str,
+    session: AsyncSession | None = None
+) -> List[Dict]:
+    """get_recent_news 의 async 버전 (API 요청 경로). index 에 있으면 DB 도 읽지 않음"""
+    async with get_async_session(session) as db:
+        with metrics.stage("get_recent_news", "ticker_lookup"):
+            ticker = await ticker_registry.aget(db, ticker_code)
+        if ticker is None:
+            return []
+        news_demand.hit(ticker.ticker_code)
+        cached = news_index.get(ticker.id)
+        metrics.count_cache("get_recent_news", cached is not None)
+        if cached is not None:
+            return cached[1]
+        with metrics.stage("get_recent_news", "cache_query"):
+            return (await db.run_sync(_load_latest, ticker.id))[1]
 
 def get_recent_news(
     ticker_code: str,
     session: Session | None = None
 ) -> List[Dict]:
     """
-    ticker_code에 대해 최근 10건 뉴스 반환
-    - 헤드라인(pubDate) 비교로 새로운 뉴스 여부 판단
-    - Ticker.market 정보로 US/KOSPI 구분하여 YF fetch (.KS suffix)
-    - 신규 항목만 insert 후 최신 10건 반환
+    ticker_code에 대해 최근 10건 뉴스 반환 (최신 10건 index → DB)
+    - 새 뉴스 수집은 NewsPoller 가 맡고, 여기서는 요청 빈도만 기록
     """
     with get_session(session) as db:
-        # 1) Ticker 조회
-        ticker: Ticker | None = db.execute(
-            select(Ticker).where(Ticker.ticker_code == ticker_code)
-        ).scalar_one_or_none()
+        with metrics.stage("get_recent_news", "ticker_lookup"):
+            ticker: TickerInfo | None = ticker_registry.get(db, ticker_code)
         if not ticker:
             return []
+        news_demand.hit(ticker.ticker_code)
+        cached = news_index.get(ticker.id)
+        metrics.count_cache("get_recent_news", cached is not None)
+        if cached is not None:
+            return cached[1]
+        with metrics.stage("get_recent_news", "cache_query"):
+            return _load_latest(db, ticker.id)[1]
 
-        # 2) DB에 저장된 가장 최신 pub_date
-        latest_db_date: datetime | None = db.execute(
-            select(func.max(News.pub_date)).where(News.ticker_id == ticker.id)
-        ).scalar_one()
+def news_version(db: Session, ticker_id: int) -> NewsVersion:
+    """
+    최신 10건의 id (ETag 용). index 에 있으면 본문도 index 에서 나가므로 index 기준,
+    없으면 id 만 조회
+    """
+    cached = news_index.get(ticker_id)
+    if cached is not None:
+        return cached[0]
+    return tuple(db.execute(
+        select(News.id)
+        .where(News.ticker_id == ticker_id)
+        .order_by(News.pub_date.desc(), News.id.desc())
+        .limit(10)
+    ).scalars().all())
 
-        # 3) API 호출 준비: .KS suffix 처리
-        fetch_code = (
-            f"{ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker_code
-        )
-        try:
+def refresh_news(
+    ticker_code: str,
+    session: Session | None = None
+) -> int:
+    """
+    yfinance 에서 새 뉴스만 받아 저장 (NewsPoller 가 호출)
+    반환: 저장한 건수
+    """
+    with get_session(session) as db:
+        with metrics.stage("refresh_news", "ticker_lookup"):
+            ticker: TickerInfo | None = ticker_registry.get(db, ticker_code)
+        if not ticker:
+            return 0
+        return _store_new_news(db, ticker, ticker_code)
+
+def recent_news_rows(db: Session, ticker_id: int, limit: int = 10) -> List[Dict]:
+    """최신 limit 건 (pub_date 내림차순)"""
+    return [_row_to_dict(n) for n in _latest_rows(db, ticker_id, limit)]
+
+def _latest_rows(db: Session, ticker_id: int, limit: int) -> List[News]:
+    return db.execute(
+        select(News)
+        .where(News.ticker_id == ticker_id)
+        .order_by(News.pub_date.desc(), News.id.desc())
+        .limit(limit)
+    ).scalars().all()
+
+def _load_latest(db: Session, ticker_id: int) -> Tuple[NewsVersion, List[Dict]]:
+    rows = _latest_rows(db, ticker_id, 10)
+    entry = (tuple(n.id for n in rows), [_row_to_dict(n) for n in rows])
+    news_index.set(ticker_id, entry, time.time() + NEWS_INDEX_TTL_SEC)
+    return entry
+
+def _row_to_dict(n: News) -> Dict:
+    return {
+        "title":    n.title,
+        "summary":  n.summary,
+        "link":     n.link,
+        "pubDate":  n.pub_date.isoformat(),
+        "provider": n.provider
+    }
+
+def _store_new_news(db: Session, ticker: TickerInfo, ticker_code: str) -> int:
+    """
+    yfinance 뉴스 중 DB 에 없는 link 만 bulk insert (커밋 포함). 반환: 저장한 건수
+    - 중복 판정은 (ticker_id, link_hash) unique index. pub_date 비교가 아니라서 재발행(pubDate 변경)된 기사도,
+      DB 최신 기사와 pubDate 가 같은 새 기사도 정확히 한 번만 저장
+    - 이미 있는 hash 를 먼저 조회해 새 건수를 세고, INSERT 는 DO NOTHING upsert 라 동시에 저장해도 중복이 생기지 않음
+    """
+    # 1) API 호출 준비: .KS suffix 처리
+    fetch_code = (
+        f"{ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker_code
+    )
+    try:
+        with metrics.stage("refresh_news", "upstream_fetch"), metrics.upstream("yfinance_news"):
             raw = yf.Ticker(fetch_code).news or []
+    except Exception:
+        raw = []
+
+    # 2) 전체 뉴스 파싱. 같은 응답 안의 중복 link 는 첫 항목만
+    items: Dict[str, Dict] = {}
+    for art in raw:
+        content = art.get("content", {})
+        title = content.get("title")
+        link = content.get("canonicalUrl", {}).get("url")
+        pub_str = content.get("pubDate", "")
+        provider = content.get("provider", {}).get("displayName", "")
+        if not (title and link):
+            continue
+
+        try:
+            pub_dt = date_parser.parse(pub_str)
+            if pub_dt.tzinfo:
+                pub_dt = pub_dt.astimezone(timezone.utc).replace(tzinfo=None)
         except Exception:
-            raw = []
-
-        # 4) 헤드라인 비교: raw에서 최대(pubDate) 구하기
-        max_pub_dt: datetime | None = None
-        for art in raw:
-            pub_str = art.get("content", {}).get("pubDate", "")
-            try:
-                dt = date_parser.parse(pub_str)
-                if dt.tzinfo:
-                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-            except Exception:
-                continue
-            if max_pub_dt is None or dt > max_pub_dt:
-                max_pub_dt = dt
-
-        # 캐시 히트: API의 최신 뉴스가 DB 최신과 같거나 이전이면 DB에서 바로 반환
-        if max_pub_dt and latest_db_date and max_pub_dt <= latest_db_date:
-            rows = db.execute(
-                select(News)
-                .where(News.ticker_id == ticker.id)
-                .order_by(News.pub_date.desc())
-                .limit(10)
-            ).scalars().all()
-            return [
-                {
-                    "title":    n.title,
-                    "summary":  n.summary,
-                    "link":     n.link,
-                    "pubDate":  n.pub_date.isoformat(),
-                    "provider": n.provider
-                }
-                for n in rows
-            ]
-
-        # 5) 전체 뉴스 파싱 및 DB에 없는 항목 필터
-        new_items: list[tuple[Dict, datetime]] = []
-        for art in raw:
-            content = art.get("content", {})
-            title = content.get("title")
-            link = content.get("canonicalUrl", {}).get("url")
-            pub_str = content.get("pubDate", "")
-            provider = content.get("provider", {}).get("displayName", "")
-            if not (title and link):
-                continue
-
-            try:
-                pub_dt = date_parser.parse(pub_str)
-                if pub_dt.tzinfo:
-                    pub_dt = pub_dt.astimezone(timezone.utc).replace(tzinfo=None)
-            except Exception:
-                continue
-
-            if not latest_db_date or pub_dt > latest_db_date:
-                new_items.append((
-                    {
-                        "title":   title,
-                        "summary": content.get("summary", ""),
-                        "link":    link,
-                        "pubDate": pub_dt,
-                        "provider": provider
-                    },
-                    pub_dt
-                ))
-
-        # 6) 신규 뉴스 bulk insert 후 커밋
-        for item, pub_dt in new_items:
-            db.add(News(
-                ticker_id=ticker.id,
-                title=item["title"],
-                summary=item["summary"],
-                link=item["link"],
-                pub_date=pub_dt,
-                provider=item["provider"]
-            ))
-        if new_items:
-            db.commit()
+            continue
 
-        # 7) 최신 10건 조회 및 반환
-        rows = db.execute(
-            select(News)
-            .where(News.ticker_id == ticker.id)
-            .order_by(News.pub_date.desc())
-            .limit(10)
-        ).scalars().all()
-        return [
-            {
-                "title":    n.title,
-                "summary":  n.summary,
-                "link":     n.link,
-                "pubDate":  n.pub_date.isoformat(),
-                "provider": n.provider
-            }
-            for n in rows
-        ]
+        items.setdefault(hash_link(link), {
+            "ticker_id": ticker.id,
+            "title":     title,
+            "summary":   content.get("summary", ""),
+            "link":      link,
+            "pub_date":  pub_dt,
+            "provider":  provider
+        })
+
+    # 3) DB 에 이미 있는 hash (unique index 만 읽음)
+    with metrics.stage("refresh_news", "cache_query"):
+        stored = set(db.execute(
+            select(News.link_hash)
+            .where(News.ticker_id == ticker.id, News.link_hash.in_(list(items)))
+        ).scalars()) if items else set()
+    new_items = [dict(item, link_hash=h) for h, item in items.items() if h not in stored]
+
+    # 캐시 히트: 응답의 기사가 모두 저장돼 있으면 쓸 것 없음
+    metrics.count_cache("refresh_news", not new_items)
+
+    # 4) 신규 뉴스 bulk insert 후 커밋
+    if new_items:
+        with metrics.stage("refresh_news", "insert"):
+            bulk_upsert(db, News, new_items, update_cols=[], conflict_cols=["ticker_id", "link_hash"])
+            db.commit()
+        news_index.delete(ticker.id)
+        update_hub.notify(ticker.ticker_code)
+    return len(new_items)
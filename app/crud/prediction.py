@@ -1,20 +1,39 @@
 # app/crud/prediction.py
 from __future__ import annotations
 
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence, Tuple
 from datetime import date, timedelta
 
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
-import requests
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from db.session import SessionLocal
-from db.models.ticker import Ticker
 from db.models.prediction import Prediction
 
-from app.crud.utils import get_session
+from app.crud import revalidate
+from app.crud.model_client import model_client
+from app.crud.utils import get_async_session, get_session
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.crud.singleflight import SingleFlight, db_advisory_lock
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (ticker, horizon, predicted_date) 별로 모델 서버 호출을 하나로 묶음
+_flight = SingleFlight()
+
+# 배치 요청 하나가 모델 서버를 동시에 호출하는 최대 수
+PRED_BATCH_CONCURRENCY = int(os.getenv("PRED_BATCH_CONCURRENCY", "8"))
+
+PredictionKey = Tuple[str, int]   # (ticker_code, horizon)
 
 def run_prediction(
     ticker_code: str,
@@ -24,66 +43,318 @@ def run_prediction(
     """
     ticker_code와 horizon_days를 받아 예측 결과를 반환합니다.
     기존 캐시가 있으면 DB에서 가져오고, 없으면 외부 API 호출 후 DB에 저장 후 반환합니다.
+    같은 키로 동시에 들어온 캐시 미스는 한 번의 API 호출 결과를 공유합니다.
+    오늘 키가 없어도 MAX_STALE_DAYS 이내의 예측이 있으면 그것을 stale 로 바로 반환하고
+    백그라운드에서 갱신합니다 (stale-while-revalidate).
 
     반환 형식:
         {
             "predicted_date": str,
-            "result": float
+            "result": float,
+            "stale": True    # 이전 예측으로 응답한 경우에만
         }
     """
     with get_session(session) as db:
         pred_date = date.today() + timedelta(days=horizon)
-        
+
         # Ticker 검증
-        ticker: Ticker | None = db.execute(
-            select(Ticker).where(Ticker.ticker_code == ticker_code)
-        ).scalar_one_or_none()
+        with metrics.stage("run_prediction", "ticker_lookup"):
+            ticker: TickerInfo | None = ticker_registry.get(db, ticker_code)
         if not ticker:
             return {"predicted_date": pred_date.isoformat(), "result": 0.0}
 
         # 캐시 조회
-        existing: Prediction | None = db.execute(
-            select(Prediction)
-            .where(
-                Prediction.ticker_id == ticker.id,
-                Prediction.horizon_days == horizon,
-                Prediction.predicted_date == pred_date
-            )
-        ).scalar_one_or_none()
+        with metrics.stage("run_prediction", "cache_query"):
+            existing = _find_cached(db, ticker.id, horizon, pred_date)
         if existing:
+            metrics.count_cache("run_prediction", True)
             return {"predicted_date": pred_date.isoformat(), "result": existing.prediction_result}
 
-        # Build API URL
-        base_url = os.getenv("NGROK_API_URL", "")
-        if not base_url.endswith("/"):
-            base_url += "/"
-        api_url = base_url + "predict"
-        
-        if not api_url:
+        stale = _serve_stale(db, ticker, horizon, pred_date)
+        if stale:
+            return stale
+
+        metrics.count_cache("run_prediction", False)
+        result = _flight.do(
+            (ticker_code, horizon, pred_date),
+            lambda: _predict_and_store(db, ticker, horizon, pred_date),
+        )
+        return dict(result)
+
+async def run_prediction_async(
+    ticker_code: str,
+    horizon: int,
+    session: AsyncSession | None = None,
+    sync_session: Session | None = None
+) -> Dict[str, object]:
+    """
+    run_prediction 의 async 버전 (API 요청 경로)
+    - 캐시 조회는 AsyncSession(session) 으로, 캐시 미스(모델 서버 호출 + 저장)는 sync run_prediction 을 스레드에서 실행
+      session 은 조회에만 쓰고, 저장은 sync_session 으로 (없으면 스레드에서 SessionLocal 로 새로 엶)
+    - stale 응답도 이벤트 루프에서 처리하고 갱신만 백그라운드로 넘김
+    """
+    async with get_async_session(session) as db:
+        pred_date = date.today() + timedelta(days=horizon)
+
+        with metrics.stage("run_prediction", "ticker_lookup"):
+            ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
+        if not ticker:
             return {"predicted_date": pred_date.isoformat(), "result": 0.0}
 
-        # KOSPI 종목이면 .KS 붙여서 보냄
-        fetch_code = (
-            f"{ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker_code
+        with metrics.stage("run_prediction", "cache_query"):
+            existing = await db.run_sync(_find_cached, ticker.id, horizon, pred_date)
+        if existing:
+            metrics.count_cache("run_prediction", True)
+            return {"predicted_date": pred_date.isoformat(), "result": existing.prediction_result}
+
+        stale = await db.run_sync(_serve_stale, ticker, horizon, pred_date)
+        if stale:
+            return stale
+
+    # hit/miss 는 sync 경로에서 다시 확인하면서 셈
+    return await asyncio.to_thread(run_prediction, ticker_code, horizon, session=sync_session)
+
+def refresh_prediction(ticker_code: str, horizon: int) -> Dict[str, object]:
+    """stale 응답 후 백그라운드 갱신: 오늘 키를 모델 서버에서 받아 저장 (stale 응답 없이)"""
+    with get_session() as db:
+        pred_date = date.today() + timedelta(days=horizon)
+        ticker = ticker_registry.get(db, ticker_code)
+        if not ticker:
+            return {"predicted_date": pred_date.isoformat(), "result": 0.0}
+        return dict(_flight.do(
+            (ticker_code, horizon, pred_date),
+            lambda: _predict_and_store(db, ticker, horizon, pred_date),
+        ))
+
+def run_prediction_batch(
+    keys: Sequence[PredictionKey],
+    session: Session | None = None
+) -> Dict[PredictionKey, Dict[str, object]]:
+    """
+    (ticker_code, horizon) 여러 개의 예측 결과를 한 번에 반환합니다.
+    - 캐시는 쿼리 한 번으로 조회
+    - 캐시 미스는 최대 PRED_BATCH_CONCURRENCY 개씩 동시에, run_prediction 과 같은 single-flight / DB 잠금을 거쳐
+      모델 서버를 호출하고 키마다 저장 (동시에 들어온 다른 배치·단건 요청과 같은 키는 한 번만 호출)
+    - run_prediction 처럼 stale 로 응답할 수 있는 키는 모델 서버를 기다리지 않고 백그라운드에서 갱신
+    없는 종목은 result 0.0, 호출에 실패한 키는 run_prediction 처럼 마지막으로 저장된 값 (저장하지 않음)
+
+    반환 형식: {(ticker_code, horizon): {"predicted_date": str, "result": float[, "stale": True]}}
+    """
+    with get_session(session) as db:
+        today = date.today()
+        with metrics.stage("run_prediction_batch", "ticker_lookup"):
+            tickers = {code: ticker_registry.get(db, code) for code in {code for code, _ in keys}}
+        with metrics.stage("run_prediction_batch", "cache_query"):
+            results, missing = _split_cached(db, tickers, keys)
+        if missing:
+            stale = _serve_stale_many(db, tickers, missing, today)
+            results.update(stale)
+            missing = [key for key in missing if key not in stale]
+        for _ in missing:
+            metrics.count_cache("run_prediction_batch", False)
+        if not missing:
+            return results
+
+        results.update(_predict_many(db, tickers, missing, today))
+        return results
+
+async def run_prediction_batch_async(
+    keys: Sequence[PredictionKey],
+    session: AsyncSession | None = None,
+    sync_session: Session | None = None
+) -> Dict[PredictionKey, Dict[str, object]]:
+    """
+    run_prediction_batch 의 async 버전 (API 요청 경로)
+    - 캐시 조회는 AsyncSession(session) 으로, 미스가 하나라도 있으면 미스들만 sync run_prediction_batch 로 스레드에서 처리
+      session 은 조회에만 쓰고, 저장은 sync_session 으로 (없으면 스레드에서 SessionLocal 로 새로 엶)
+    """
+    async with get_async_session(session) as db:
+        with metrics.stage("run_prediction_batch", "ticker_lookup"):
+            codes = {code for code, _ in keys}
+            tickers = {code: await ticker_registry.aget(db, code) for code in codes}
+        with metrics.stage("run_prediction_batch", "cache_query"):
+            results, missing = await db.run_sync(_split_cached, tickers, keys)
+
+    if missing:
+        # hit/miss 는 sync 경로에서 다시 확인하면서 셈
+        results.update(await asyncio.to_thread(run_prediction_batch, missing, session=sync_session))
+    return results
+
+def _split_cached(
+    db: Session,
+    tickers: Dict[str, TickerInfo | None],
+    keys: Sequence[PredictionKey],
+) -> Tuple[Dict[PredictionKey, Dict[str, object]], List[PredictionKey]]:
+    """
+    keys 의 캐시를 한 쿼리로 조회 → (결과, 오늘 키가 없는 key 목록)
+    hit 만 셈 (미스는 stale 응답 여부를 확인한 호출자가 셈). 없는 종목은 결과에 0.0 으로 넣고 세지 않음
+    """
+    today = date.today()
+    results: Dict[PredictionKey, Dict[str, object]] = {}
+    wanted: Dict[Tuple[int, int, date], PredictionKey] = {}
+    for code, horizon in dict.fromkeys(keys):
+        pred_date = today + timedelta(days=horizon)
+        ticker = tickers.get(code)
+        if ticker is None:
+            results[(code, horizon)] = {"predicted_date": pred_date.isoformat(), "result": 0.0}
+        else:
+            wanted[(ticker.id, horizon, pred_date)] = (code, horizon)
+    if not wanted:
+        return results, []
+
+    # (ticker_id, horizon, date) 튜플 IN 대신 컬럼별 IN 으로 좁힌 뒤 정확한 키만 골라냄
+    rows = db.execute(
+        select(Prediction.ticker_id, Prediction.horizon_days, Prediction.predicted_date,
+               Prediction.prediction_result)
+        .where(
+            Prediction.ticker_id.in_({tid for tid, _, _ in wanted}),
+            Prediction.horizon_days.in_({h for _, h, _ in wanted}),
+            Prediction.predicted_date.in_({d for _, _, d in wanted}),
         )
-        
-        # 외부 API 호출
+    ).all()
+    for tid, horizon, pred_date, result in rows:
+        key = wanted.pop((tid, horizon, pred_date), None)
+        if key is not None:
+            results[key] = {"predicted_date": pred_date.isoformat(), "result": result}
+            metrics.count_cache("run_prediction_batch", True)
+    return results, list(wanted.values())
+
+def _predict_many(
+    db: Session,
+    tickers: Dict[str, TickerInfo | None],
+    keys: Sequence[PredictionKey],
+    today: date,
+) -> Dict[PredictionKey, Dict[str, object]]:
+    """
+    keys 별로 run_prediction 의 미스 경로(_flight → _predict_and_store)를 최대 PRED_BATCH_CONCURRENCY 개 동시에 실행
+    session 은 thread 간에 나눠 쓸 수 없으므로 thread 마다 db 와 같은 engine 으로 새로 엶
+    """
+    def predict(key: PredictionKey) -> Tuple[PredictionKey, Dict[str, object]]:
+        code, horizon = key
+        ticker, pred_date = tickers[code], today + timedelta(days=horizon)
+        with SessionLocal(bind=db.get_bind()) as tdb:
+            return key, dict(_flight.do(
+                (code, horizon, pred_date),
+                lambda: _predict_and_store(tdb, ticker, horizon, pred_date, op="run_prediction_batch"),
+            ))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(PRED_BATCH_CONCURRENCY, len(keys)))) as pool:
+        # 요청별 쿼리 집계(track_queries) 등 context 를 worker thread 로 넘김
+        futures = [pool.submit(contextvars.copy_context().run, predict, key) for key in keys]
+        return dict(f.result() for f in futures)
+
+def _find_cached(db: Session, ticker_id: int, horizon: int, pred_date: date) -> Prediction | None:
+    return db.execute(
+        select(Prediction)
+        .where(
+            Prediction.ticker_id == ticker_id,
+            Prediction.horizon_days == horizon,
+            Prediction.predicted_date == pred_date
+        )
+    ).scalar_one_or_none()
+
+def _find_latest(
+    db: Session,
+    keys: Sequence[Tuple[int, int]],
+    since: Optional[date] = None,
+    before: Optional[date] = None,
+) -> Dict[Tuple[int, int], Tuple[date, float]]:
+    """
+    (ticker_id, horizon) 별로 가장 최근 predicted_date 의 저장된 예측 → {key: (predicted_date, result)}
+    since <= predicted_date < before 범위 안에서만 찾음 (None 이면 제한 없음)
+    """
+    conditions = [
+        Prediction.ticker_id.in_({tid for tid, _ in keys}),
+        Prediction.horizon_days.in_({h for _, h in keys}),
+    ]
+    if since is not None:
+        conditions.append(Prediction.predicted_date >= since)
+    if before is not None:
+        conditions.append(Prediction.predicted_date < before)
+    latest = (
+        select(Prediction.ticker_id, Prediction.horizon_days,
+               func.max(Prediction.predicted_date).label("predicted_date"))
+        .where(*conditions)
+        .group_by(Prediction.ticker_id, Prediction.horizon_days)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Prediction.ticker_id, Prediction.horizon_days, Prediction.predicted_date,
+               Prediction.prediction_result)
+        .join(latest, (Prediction.ticker_id == latest.c.ticker_id)
+              & (Prediction.horizon_days == latest.c.horizon_days)
+              & (Prediction.predicted_date == latest.c.predicted_date))
+    ).all()
+    wanted = set(keys)
+    return {(tid, h): (d, r) for tid, h, d, r in rows if (tid, h) in wanted}
+
+def _fallback(latest: Optional[Tuple[date, float]], pred_date: date) -> Dict[str, object]:
+    """모델 서버 실패 시 응답: 마지막으로 저장된 예측 (그 predicted_date 그대로, stale), 없으면 0.0"""
+    if latest is None:
+        return {"predicted_date": pred_date.isoformat(), "result": 0.0}
+    return {"predicted_date": latest[0].isoformat(), "result": latest[1], "stale": True}
+
+def _serve_stale(db: Session, ticker: TickerInfo, horizon: int, pred_date: date) -> Dict[str, object] | None:
+    """
+    오늘 키(pred_date)가 없을 때 MAX_STALE_DAYS 이내의 가장 최근 예측이 있으면
+    백그라운드 갱신을 걸고 그 예측을 stale 로 반환. 없으면 None (호출자가 모델 서버를 기다림)
+    """
+    stale = _serve_stale_many(db, {ticker.ticker_code: ticker}, [(ticker.ticker_code, horizon)],
+                              pred_date - timedelta(days=horizon), op="run_prediction")
+    return stale.get((ticker.ticker_code, horizon))
+
+def _serve_stale_many(
+    db: Session,
+    tickers: Dict[str, TickerInfo | None],
+    keys: Sequence[PredictionKey],
+    today: date,
+    op: str = "run_prediction_batch",
+) -> Dict[PredictionKey, Dict[str, object]]:
+    """_serve_stale 의 여러 key 버전 (쿼리 1회)"""
+    max_stale = revalidate.MAX_STALE_DAYS
+    if max_stale <= 0 or not keys:
+        return {}
+    horizons = [h for _, h in keys]
+    latest = _find_latest(
+        db, [(tickers[code].id, h) for code, h in keys],
+        since=today + timedelta(days=min(horizons) - max_stale),
+        before=today + timedelta(days=max(horizons)),
+    )
+    results: Dict[PredictionKey, Dict[str, object]] = {}
+    for code, horizon in keys:
+        pred_date = today + timedelta(days=horizon)
+        found = latest.get((tickers[code].id, horizon))
+        if found is None or not pred_date - timedelta(days=max_stale) <= found[0] < pred_date:
+            continue
+        results[(code, horizon)] = _fallback(found, pred_date)
+        metrics.count_cache(op, True, stale=True)
+        revalidate.revalidator.submit(("pred", code, horizon, pred_date),
+                                      functools.partial(refresh_prediction, code, horizon))
+    return results
+
+def _predict_and_store(
+    db: Session,
+    ticker: TickerInfo,
+    horizon: int,
+    pred_date: date,
+    op: str = "run_prediction"
+) -> Dict[str, object]:
+    """single-flight leader 만 실행: 외부 API 호출 후 DB 저장"""
+    with db_advisory_lock(db, f"pred:{ticker.id}:{horizon}:{pred_date.isoformat()}"):
+        # 다른 worker 가 잠금을 잡고 있는 동안 이미 저장했을 수 있음
+        existing = _find_cached(db, ticker.id, horizon, pred_date)
+        if existing:
+            return {"predicted_date": pred_date.isoformat(), "result": existing.prediction_result}
+        # 모델 서버를 기다리는 동안 connection 을 pool 에 돌려줌 (배치는 이 구간을 여러 thread 에서 동시에 기다림)
+        db.commit()
+
         try:
-            print(api_url)
-            print(fetch_code)
-            resp = requests.get(
-                api_url,
-                params={"ticker": fetch_code, "horizon_days": horizon},
-                headers={"ngrok-skip-browser-warning": "true"},
-                timeout=60
-            )
-            resp.raise_for_status()
-            payload = resp.json()
+            with metrics.stage(op, "upstream_fetch"):
+                result = fetch_prediction(ticker, horizon)
         except Exception as e:
-            print("XAI API 안 띄웠거나 주소 잘못됨:", e)
-            return {"predicted_date": pred_date.isoformat(), "result": 0.0}
-
-        result = payload.get("prediction_result", 0.0)
+            # circuit 이 열려 있으면 네트워크 없이 바로 여기로 옴
+            logger.warning("XAI API 안 띄웠거나 주소 잘못됨: %s", e)
+            return _fallback(_find_latest(db, [(ticker.id, horizon)]).get((ticker.id, horizon)), pred_date)
 
         # Insert into DB with exception safety
         try:
@@ -93,18 +364,12 @@ def run_prediction(
                 horizon_days=horizon,
                 prediction_result=result
             )
-            db.add(pred)
-            db.commit()
+            with metrics.stage(op, "insert"):
+                db.add(pred)
+                db.commit()
         except IntegrityError:
             db.rollback()
-            existing = db.execute(
-                select(Prediction)
-                .where(
-                    Prediction.ticker_id == ticker.id,
-                    Prediction.horizon_days == horizon,
-                    Prediction.predicted_date == pred_date
-                )
-            ).scalar_one_or_none()
+            existing = _find_cached(db, ticker.id, horizon, pred_date)
 
             if existing:
                 return {"predicted_date": pred_date.isoformat(), "result": existing.prediction_result}
@@ -113,4 +378,16 @@ def run_prediction(
         return {
             "predicted_date": pred_date.isoformat(),
             "result": result
-        }
\ No newline at end of file
+        }
+
+def fetch_prediction(ticker: TickerInfo, horizon: int) -> float:
+    """모델 서버 /predict 호출. 실패하면 예외 (circuit 이 열려 있으면 CircuitOpenError)"""
+    # KOSPI 종목이면 .KS 붙여서 보냄
+    fetch_code = (
+        f"{ticker.ticker_code}.KS" if ticker.market.upper() == "KOSPI" else ticker.ticker_code
+    )
+
+    logger.debug("predict %s", fetch_code)
+    with metrics.upstream("model_predict"):
+        payload = model_client.get_json("predict", {"ticker": fetch_code, "horizon_days": horizon})
+    return payload.get("prediction_result", 0.0)
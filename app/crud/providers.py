@@ -0,0 +1,118 @@
+# app/crud/providers.py
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from typing import Dict, Protocol, Sequence
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+YF_INTERVALS = {1: "1d", 7: "1wk", 30: "1mo"}
+
+class MarketDataProvider(Protocol):
+    """
+    OHLCV DataFrame(Open/High/Low/Close/Volume, DatetimeIndex) 을 돌려주는 upstream
+    - end 는 포함하지 않음 (yfinance 와 동일)
+    """
+
+    def history(self, ticker: str, start: date, end: date, interval: int) -> pd.DataFrame: ...
+
+    def history_many(self, tickers: Sequence[str], start: date, end: date,
+                     interval: int) -> Dict[str, pd.DataFrame]: ...
+
+class YFinanceProvider:
+    """yfinance. history_many 는 yf.download 한 번으로 여러 종목을 받음"""
+
+    def history(self, ticker: str, start: date, end: date, interval: int) -> pd.DataFrame:
+        return yf.Ticker(ticker).history(start=start, end=end, interval=YF_INTERVALS[interval])
+
+    def history_many(self, tickers: Sequence[str], start: date, end: date,
+                     interval: int) -> Dict[str, pd.DataFrame]:
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        wide = yf.download(
+            tickers,
+            start=start,
+            end=end,
+            interval=YF_INTERVALS[interval],
+            group_by="ticker",
+            auto_adjust=True,   # Ticker.history 기본값과 맞춤
+            threads=True,
+            progress=False,
+        )
+        return split_wide_frame(wide, tickers)
+
+def split_wide_frame(wide: pd.DataFrame, tickers: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """yf.download(group_by="ticker") 의 (ticker, field) 컬럼 frame 을 종목별 frame 으로 분리"""
+    if wide is None or wide.empty:
+        return {t: pd.DataFrame() for t in tickers}
+    if not isinstance(wide.columns, pd.MultiIndex):
+        # 단일 종목 + multi_level_index=False 인 경우
+        return {tickers[0]: wide.dropna(how="all")}
+
+    present = set(wide.columns.get_level_values(0))
+    return {
+        t: wide[t].dropna(how="all") if t in present else pd.DataFrame()
+        for t in tickers
+    }
+
+class FakeProvider:
+    """
+    테스트·벤치마크용 결정적(random-walk) provider
+    - latency: upstream 호출 1회당 대기 시간 (batch 여부와 무관하게 1회)
+    - calls: history / history_many 호출 기록
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency
+        self.seed = seed
+        self.calls: list = []
+        self._lock = threading.Lock()
+
+    def _frame(self, ticker: str, start: date, end: date, interval: int) -> pd.DataFrame:
+        freq = {1: "B", 7: "W-MON", 30: "MS"}[interval]
+        index = pd.date_range(start, end - timedelta(days=1), freq=freq)
+        rng = np.random.default_rng(zlib.crc32(f"{self.seed}:{ticker}".encode()))
+        close = 100 + rng.standard_normal(len(index)).cumsum()
+        return pd.DataFrame(
+            {
+                "Open": close - 0.5,
+                "High": close + 1.0,
+                "Low": close - 1.0,
+                "Close": close,
+                "Volume": rng.integers(1_000, 1_000_000, len(index)),
+            },
+            index=index,
+        )
+
+    def _record(self, kind: str, tickers: Sequence[str]) -> None:
+        with self._lock:
+            self.calls.append((kind, list(tickers)))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def history(self, ticker: str, start: date, end: date, interval: int) -> pd.DataFrame:
+        self._record("history", [ticker])
+        return self._frame(ticker, start, end, interval)
+
+    def history_many(self, tickers: Sequence[str], start: date, end: date,
+                     interval: int) -> Dict[str, pd.DataFrame]:
+        self._record("history_many", tickers)
+        return {t: self._frame(t, start, end, interval) for t in tickers}
+
+# market -> provider. 테스트/벤치마크에서는 set_provider 로 교체
+_providers: Dict[str, MarketDataProvider] = {"US": YFinanceProvider()}
+
+def get_provider(market: str) -> MarketDataProvider:
+    return _providers[market.upper()]
+
+def set_provider(market: str, provider: MarketDataProvider) -> MarketDataProvider:
+    """provider 를 교체하고 이전 provider 를 반환"""
+    previous = _providers.get(market.upper())
+    _providers[market.upper()] = provider
+    return previous
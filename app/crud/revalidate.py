@@ -0,0 +1,55 @@
+# app/crud/revalidate.py
+"""
+stale-while-revalidate 용 백그라운드 갱신
+- 예측 / 설명은 캐시 키가 (ticker, horizon, 오늘 + horizon) 이라 자정이 지나면 전부 미스가 됨
+  오늘 키가 없으면 MAX_STALE_DAYS 이내의 가장 최근 행으로 바로 응답(stale 표시)하고,
+  모델 서버 호출 + 저장은 여기 thread pool 에서 실행
+- 같은 key 가 대기 / 실행 중이면 다시 넣지 않음 (worker 간 중복은 single-flight / advisory lock 이 막음)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 오늘 키가 없을 때 대신 응답할 수 있는 최대 경과 일수 (0 이면 stale 응답 없이 모델 서버를 기다림)
+MAX_STALE_DAYS = int(os.getenv("MAX_STALE_DAYS", "3"))
+REVALIDATE_WORKERS = int(os.getenv("REVALIDATE_WORKERS", "4"))
+
+class Revalidator:
+    def __init__(self, workers: int = REVALIDATE_WORKERS) -> None:
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="revalidate")
+
+    def submit(self, key: Hashable, fn: Callable[[], Any]) -> Optional[Future]:
+        """fn 을 백그라운드에서 실행. 같은 key 가 이미 진행 중이면 None"""
+        with self._lock:
+            if key in self._pending:
+                return None
+            self._pending.add(key)
+        try:
+            return self._pool.submit(self._run, key, fn)
+        except BaseException:
+            with self._lock:
+                self._pending.discard(key)
+            raise
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        try:
+            return fn()
+        except Exception:
+            logger.exception("revalidate %s failed", key)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+revalidator = Revalidator()
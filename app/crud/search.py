@@ -0,0 +1,250 @@
+# app/crud/search.py
+from __future__ import annotations
+
+import heapq
+import threading
+import weakref
+from bisect import bisect_left
+from typing import AbstractSet, Callable, Collection, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models.ticker import Ticker
+
+from app.crud import hangul
+from app.crud.tickers import TickerInfo, ticker_registry
+
+# S&P 500 시가총액 상위 + 검색량 많은 종목 + 대표 섹터별 종목 조합 50개
+POPULAR_TICKERS = [
+    "AAPL", "MSFT", "GOOG", "AMZN", "TSLA", "NVDA", "META", "NFLX", "BRK-B",
+    "JPM", "V", "JNJ", "UNH", "PG", "MA", "HD", "DIS", "ADBE", "PYPL", "BAC",
+    "XOM", "INTC", "T", "KO", "PFE", "WMT", "CRM", "CVX", "PEP", "MRK", "ABT",
+    "ORCL", "QCOM", "LLY", "CSCO", "MCD", "TMO", "COST", "NKE", "DHR", "ACN",
+    "AVGO", "TXN", "AMD", "SBUX", "AMAT", "INTU", "GE", "HON", "ISRG", "BA"
+]
+
+SEARCH_LIMIT = 10
+
+def _fold(s: Optional[str]) -> str:
+    return (s or "").lower()
+
+class _PrefixRange:
+    """정렬 배열의 [lo, hi) 구간. 복사 없이 len / iter / in 을 지원"""
+
+    __slots__ = ("_index", "_lo", "_hi")
+
+    def __init__(self, index: "_PrefixIndex", lo: int, hi: int) -> None:
+        self._index, self._lo, self._hi = index, lo, hi
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index._order[self._lo:self._hi])
+
+    def __contains__(self, i: int) -> bool:
+        pos = self._index._position[i]
+        return pos is not None and self._lo <= pos < self._hi
+
+class _PrefixIndex:
+    """정렬된 키 배열 + bisect. 빈 키는 색인하지 않음"""
+
+    def __init__(self, keys: Sequence[str]) -> None:
+        self._order = sorted((i for i, k in enumerate(keys) if k), key=keys.__getitem__)
+        self._keys = [keys[i] for i in self._order]
+        self._position: List[Optional[int]] = [None] * len(keys)
+        for pos, i in enumerate(self._order):
+            self._position[i] = pos
+
+    def __call__(self, prefix: str) -> _PrefixRange:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        return _PrefixRange(self, lo, hi)
+
+class _SubstringIndex:
+    """문자 unigram/bigram → 종목 번호 posting. 한 종목이 여러 텍스트(코드, 이름)를 가질 수 있음"""
+
+    def __init__(self, texts: Sequence[tuple]) -> None:
+        self._texts = texts
+        grams: dict[str, set] = {}
+        for i, row in enumerate(texts):
+            for text in row:
+                # 한 글자 질의도 posting 으로 답하도록 unigram 도 함께 색인
+                for g in set(text) | {text[j:j + 2] for j in range(len(text) - 1)}:
+                    grams.setdefault(g, set()).add(i)
+        self._postings = {g: frozenset(ids) for g, ids in grams.items()}
+
+    def __call__(self, q: str) -> tuple[AbstractSet[int], Optional[Callable[[int], bool]]]:
+        """(후보, 확인 함수). 확인 함수가 None 이면 후보가 모두 매칭"""
+        if len(q) == 1:
+            return self._postings.get(q, frozenset()), None
+        postings = [self._postings.get(q[j:j + 2], frozenset()) for j in range(len(q) - 1)]
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(q) == 2:
+            return candidates, None
+        # bigram 이 모두 있어도 연속으로 붙어 있다는 보장은 없으므로 실제 포함 여부 확인 (순위 안에 드는 후보만)
+        return candidates, lambda i: any(q in text for text in self._texts[i])
+
+class SearchIndex:
+    """
+    ticker 스냅샷 위의 불변 검색 인덱스
+    - prefix: ticker_code / company_name 을 소문자로 정렬한 배열 + bisect
+    - substring: 문자 bigram → 종목 번호 posting. 질의 bigram posting 교집합을 후보로 두고 `in` 으로 확인
+    - 한글 종목명(KOSPI)은 자모 분해 / 초성 / 로마자 키도 같은 방식으로 색인 (app.crud.hangul)
+    순위: 코드 일치 > 코드 prefix > 이름 prefix > 부분 문자열 > 한글 키 prefix > 한글 키 부분 문자열
+      같은 구간 안에서는 POPULAR_TICKERS 우선
+    앞의 네 구간이 DB 경로(ILIKE '%kw%' on code OR name)와 같은 매칭이고, 한글 키 매칭은 그 뒤에만 붙음
+    """
+
+    def __init__(self, tickers: Iterable[TickerInfo], popular: Sequence[str] = POPULAR_TICKERS) -> None:
+        self.entries: List[TickerInfo] = sorted(tickers, key=lambda t: t.ticker_code)
+        codes = [_fold(t.ticker_code) for t in self.entries]
+        names = [_fold(t.company_name) for t in self.entries]
+        self._by_code = {code: i for i, code in enumerate(codes)}
+        rank = {code: r for r, code in enumerate(popular)}
+        popularity = [rank.get(t.ticker_code, len(popular)) for t in self.entries]
+        self._popular_ids = sorted(
+            (i for i, r in enumerate(popularity) if r < len(popular)),
+            key=popularity.__getitem__,
+        )
+        # 같은 구간 안의 순서: 인기 종목(목록 순) > 짧은 코드 > 코드 알파벳 순. 미리 정수 순위로 계산
+        by_rank = sorted(
+            range(len(self.entries)),
+            key=lambda i: (popularity[i], len(codes[i]), codes[i]),
+        )
+        self._by_rank = by_rank
+        self._rank = [0] * len(self.entries)
+        for r, i in enumerate(by_rank):
+            self._rank[i] = r
+
+        self._code_prefix = _PrefixIndex(codes)
+        self._name_prefix = _PrefixIndex(names)
+        self._substring = _SubstringIndex(list(zip(codes, names)))
+
+        hangul_names = [name if hangul.has_hangul(name) else "" for name in names]
+        self.hangul_entries = sum(1 for n in hangul_names if n)
+        alt_keys = {
+            "jamo": [hangul.decompose(n) for n in hangul_names],
+            "chosung": [hangul.chosung(n) for n in hangul_names],
+            "roman": [hangul.fold_roman(hangul.romanize(n)) for n in hangul_names],
+        }
+        self._alt_prefix = {kind: _PrefixIndex(keys) for kind, keys in alt_keys.items()}
+        self._alt_substring = {kind: _SubstringIndex([(k,) for k in keys]) for kind, keys in alt_keys.items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _alt_queries(q: str) -> List[tuple[str, str]]:
+        """질의를 어느 한글 키로 찾을지: 한글 → 자모(+초성), 영문 → 로마자"""
+        if hangul.has_hangul(q):
+            queries = [("jamo", hangul.decompose(q))]
+            if hangul.is_chosung_query(q):
+                queries.append(("chosung", q))
+            return queries
+        # 한 글자 로마자는 거의 모든 한글 종목명에 걸리므로 두 글자부터
+        roman = hangul.fold_roman(q)
+        return [("roman", roman)] if len(roman) >= 2 else []
+
+    def _tiers(self, q: str) -> Iterator[tuple[Collection[int], Optional[Callable[[int], bool]]]]:
+        """구간별 (후보, 확인 함수). 뒤 구간은 필요할 때만 계산되도록 generator"""
+        yield self._code_prefix(q), None
+        yield self._name_prefix(q), None
+        yield self._substring(q)
+        alt = self._alt_queries(q)
+        for kind, key in alt:
+            yield self._alt_prefix[kind](key), None
+        for kind, key in alt:
+            yield self._alt_substring[kind](key)
+
+    def _take(self, candidates: Collection[int], verify, need: int, seen: set) -> List[int]:
+        """후보 중 아직 안 뽑힌 매칭을 순위 순으로 최대 need 개"""
+        # 후보가 전체의 일부면 후보만 확인해 상위 need 개를 고름
+        if len(candidates) * 16 < len(self.entries) or len(candidates) <= need * 8:
+            matched = (i for i in candidates if i not in seen and (verify is None or verify(i)))
+            return heapq.nsmallest(need, matched, key=self._rank.__getitem__)
+        # 후보가 전체의 상당 부분이면(짧은 질의) 전체 순위 순으로 훑다가 need 개가 차면 중단
+        picked = []
+        for i in self._by_rank:
+            if i in candidates and i not in seen and (verify is None or verify(i)):
+                picked.append(i)
+                if len(picked) == need:
+                    break
+        return picked
+
+    def search(self, keyword: Optional[str], limit: Optional[int] = SEARCH_LIMIT) -> List[TickerInfo]:
+        if not keyword:
+            # 키워드가 없으면 인기 종목 전체 (DB 경로와 같이 limit 미적용)
+            return [self.entries[i] for i in self._popular_ids]
+        q = _fold(keyword)
+        remaining = len(self.entries) if limit is None else limit
+
+        exact = self._by_code.get(q)
+        taken: List[int] = [] if exact is None else [exact]
+        seen = set(taken)
+        # 구간 순서대로 채우다 limit 에 닿으면 중단 → 뒤 구간(특히 부분 문자열)은 계산하지 않음
+        tiers = self._tiers(q)
+        while len(taken) < remaining:
+            tier = next(tiers, None)
+            if tier is None:
+                break
+            candidates, verify = tier
+            picked = self._take(candidates, verify, remaining - len(taken), seen)
+            taken.extend(picked)
+            seen.update(picked)
+        return [self.entries[i] for i in taken]
+
+class TickerSearch:
+    """ticker_registry 스냅샷이 바뀔 때만 SearchIndex 를 다시 만듦 (registry 와 같이 DB engine 별)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # engine → (인덱스를 만든 스냅샷, 인덱스). 한 번에 교체
+        self._built: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def index(self, db: Session) -> SearchIndex:
+        source = ticker_registry.all(db)
+        bind = db.get_bind()
+        built = self._built.get(bind)
+        if built is not None and built[0] is source:
+            return built[1]
+        with self._lock:
+            built = self._built.get(bind)
+            if built is None or built[0] is not source:
+                built = (source, SearchIndex(source.values()))
+                self._built[bind] = built
+            return built[1]
+
+    def search(self, db: Session, keyword: Optional[str], limit: Optional[int] = SEARCH_LIMIT) -> List[TickerInfo]:
+        return self.index(db).search(keyword, limit)
+
+    async def aindex(self, db: AsyncSession) -> SearchIndex:
+        return await db.run_sync(self.index)
+
+    async def asearch(self, db: AsyncSession, keyword: Optional[str], limit: Optional[int] = SEARCH_LIMIT) -> List[TickerInfo]:
+        return await db.run_sync(self.search, keyword, limit)
+
+ticker_search = TickerSearch()
+
+def rebuild_search_index(db: Session) -> SearchIndex:
+    """
+    seed 스크립트 실행 후 호출: 이 프로세스의 ticker 스냅샷을 버리고 검색 인덱스를 다시 만듦
+    API 프로세스는 seed 가 올린 ticker_version 을 보고 TICKER_REGISTRY_TTL 안에 같은 방식으로 다시 만듦
+    """
+    ticker_registry.invalidate()
+    return ticker_search.index(db)
+
+def search_tickers_db(db: Session, keyword: Optional[str], limit: Optional[int] = SEARCH_LIMIT) -> List[Ticker]:
+    """이전 /search 구현 (ILIKE 스캔). 인덱스 결과 비교와 benchmark 용"""
+    if keyword:
+        query = db.query(Ticker).filter(
+            or_(
+                Ticker.ticker_code.ilike(f"%{keyword}%"),
+                Ticker.company_name.ilike(f"%{keyword}%")
+            )
+        )
+        return query.limit(limit).all() if limit is not None else query.all()
+    return db.query(Ticker).filter(Ticker.ticker_code.in_(POPULAR_TICKERS)).all()
@@ -0,0 +1,96 @@
+# app/crud/singleflight.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# "1" 이면 MySQL GET_LOCK 으로 uvicorn worker 간에도 upstream 호출을 하나로 묶음
+SINGLEFLIGHT_DB_LOCK = os.getenv("SINGLEFLIGHT_DB_LOCK", "0") == "1"
+SINGLEFLIGHT_LOCK_TIMEOUT = int(os.getenv("SINGLEFLIGHT_LOCK_TIMEOUT", "60"))
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+class SingleFlight:
+    """
+    같은 key 로 동시에 들어온 호출 중 하나(leader)만 fn 을 실행하고
+    나머지(waiter)는 그 결과(또는 예외)를 그대로 공유
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+@contextmanager
+def db_advisory_lock(db: Session, name: str, timeout: int | None = None):
+    """
+    worker 프로세스 간 single-flight 용 DB 잠금 (MySQL GET_LOCK)
+    - SINGLEFLIGHT_DB_LOCK 이 꺼져 있거나 MySQL 이 아니면 아무것도 하지 않음
+    - GET_LOCK 은 connection 단위이므로 session 과 별도의 connection 을 잡고 유지
+      (session 의 connection 은 commit 때 pool 로 돌아가 다른 요청이 잠금을 물려받을 수 있음)
+      → 기다리는 요청 하나가 pool connection 2개를 씀. DB_POOL_SIZE / DB_MAX_OVERFLOW 는 이를 감안해 잡음
+    - 잠금을 기다린 뒤 session 의 transaction 을 끝냄: MySQL 기본 REPEATABLE READ 에서는 잠금 전에 읽은
+      snapshot 이 유지되어, 잠금을 쥐었던 worker 가 그사이 저장한 행이 다시 조회해도 보이지 않음
+    - timeout 안에 못 얻으면 잠금 없이 진행 (중복 insert 는 IntegrityError 처리에 맡김)
+    """
+    bind = db.get_bind()
+    if not SINGLEFLIGHT_DB_LOCK or bind.dialect.name != "mysql":
+        yield False
+        return
+
+    timeout = SINGLEFLIGHT_LOCK_TIMEOUT if timeout is None else timeout
+    name = name[:64]  # MySQL lock 이름 최대 길이
+    with bind.connect() as conn:
+        acquired = conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}
+        ).scalar() == 1
+        if not acquired:
+            logger.warning("advisory lock %s not acquired in %ss", name, timeout)
+        # 이후 "이미 저장됐나" 재확인이 새 snapshot 을 보도록 (session 은 여기까지 조회만 함)
+        db.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
@@ -0,0 +1,264 @@
+# app/crud/stream.py
+"""
+새 ChartData bar / News 행을 구독자에게 push 하는 fan-out hub (/stock-info/stream, SSE)
+
+- 구독 중인 ticker 마다 poller task 1개가 DB 에서 마지막으로 보낸 이후의 행만 읽어 모든 구독자에게 복사
+  → 구독자 수와 무관하게 ticker 당 poll 1회 (DB 쿼리 2개)
+- 같은 프로세스에서 수집한 경우(요청 경로 / INGEST_SCHEDULER=inprocess) notify 로 바로 깨우고,
+  별도 scheduler 프로세스가 저장한 행은 STREAM_POLL_SEC 안에 읽힘
+- 구독자마다 크기 STREAM_QUEUE_SIZE 인 queue. 가득 차면(느린 client) 쌓인 event 를 버리고 resync 1개만 남김
+  → 느린 구독자가 poller 나 다른 구독자를 막지 않고, client 는 resync 를 받으면 /stock-info/basic 을 다시 조회
+- poller 는 마지막 구독자가 나가면 종료
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models.chart_data import ChartData
+from db.models.news import News
+
+from app.crud.aggregate import AGG_INTERVALS, period_start
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.crud.utils import get_async_session
+
+logger = logging.getLogger(__name__)
+
+# 구독 ticker 별 DB poll 주기 (초). 같은 프로세스에서 저장한 행은 notify 로 바로 전달
+STREAM_POLL_SEC = float(os.getenv("STREAM_POLL_SEC", "5"))
+# 구독자별 대기 event 수. 넘치면 resync
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+# poll 한 번에 보내는 최대 뉴스 수
+STREAM_NEWS_LIMIT = 50
+# 연결이 끊겼을 때 EventSource 의 재연결 대기 (ms)
+STREAM_RETRY_MS = 3000
+
+@dataclass(frozen=True)
+class UpdateCursor:
+    """ticker 별로 마지막으로 보낸 일봉 날짜 / 뉴스 id"""
+    daily: Optional[date]
+    news_id: Optional[int]
+
+Fetch = Callable[[str, Optional[UpdateCursor]], Awaitable[Tuple[List[Dict], Optional[UpdateCursor]]]]
+
+async def updates_since_async(ticker_code: str,
+                              cursor: Optional[UpdateCursor],
+                              session: AsyncSession | None = None) -> Tuple[List[Dict], Optional[UpdateCursor]]:
+    """
+    cursor 이후 저장된 bar / 뉴스 event 와 다음 cursor 반환
+    - cursor=None: 현재 위치만 반환 (구독 시작 시점 이전 데이터는 /stock-info/basic 으로 받음)
+    - 종목이 없으면 ([], None)
+    """
+    async with get_async_session(session) as db:
+        ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
+        if ticker is None:
+            return [], None
+        return await db.run_sync(updates_since, ticker, cursor)
+
+def updates_since(db: Session,
+                  ticker: TickerInfo,
+                  cursor: Optional[UpdateCursor]) -> Tuple[List[Dict], UpdateCursor]:
+    if cursor is None:
+        daily, news_id = db.execute(select(
+            select(func.max(ChartData.date))
+            .where(ChartData.ticker_id == ticker.id, ChartData.interval == 1)
+            .scalar_subquery(),
+            select(func.max(News.id)).where(News.ticker_id == ticker.id).scalar_subquery(),
+        )).one()
+        return [], UpdateCursor(daily, news_id)
+
+    events: List[Dict] = []
+    daily = cursor.daily
+    # 새 일봉이 들어오면 그 일봉이 속한 주봉 / 월봉도 다시 집계되므로 함께 보냄
+    since = cursor.daily + timedelta(days=1) if cursor.daily else date.min
+    bars = db.execute(
+        select(ChartData)
+        .where(
+            ChartData.ticker_id == ticker.id,
+            or_(*(
+                and_(ChartData.interval == itv, ChartData.date >= period_start(since, itv))
+                for itv in (1, *AGG_INTERVALS)
+            )),
+        )
+        .order_by(ChartData.interval, ChartData.date)
+    ).scalars().all()
+    new_daily = [b.date for b in bars if b.interval == 1]
+    if new_daily:
+        # 조회 범위는 cursor 다음 날 기준이라 바뀌지 않은 주봉/월봉이 섞일 수 있음 → 첫 새 일봉 기준으로 거름
+        first = min(new_daily)
+        for b in bars:
+            if b.date < period_start(first, b.interval):
+                continue
+            events.append({
+                "type": "chart",
+                "ticker": ticker.ticker_code,
+                "interval": b.interval,
+                "bar": {
+                    "date": b.date.isoformat(), "open": b.open, "high": b.high, "low": b.low,
+                    "close": b.close, "volume": b.volume, "change": b.change,
+                },
+            })
+        daily = max(new_daily)
+
+    news_id = cursor.news_id
+    rows = db.execute(
+        select(News)
+        .where(News.ticker_id == ticker.id, News.id > (cursor.news_id or 0))
+        .order_by(News.id)
+        .limit(STREAM_NEWS_LIMIT)
+    ).scalars().all()
+    for n in rows:
+        events.append({
+            "type": "news",
+            "ticker": ticker.ticker_code,
+            "item": {
+                "title": n.title, "summary": n.summary, "link": n.link,
+                "pubDate": n.pub_date.isoformat(), "provider": n.provider,
+            },
+        })
+        news_id = n.id
+    return events, UpdateCursor(daily, news_id)
+
+class Subscriber:
+    """구독자 1명의 bounded queue"""
+
+    def __init__(self, tickers: List[str], maxsize: int) -> None:
+        self.tickers = tickers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.resyncs = 0
+
+    def offer(self, event: Dict) -> bool:
+        """queue 에 넣고, 가득 차 있으면 쌓인 event 를 버리고 resync 로 대체. 버렸으면 False"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync", "tickers": self.tickers})
+            self.resyncs += 1
+            return False
+
+class UpdateHub:
+    def __init__(self,
+                 fetch: Fetch = updates_since_async,
+                 poll_interval: float = STREAM_POLL_SEC,
+                 queue_size: int = STREAM_QUEUE_SIZE) -> None:
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._subs: Dict[str, Set[Subscriber]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._stats = {"polls": 0, "events": 0, "resyncs": 0}
+
+    async def subscribe(self, tickers: List[str]) -> Subscriber:
+        """
+        이벤트 루프에서 호출. 새 ticker 면 현재 위치를 읽은 뒤 poller 시작
+        반환 이후 저장된 행은 모두 전달되므로 client 는 구독 후 /stock-info/basic 을 읽으면 빈틈이 없음
+        없는 종목이 있으면 LookupError
+        """
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(tickers, self.queue_size)
+        try:
+            for code in tickers:
+                if code not in self._pollers:
+                    _, cursor = await self.fetch(code, None)
+                    if cursor is None:
+                        raise LookupError(code)
+                    if code not in self._pollers:   # 기다리는 동안 다른 구독자가 시작했을 수 있음
+                        self._subs[code] = set()
+                        self._wakeups[code] = asyncio.Event()
+                        self._pollers[code] = asyncio.create_task(self._poll(code, cursor))
+                self._subs[code].add(sub)
+        except BaseException:
+            self.unsubscribe(sub)
+            raise
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        """여러 번 호출해도 안전"""
+        for code in sub.tickers:
+            subs = self._subs.get(code)
+            if subs is None:
+                continue
+            subs.discard(sub)
+            if not subs:
+                self._pollers.pop(code).cancel()
+                del self._subs[code], self._wakeups[code]
+
+    def notify(self, ticker_code: str) -> None:
+        """ticker 의 새 행을 저장한 직후 호출 (어느 스레드에서나). 구독 중이면 poller 를 바로 깨움"""
+        loop, wakeup = self._loop, self._wakeups.get(ticker_code)
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(wakeup.set)
+
+    def publish(self, ticker_code: str, events: List[Dict]) -> None:
+        """ticker 구독자 모두에게 복사 (이벤트 루프에서 호출)"""
+        resyncs = 0
+        for sub in list(self._subs.get(ticker_code, ())):
+            for event in events:
+                if not sub.offer(event):
+                    resyncs += 1
+                    break   # 이번 묶음의 나머지는 resync 로 대체됨
+        with self._lock:
+            self._stats["events"] += len(events)
+            self._stats["resyncs"] += resyncs
+
+    async def _poll(self, ticker_code: str, cursor: Optional[UpdateCursor]) -> None:
+        wakeup = self._wakeups[ticker_code]
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                events, cursor = await self.fetch(ticker_code, cursor)
+                with self._lock:
+                    self._stats["polls"] += 1
+                if events:
+                    self.publish(ticker_code, events)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("stream poll failed: %s", ticker_code)
+
+    async def stream(self, sub: Subscriber, heartbeat: float) -> AsyncIterator[str]:
+        """
+        SSE 본문: event 마다 "event: <type>" + JSON data, heartbeat 초 동안 event 가 없으면 ": ping" 주석
+        (proxy / load balancer 의 idle timeout 으로 연결이 끊기지 않도록). 끝나면 구독 해제
+        """
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["tickers"] = len(self._pollers)
+        stats["subscribers"] = len({id(s) for subs in self._subs.values() for s in subs})
+        return stats
+
+update_hub = UpdateHub()
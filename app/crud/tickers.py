@@ -0,0 +1,121 @@
+# app/crud/tickers.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models.ticker import Ticker
+from db.models.app_meta import AppMeta, TICKER_VERSION_KEY
+
+logger = logging.getLogger(__name__)
+
+# ticker_version 을 다시 확인하는 주기 (초). seed 실행 후 최대 이만큼 늦게 반영
+TICKER_REGISTRY_TTL = float(os.getenv("TICKER_REGISTRY_TTL", "60"))
+
+@dataclass(frozen=True)
+class TickerInfo:
+    id: int
+    ticker_code: str
+    company_name: Optional[str]
+    market: str
+
+@dataclass(frozen=True)
+class _Snapshot:
+    version: Optional[str]
+    checked_at: float
+    by_code: Mapping[str, TickerInfo]
+
+class TickerRegistry:
+    """
+    ticker_code → (id, market, name) 불변 스냅샷
+    - 처음 쓰일 때(또는 startup 에서) ticker 테이블 전체를 한 번 읽음
+    - TTL 마다 app_meta.ticker_version 한 행만 확인하고, seed 스크립트가 version 을 올렸으면 다시 로드
+    - 스냅샷은 DB(engine) 별로 보관 → 테스트처럼 다른 DB 의 session 이 들어와도 섞이지 않음
+    """
+
+    def __init__(self, ttl: float = TICKER_REGISTRY_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshots: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def get(self, db: Session, ticker_code: str) -> TickerInfo | None:
+        snap = self._snapshot(db)
+        info = snap.by_code.get(ticker_code)
+        if info is None:
+            # version bump 전에 추가된 종목일 수 있으므로 한 번 확인 후 있으면 다시 로드
+            exists = db.execute(
+                select(Ticker.id).where(Ticker.ticker_code == ticker_code)
+            ).first()
+            if exists:
+                info = self._load(db, snap.version).by_code.get(ticker_code)
+        return info
+
+    def all(self, db: Session) -> Mapping[str, TickerInfo]:
+        return self._snapshot(db).by_code
+
+    # async 경로: 스냅샷이 유효하면 DB 를 건드리지 않고, version 확인/로드만 AsyncSession 으로 실행
+    async def aget(self, db: AsyncSession, ticker_code: str) -> TickerInfo | None:
+        return await db.run_sync(self.get, ticker_code)
+
+    async def aall(self, db: AsyncSession) -> Mapping[str, TickerInfo]:
+        return await db.run_sync(self.all)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def _snapshot(self, db: Session) -> _Snapshot:
+        bind = db.get_bind()
+        snap = self._snapshots.get(bind)
+        now = time.monotonic()
+        if snap is not None and now - snap.checked_at < self.ttl:
+            return snap
+
+        version = self._read_version(db)
+        # version 행이 없으면(seed 가 아직 version 을 올린 적 없음) TTL 마다 다시 로드
+        if snap is not None and version is not None and version == snap.version:
+            snap = replace(snap, checked_at=now)
+            self._snapshots[bind] = snap
+            return snap
+        return self._load(db, version)
+
+    def _read_version(self, db: Session) -> Optional[str]:
+        try:
+            return db.execute(
+                select(AppMeta.value).where(AppMeta.key == TICKER_VERSION_KEY)
+            ).scalar_one_or_none()
+        except SQLAlchemyError:
+            # app_meta 테이블이 아직 없는 DB (init_db 전) → version 없음으로 취급
+            logger.warning("app_meta table missing; ticker registry reloads every TTL")
+            return None
+
+    def _load(self, db: Session, version: Optional[str]) -> _Snapshot:
+        # 쿼리는 lock 밖에서: AsyncSession.run_sync 로 들어오면 이벤트 루프 스레드에서 I/O 를 기다리므로
+        # 그동안 lock 을 잡고 있으면 같은 스레드의 다른 요청이 lock 에서 루프 전체를 멈춤
+        rows = db.execute(
+            select(Ticker.id, Ticker.ticker_code, Ticker.company_name, Ticker.market)
+        ).all()
+        snap = _Snapshot(
+            version=version,
+            checked_at=time.monotonic(),
+            by_code=MappingProxyType({
+                code: TickerInfo(id=tid, ticker_code=code, company_name=name, market=market)
+                for tid, code, name, market in rows
+            }),
+        )
+        with self._lock:
+            self._snapshots[db.get_bind()] = snap
+        return snap
+
+ticker_registry = TickerRegistry()
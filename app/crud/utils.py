@@ -1,6 +1,7 @@
 # app/crud/utils.py
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from db.session import SessionLocal
 
@@ -14,3 +15,13 @@ def get_session(ext_session: Optional[Session] = None):
             yield session
         finally:
             session.close()
+
+@asynccontextmanager
+async def get_async_session(ext_session: Optional[AsyncSession] = None):
+    if ext_session:
+        yield ext_session
+    else:
+        # sync 스크립트가 async driver 없이도 app.crud 를 import 할 수 있도록 여기서 import
+        from db.async_session import AsyncSessionLocal
+        async with AsyncSessionLocal() as session:
+            yield session
\ No newline at end of file
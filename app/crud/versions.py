@@ -0,0 +1,104 @@
+# app/crud/versions.py
+"""
+조건부 GET(ETag) 용 데이터 버전 조회
+- 응답 본문이 될 행(차트 30개, 뉴스 10건, 설명 token 등)은 읽지 않고 집계 / 단일 컬럼만 조회
+- 버전은 본문을 만들기 전에 구함. 그 사이 데이터가 바뀌면 ETag 가 본문보다 오래된 쪽이 되어
+  다음 요청에서 본문을 한 번 더 받을 뿐, 새 데이터를 304 로 놓치지 않음
+- None: 버전을 정할 수 없음 (종목 없음, 요청 안에서 upstream 갱신 예정, 오늘 예측 미계산 등) → ETag 없이 응답
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models.chart_data import ChartData
+from db.models.explanation import Explanation
+from db.models.prediction import Prediction
+
+from app.crud import chart, news
+from app.crud.cache import chart_cache
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.crud.utils import get_async_session
+from app.metrics import metrics
+
+Version = Tuple[object, ...]
+
+async def basic_version_async(ticker_code: str,
+                              interval: int,
+                              session: AsyncSession | None = None) -> Optional[Version]:
+    """/stock-info/basic 버전: 요청 interval 의 마지막 bar + 최신 뉴스 10건의 id"""
+    async with get_async_session(session) as db:
+        with metrics.stage("basic_version", "ticker_lookup"):
+            ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
+        if ticker is None:
+            return None
+        with metrics.stage("basic_version", "cache_query"):
+            return await db.run_sync(basic_version, ticker, interval)
+
+async def prediction_version_async(ticker_code: str,
+                                   horizon: int,
+                                   session: AsyncSession | None = None) -> Optional[Version]:
+    """/stock-info/pred 버전: 오늘 키 예측 행의 id (예측 행은 저장 후 바뀌지 않음)"""
+    return await _row_version_async(Prediction, "prediction_version", ticker_code, horizon, session)
+
+async def explanation_version_async(ticker_code: str,
+                                    horizon: int,
+                                    session: AsyncSession | None = None) -> Optional[Version]:
+    """/stock-info/exp 버전: 오늘 키 설명 행의 id"""
+    return await _row_version_async(Explanation, "explanation_version", ticker_code, horizon, session)
+
+async def _row_version_async(model, op: str, ticker_code: str, horizon: int,
+                             session: AsyncSession | None) -> Optional[Version]:
+    async with get_async_session(session) as db:
+        with metrics.stage(op, "ticker_lookup"):
+            ticker: TickerInfo | None = await ticker_registry.aget(db, ticker_code)
+        if ticker is None:
+            return None
+        with metrics.stage(op, "cache_query"):
+            row_id = await db.run_sync(row_id_for_today, model, ticker.id, horizon)
+    return (model.__tablename__, row_id) if row_id is not None else None
+
+def basic_version(db: Session, ticker: TickerInfo, interval: int) -> Optional[Version]:
+    bar = chart_version(db, ticker, interval)
+    if bar is None:
+        return None
+    return ("basic", interval, *bar, news.news_version(db, ticker.id))
+
+def chart_version(db: Session, ticker: TickerInfo, interval: int) -> Optional[Version]:
+    """
+    get_chart_data 가 돌려줄 마지막 bar 의 (date, close, volume)
+    - 응답 캐시에 있으면 본문도 캐시에서 나가므로 캐시 값 기준 (scheduler 가 DB 를 먼저 갱신해도 본문과 일치)
+    - 주봉/월봉은 새 일봉이 들어와도 마지막 bar 날짜가 그대로이므로 close / volume 까지 포함
+    - 요청 안에서 upstream 일봉 수집이 예정된 경우 None
+    """
+    cached = chart_cache.peek((ticker.ticker_code, interval))
+    if cached is not None:
+        last = cached[-1] if cached else None
+        return (last["date"], last["close"], last["volume"]) if last else (None, None, None)
+
+    if chart.CHART_FETCH_ON_REQUEST:
+        today = datetime.now(timezone.utc).date()
+        if chart.next_fetch_date(chart.latest_chart_date(db, ticker.id, 1), 1, today) <= today:
+            return None
+
+    last = db.execute(
+        select(ChartData.date, ChartData.close, ChartData.volume)
+        .where(ChartData.ticker_id == ticker.id, ChartData.interval == interval)
+        .order_by(ChartData.date.desc())
+        .limit(1)
+    ).first()
+    return (last.date.isoformat(), last.close, last.volume) if last else (None, None, None)
+
+def row_id_for_today(db: Session, model, ticker_id: int, horizon: int) -> Optional[int]:
+    """Prediction / Explanation 의 오늘 키 (predicted_date = 오늘 + horizon) 행 id"""
+    return db.execute(
+        select(model.id).where(
+            model.ticker_id == ticker_id,
+            model.horizon_days == horizon,
+            model.predicted_date == date.today() + timedelta(days=horizon),
+        )
+    ).scalar_one_or_none()
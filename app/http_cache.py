@@ -0,0 +1,41 @@
+# app/http_cache.py
+"""
+/stock-info 응답의 HTTP 캐시 헤더와 조건부 GET
+- ETag: app.crud.versions 가 구한 데이터 버전의 해시 (strong)
+- If-None-Match 가 일치하면 본문 없이 304
+- Cache-Control: public, max-age=STOCK_INFO_MAX_AGE → 그 동안은 브라우저 / CDN 이 재사용하고 이후 ETag 로 재검증
+- 버전을 정할 수 없는 응답(stale 예측, 부분 응답 등)은 ETag 없이 no-cache / no-store
+"""
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Response
+
+STOCK_INFO_MAX_AGE = int(os.getenv("STOCK_INFO_MAX_AGE", "60"))
+# 응답 형식이 바뀌면 올려서 배포 전 ETag 를 모두 무효화
+ETAG_SCHEMA = "1"
+
+def make_etag(version: Optional[tuple]) -> Optional[str]:
+    if version is None:
+        return None
+    digest = hashlib.sha1(repr((ETAG_SCHEMA, *version)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match 비교 (weak 비교: CDN 이 압축하면서 붙이는 W/ 는 무시)"""
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def cache_headers(etag: Optional[str]) -> dict:
+    if etag is None:
+        return {"Cache-Control": "no-cache"}
+    return {"ETag": etag, "Cache-Control": f"public, max-age={STOCK_INFO_MAX_AGE}"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
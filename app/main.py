@@ -1,9 +1,30 @@
 # app/main.py
-from fastapi import FastAPI
+import logging
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from .routers import stock, search
 from fastapi.middleware.cors import CORSMiddleware
+from app.crud.cache import chart_cache
+from app.crud.search import ticker_search
+from app.crud.stream import update_hub
+from app.metrics import metrics
+from db.instrument import db_stats, pool_status, track_queries
+from db.async_session import AsyncSessionLocal, async_engine
+from db.session import engine
 
 app = FastAPI()
+logger = logging.getLogger(__name__)
+
+# "inprocess": API 프로세스 안에서 수집 scheduler 실행 (worker 1개일 때만 권장)
+# "external" : python -m app.scheduler 를 별도로 실행
+INGEST_SCHEDULER = os.getenv("INGEST_SCHEDULER", "off")
+_scheduler = None
+# "on": 요청 빈도 순으로 yfinance 뉴스를 백그라운드에서 확인 (요청 경로는 DB 만 읽음)
+NEWS_POLLER = os.getenv("NEWS_POLLER", "on")
+_news_poller = None
 
 app.include_router(stock.router)    # /stock-info
 app.include_router(search.router)   # /search 자동완성 API 추가
@@ -22,4 +43,76 @@ def read_root():
         "message": "Welcome to the Stock Prediction API",
         "status": "running",
         "endpoints": ["/stock-info", "/search"]
-    }
\ No newline at end of file
+    }
+
+@app.get("/cache/stats")
+def cache_stats():
+    """응답 캐시 hit/miss 카운터"""
+    return {"chart": chart_cache.stats()}
+
+@app.get("/stream/stats")
+def stream_stats():
+    """/stock-info/stream 구독 ticker / 구독자 수, poll / event / resync 카운터"""
+    return update_hub.stats()
+
+@app.get("/db/stats")
+def db_stats_endpoint():
+    """connection pool 상태, checkout 대기 / 쿼리 시간 히스토그램, route 별 요청당 쿼리 수"""
+    # 쿼리/checkout 집계는 sync(스크립트·스레드 경로)와 async(요청 경로) engine 합계
+    return {**db_stats.snapshot(engine), "async_pool": pool_status(async_engine.sync_engine)}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus scrape 용: 요청 지연, 단계별 시간, crud 캐시 hit/miss, upstream 오류, DB 쿼리 시간"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    # 요청 지연과 요청당 쿼리 수를 route 템플릿(/stock-info/pred 등) 별로 기록
+    start = time.perf_counter()
+    status = 500   # call_next 가 예외를 던지면 500 으로 기록
+    with track_queries() as stats:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = request.scope.get("route")
+            path = route.path if route else "unmatched"
+            metrics.observe_request(path, request.method, status, time.perf_counter() - start)
+            db_stats.record_request(path, stats)
+    return response
+
+@app.on_event("startup")
+async def warm_ticker_registry():
+    # 첫 요청이 ticker 테이블 전체 로드 / 검색 인덱스 생성을 떠안지 않도록 미리 로드 (DB 장애 시에는 첫 요청에서 재시도)
+    try:
+        async with AsyncSessionLocal() as db:
+            await ticker_search.aindex(db)
+    except Exception:
+        logger.exception("ticker registry warm-up failed")
+
+@app.on_event("startup")
+def start_ingest_scheduler():
+    global _scheduler
+    if INGEST_SCHEDULER == "inprocess":
+        from app.scheduler import IngestScheduler
+        _scheduler = IngestScheduler()
+        _scheduler.start()
+
+@app.on_event("shutdown")
+def stop_ingest_scheduler():
+    if _scheduler is not None:
+        _scheduler.stop(timeout=5)
+
+@app.on_event("startup")
+def start_news_poller():
+    global _news_poller
+    if NEWS_POLLER == "on":
+        from app.scheduler import NewsPoller
+        _news_poller = NewsPoller()
+        _news_poller.start()
+
+@app.on_event("shutdown")
+def stop_news_poller():
+    if _news_poller is not None:
+        _news_poller.stop(timeout=5)
@@ -0,0 +1,265 @@
+# app/metrics.py
+"""
+Prometheus text 형식 지표 (GET /metrics)
+- http_request_duration_seconds{route,method,status}: 요청 지연 (app.main middleware)
+- stage_duration_seconds{op,stage}: crud 함수 / endpoint 단계별 시간
+  stage = ticker_lookup / cache_query / upstream_fetch / insert / serialize
+- cache_requests_total{op,result}: crud 함수별 cache hit / miss / stale
+  (miss = upstream 호출을 기다린 요청, stale = 이전 값으로 응답하고 백그라운드에서 갱신한 요청)
+- upstream_requests_total{upstream,outcome} / upstream_request_duration_seconds{upstream}:
+  yfinance / fdr / model server 호출 수, 실패 수, 지연
+- db_*: db.instrument 의 쿼리 시간 / checkout 대기 히스토그램
+
+prometheus_client 없이 구현: 기록은 dict 조회 + bisect + lock 하나, 누적 합계는 출력할 때만 계산
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+
+from db.instrument import db_stats
+
+# 0 이면 기록하지 않음 (/metrics 는 빈 값)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# 초 단위. 캐시 히트(ms 이하)부터 모델 서버 호출(수십 초)까지
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+Labels = Tuple[str, ...]
+
+class _Histogram:
+    """bucket 별(비누적) count. 호출자가 lock 을 잡음"""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * (size + 1)   # 마지막 칸은 +Inf
+        self.count = 0
+        self.total = 0.0
+
+class Metrics:
+    def __init__(self, buckets: Sequence[float] = DURATION_BUCKETS, enabled: bool = METRICS_ENABLED) -> None:
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms: Dict[str, Dict[Labels, _Histogram]] = {
+                "http_request_duration_seconds": {},
+                "stage_duration_seconds": {},
+                "upstream_request_duration_seconds": {},
+            }
+            self._counters: Dict[str, Dict[Labels, int]] = {
+                "cache_requests_total": {},
+                "upstream_requests_total": {},
+            }
+
+    # 기록
+    def _observe(self, name: str, labels: Labels, seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms[name]
+            h = series.get(labels)
+            if h is None:
+                h = series[labels] = _Histogram(len(self.buckets))
+            h.counts[i] += 1
+            h.count += 1
+            h.total += seconds
+
+    def _inc(self, name: str, labels: Labels) -> None:
+        with self._lock:
+            series = self._counters[name]
+            series[labels] = series.get(labels, 0) + 1
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float) -> None:
+        if self.enabled:
+            self._observe("http_request_duration_seconds", (route, method, str(status)), seconds)
+
+    def observe_stage(self, op: str, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self._observe("stage_duration_seconds", (op, stage), seconds)
+
+    def count_cache(self, op: str, hit: bool, stale: bool = False) -> None:
+        if self.enabled:
+            self._inc("cache_requests_total", (op, "stale" if stale else "hit" if hit else "miss"))
+
+    def observe_upstream(self, upstream: str, ok: bool, seconds: float) -> None:
+        if self.enabled:
+            self._observe("upstream_request_duration_seconds", (upstream,), seconds)
+            self._inc("upstream_requests_total", (upstream, "ok" if ok else "error"))
+
+    def stage(self, op: str, stage: str) -> "_StageTimer":
+        """with metrics.stage("run_prediction", "cache_query"): ..."""
+        return _StageTimer(self, op, stage)
+
+    def upstream(self, upstream: str) -> "_UpstreamTimer":
+        """with metrics.upstream("yfinance"): ... — 블록에서 예외가 나면 error 로 세고 그대로 전파"""
+        return _UpstreamTimer(self, upstream)
+
+    # 조회
+    def counter(self, name: str, *labels: str) -> int:
+        with self._lock:
+            return self._counters[name].get(labels, 0)
+
+    def histogram_count(self, name: str, *labels: str) -> int:
+        with self._lock:
+            h = self._histograms[name].get(labels)
+            return h.count if h else 0
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            histograms = {
+                name: [(labels, list(h.counts), h.count, h.total) for labels, h in sorted(series.items())]
+                for name, series in self._histograms.items()
+            }
+            counters = {name: sorted(series.items()) for name, series in self._counters.items()}
+
+        lines: List[str] = []
+        for name, series in histograms.items():
+            lines.append(f"# TYPE {name} histogram")
+            for labels, counts, count, total in series:
+                label_str = _labels(_LABEL_NAMES[name], labels)
+                _histogram_lines(lines, name, label_str, self.buckets, counts, count, total)
+        for name, series in counters.items():
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in series:
+                lines.append(f"{name}{{{_labels(_LABEL_NAMES[name], labels)}}} {value}")
+        _db_lines(lines)
+        return "\n".join(lines) + "\n"
+
+_LABEL_NAMES = {
+    "http_request_duration_seconds": ("route", "method", "status"),
+    "stage_duration_seconds": ("op", "stage"),
+    "upstream_request_duration_seconds": ("upstream",),
+    "cache_requests_total": ("op", "result"),
+    "upstream_requests_total": ("upstream", "outcome"),
+}
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _histogram_lines(lines: List[str], name: str, label_str: str, buckets: Sequence[float],
+                     counts: Sequence[int], count: int, total: float) -> None:
+    sep = "," if label_str else ""
+    cumulative = 0
+    for le, n in zip(buckets, counts):
+        cumulative += n
+        lines.append(f'{name}_bucket{{{label_str}{sep}le="{le:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{label_str}{sep}le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{label_str}}} {total:.6f}" if label_str else f"{name}_sum {total:.6f}")
+    lines.append(f"{name}_count{{{label_str}}} {count}" if label_str else f"{name}_count {count}")
+
+def _db_lines(lines: List[str]) -> None:
+    # db.instrument 히스토그램은 ms 단위 누적 bucket → 초 단위로 변환
+    snap = db_stats.snapshot()
+    for name, key in (("db_query_duration_seconds", "queries"), ("db_checkout_duration_seconds", "checkout")):
+        h = snap[key]
+        lines.append(f"# TYPE {name} histogram")
+        for le, n in h["buckets"].items():
+            le_s = "+Inf" if le == "+Inf" else f"{float(le) / 1000:g}"
+            lines.append(f'{name}_bucket{{le="{le_s}"}} {n}')
+        lines.append(f"{name}_sum {h['total_ms'] / 1000:.6f}")
+        lines.append(f"{name}_count {h['count']}")
+    lines.append("# TYPE db_slow_queries_total counter")
+    lines.append(f"db_slow_queries_total {snap['queries']['slow']}")
+    lines.append("# TYPE db_checkout_timeouts_total counter")
+    lines.append(f"db_checkout_timeouts_total {snap['checkout']['timeouts']}")
+
+class _StageTimer:
+    __slots__ = ("metrics", "op", "name", "start")
+
+    def __init__(self, metrics: Metrics, op: str, name: str) -> None:
+        self.metrics = metrics
+        self.op = op
+        self.name = name
+
+    def __enter__(self) -> "_StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.metrics.observe_stage(self.op, self.name, time.perf_counter() - self.start)
+
+class _UpstreamTimer:
+    __slots__ = ("metrics", "upstream", "start")
+
+    def __init__(self, metrics: Metrics, upstream: str) -> None:
+        self.metrics = metrics
+        self.upstream = upstream
+
+    def __enter__(self) -> "_UpstreamTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.metrics.observe_upstream(self.upstream, exc_type is None, time.perf_counter() - self.start)
+
+metrics = Metrics()
+
+# endpoint 함수가 반환한 시각. TimedRoute 가 요청마다 새 holder 를 넣고,
+# threadpool 로 실행되는 sync endpoint 도 복사된 context 에서 같은 holder 에 기록
+_endpoint_returned: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "endpoint_returned", default=None
+)
+
+class TimedRoute(APIRoute):
+    """
+    endpoint 반환 ~ Response 생성 (response_model 검증 + JSON 렌더링) 시간을
+    stage_duration_seconds{op=<route path>, stage="serialize"} 로 기록
+    APIRouter(route_class=TimedRoute) 로 사용
+    """
+
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        if not getattr(call, "__timed__", False):
+            self.dependant.call = _mark_return(call)
+        handler = super().get_route_handler()
+        op = self.path
+
+        async def timed_handler(request):
+            returned: List[float] = []
+            token = _endpoint_returned.set(returned)
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_returned.reset(token)
+            if returned:
+                metrics.observe_stage(op, "serialize", time.perf_counter() - returned[0])
+            return response
+
+        return timed_handler
+
+def _mark_return(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapped(*args, **kwargs):
+            result = await call(*args, **kwargs)
+            _record_return()
+            return result
+    else:
+        @functools.wraps(call)
+        def wrapped(*args, **kwargs):
+            result = call(*args, **kwargs)
+            _record_return()
+            return result
+    wrapped.__timed__ = True
+    return wrapped
+
+def _record_return() -> None:
+    returned = _endpoint_returned.get()
+    if returned is not None:
+        returned.append(time.perf_counter())
@@ -1,55 +1,201 @@
 # app/routers/stock.py
-from fastapi import APIRouter, Query, HTTPException
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from app.crud import *
-from app.schemas import ChartAndNewsResponse, PredictionResponse, ExplanationResponse
-router = APIRouter()
+from app.crud.stream import update_hub
+from app.crud.versions import basic_version_async, explanation_version_async, prediction_version_async
+from app.http_cache import cache_headers, etag_matches, make_etag, not_modified
+from app.metrics import TimedRoute
+from app.schemas import (
+    ChartAndNewsResponse, PredictionResponse, PredictionBatchItem, PredictionBatchResponse, ExplanationResponse,
+)
+# 응답 직렬화 시간을 stage_duration_seconds{stage="serialize"} 로 기록
+router = APIRouter(route_class=TimedRoute)
+
+logger = logging.getLogger(__name__)
+
+# /stock-info/basic 요청 전체에 주어지는 upstream 대기 시간 (초)
+BASIC_DEADLINE_SEC = float(os.getenv("BASIC_DEADLINE_SEC", "8"))
+
+# /stock-info/pred/batch 한 번에 받는 최대 (ticker, horizon) 조합 수
+PRED_BATCH_MAX_KEYS = int(os.getenv("PRED_BATCH_MAX_KEYS", "200"))
+
+# /stock-info/stream 연결 하나가 구독할 수 있는 최대 종목 수, 이벤트가 없을 때 heartbeat 간격 (초)
+STREAM_MAX_TICKERS = int(os.getenv("STREAM_MAX_TICKERS", "20"))
+STREAM_HEARTBEAT_SEC = float(os.getenv("STREAM_HEARTBEAT_SEC", "15"))
+
+async def _gather_with_deadline(
+    calls: Dict[str, Tuple[Callable[..., Awaitable], tuple, dict]],
+    deadline: float,
+) -> Tuple[Dict[str, Any], list, Dict[str, BaseException]]:
+    """
+    async crud 함수들을 동시에 실행하고 deadline까지 기다림.
+    반환: (완료된 결과 dict, 시간 초과한 이름 목록, 예외로 끝난 이름 → 예외)
+
+    시간 초과로 취소되어도 upstream 을 호출 중인 스레드는 계속 돌면서
+    DB에 결과를 저장하므로 다음 요청은 캐시 히트가 됨
+    """
+    tasks = {
+        asyncio.create_task(fn(*args, **kwargs)): name
+        for name, (fn, args, kwargs) in calls.items()
+    }
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    results: Dict[str, Any] = {}
+    timed_out = []
+    errors: Dict[str, BaseException] = {}
+    for task in pending:
+        task.cancel()
+        timed_out.append(tasks[task])
+        logger.warning("stock-info/basic: %s timed out after %.1fs", tasks[task], deadline)
+    for task in done:
+        name = tasks[task]
+        exc = task.exception()
+        if exc is not None:
+            errors[name] = exc
+            logger.warning("stock-info/basic: %s failed: %r", name, exc)
+            continue
+        results[name] = task.result()
+    return results, timed_out, errors
 
 # GET /stock-info/basic
 @router.get("/stock-info/basic", response_model=ChartAndNewsResponse)
-def get_stock_basic(
+async def get_stock_basic(
+    request: Request,
+    response: Response,
     ticker: str = Query(..., description="종목 코드 (예: AAPL, 005930)"),
     horizon: int = Query(7, description="예측 기간 (1, 7, 30일 등)")
 ):
     if horizon not in (1, 7, 30):
         raise HTTPException(status_code=400, detail="horizon must be 1, 7, or 30")
-    
-    chart_data = get_chart_data(ticker, interval=horizon)
-    news_data = get_recent_news(ticker)
 
+    etag = make_etag(await basic_version_async(ticker, horizon))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    # chart / news 는 서로 독립이므로 동시에 가져오고, 늦은 쪽은 비워서 부분 응답
+    calls = {
+        "chart": (get_chart_data_async, (ticker,), {"interval": horizon}),
+        "news": (get_recent_news_async, (ticker,), {}),
+    }
+    results, timed_out, errors = await _gather_with_deadline(calls, BASIC_DEADLINE_SEC)
+    if not results:
+        if timed_out:
+            raise HTTPException(status_code=504, detail="upstream timeout")
+        # 모두 예외로 끝났으면 시간 초과가 아니므로 첫 예외를 그대로 (HTTPException 은 그 상태 코드, 그 외는 500)
+        raise next(errors[name] for name in calls if name in errors)
+    missing = timed_out + list(errors)
+
+    # 부분 응답은 캐시에 남기지 않음
+    response.headers.update({"Cache-Control": "no-store"} if missing else cache_headers(etag))
     return ChartAndNewsResponse(
         ticker=ticker,
-        chartData=chart_data,
-        news=news_data
+        chartData=results.get("chart", []),
+        news=results.get("news", []),
+        partial=bool(missing),
     )
 
 # GET /stock-info/pred
 @router.get("/stock-info/pred", response_model=PredictionResponse)
-def get_prediction(
+async def get_prediction(
+    request: Request,
+    response: Response,
     ticker: str = Query(..., description="종목 코드 (예: AAPL, 005930)"),
     horizon: int = Query(7, description="예측 기간 (1, 7, 30일 등)")
 ):
     if horizon not in (1, 7, 30):
         raise HTTPException(status_code=400, detail="horizon must be 1, 7, or 30")
 
-    prediction = run_prediction(ticker, horizon)
+    etag = make_etag(await prediction_version_async(ticker, horizon))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    prediction = await run_prediction_async(ticker, horizon)
 
+    # 오늘 예측이 없던 요청(계산 직후 / stale 응답)은 ETag 없이 응답하고 다음 요청부터 붙임
+    response.headers.update(cache_headers(None if prediction.get("stale") else etag))
     return PredictionResponse(
         ticker=ticker,
         prediction=prediction
     )
 
+# GET /stock-info/pred/batch
+@router.get("/stock-info/pred/batch", response_model=PredictionBatchResponse)
+async def get_prediction_batch(
+    tickers: str = Query(..., description="쉼표로 구분한 종목 코드 (예: AAPL,MSFT,005930)"),
+    horizons: str = Query("7", description="쉼표로 구분한 예측 기간 (1, 7, 30 중)")
+):
+    codes = list(dict.fromkeys(c.strip() for c in tickers.split(",") if c.strip()))
+    try:
+        horizon_list = list(dict.fromkeys(int(h) for h in horizons.split(",") if h.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="horizons must be 1, 7, or 30")
+    if not codes or not horizon_list or any(h not in (1, 7, 30) for h in horizon_list):
+        raise HTTPException(status_code=400, detail="tickers required and horizons must be 1, 7, or 30")
+    keys = [(code, h) for code in codes for h in horizon_list]
+    if len(keys) > PRED_BATCH_MAX_KEYS:
+        raise HTTPException(status_code=400, detail=f"at most {PRED_BATCH_MAX_KEYS} ticker × horizon pairs")
+
+    results = await run_prediction_batch_async(keys)
+
+    return PredictionBatchResponse(
+        predictions=[
+            PredictionBatchItem(ticker=code, horizon=h, prediction=results[(code, h)])
+            for code, h in keys
+        ]
+    )
+
 # GET /stock-info/exp
 @router.get("/stock-info/exp", response_model=ExplanationResponse)
-def get_explanation(
+async def get_explanation(
+    request: Request,
+    response: Response,
     ticker: str = Query(..., description="종목 코드 (예: AAPL, 005930)"),
     horizon: int = Query(7, description="예측 기간 (1, 7, 30일 등)")
 ):
     if horizon not in (1, 7, 30):
         raise HTTPException(status_code=400, detail="horizon must be 1, 7, or 30")
 
-    explanation = generate_explanation(ticker, horizon)
+    etag = make_etag(await explanation_version_async(ticker, horizon))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    explanation = await generate_explanation_async(ticker, horizon)
 
+    response.headers.update(cache_headers(None if explanation.get("stale") else etag))
     return ExplanationResponse(
         ticker=ticker,
         explanation=explanation
-    )
\ No newline at end of file
+    )
+
+# GET /stock-info/stream (Server-Sent Events)
+@router.get("/stock-info/stream")
+async def stream_updates(
+    tickers: str = Query(..., description="쉼표로 구분한 종목 코드 (예: AAPL,005930)")
+):
+    """
+    구독한 종목에 새로 저장되는 일봉(+ 다시 집계된 주봉/월봉)과 뉴스를 push
+    - event: chart / news / resync(client 가 느려 event 를 버림 → /stock-info/basic 다시 조회)
+    - 구독 후 /stock-info/basic 을 읽으면 그 사이 저장된 행도 놓치지 않음
+    """
+    codes = list(dict.fromkeys(c.strip() for c in tickers.split(",") if c.strip()))
+    if not codes or len(codes) > STREAM_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"1 to {STREAM_MAX_TICKERS} tickers required")
+    try:
+        sub = await update_hub.subscribe(codes)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=f"unknown ticker: {e.args[0]}")
+
+    return StreamingResponse(
+        update_hub.stream(sub, STREAM_HEARTBEAT_SEC),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # 본문을 시작하기 전에 연결이 끊겨도 구독 해제
+        background=BackgroundTask(update_hub.unsubscribe, sub),
+    )
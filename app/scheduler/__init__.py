@@ -0,0 +1,5 @@
+# app/scheduler/__init__.py
+from .ingest import ChartIngestor, IngestJob
+from .news import NewsPoller
+from .precompute import Precomputer, PrecomputeJob
+from .runner import IngestScheduler
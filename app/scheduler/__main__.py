@@ -0,0 +1,78 @@
+# app/scheduler/__main__.py
+"""
+- 시장 데이터 수집 scheduler 를 API 와 별도 프로세스로 실행
+- API 쪽은 INGEST_SCHEDULER=external 로 띄우면 요청 경로에서 upstream 을 호출하지 않음
+
+실행:
+    python -m app.scheduler                 # 상주: 장 마감마다 수집
+    python -m app.scheduler --once          # 지금 한 번만 수집
+    python -m app.scheduler --once --market KOSPI --force
+    python -m app.scheduler --rebuild-aggregates   # 일봉 → 주봉/월봉 재집계 (일봉이 온전히 있는 기간만)
+    python -m app.scheduler --rebuild-aggregates --include-partial   # 첫 일봉 이전에 시작한 기간도
+    python -m app.scheduler --precompute    # 예측 / 설명 사전 계산 한 번 (중단 후 다시 실행하면 이어서)
+"""
+
+import argparse
+import logging
+
+from sqlalchemy import select
+
+from db.session import SessionLocal
+from db.models.ticker import Ticker
+from app.crud.aggregate import rebuild_aggregates
+from app.scheduler import ChartIngestor, IngestScheduler, Precomputer
+
+def rebuild_all_aggregates(market: str | None = None, complete_only: bool = True) -> int:
+    """
+    전체 종목 재집계. 기본은 첫 일봉 이후에 시작하는 기간만 (aggregate.rebuild_aggregates 의 complete_only)
+    → 최근 일봉만 보관하던 DB 에서 upstream 의 온전한 주봉/월봉을 덮어쓰지 않음
+    """
+    total = 0
+    with SessionLocal() as db:
+        query = select(Ticker.id)
+        if market:
+            query = query.where(Ticker.market == market)
+        for ticker_id in db.execute(query).scalars().all():
+            total += rebuild_aggregates(db, ticker_id, complete_only=complete_only)
+            db.commit()
+    return total
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.scheduler")
+    parser.add_argument("--once", action="store_true", help="수집을 한 번만 실행하고 종료")
+    parser.add_argument("--market", choices=["US", "KOSPI"], help="특정 market 만 수집")
+    parser.add_argument("--force", action="store_true", help="이미 수집된 (ticker, interval) 도 다시 수집")
+    parser.add_argument("--rebuild-aggregates", action="store_true",
+                        help="저장된 일봉으로 전체 종목의 주봉/월봉을 다시 집계하고 종료. "
+                             "첫 일봉보다 먼저 시작하는 주/월은 일봉이 일부뿐이므로 건너뜀 (기존 bar 유지)")
+    parser.add_argument("--include-partial", action="store_true",
+                        help="--rebuild-aggregates 에서 첫 일봉보다 먼저 시작하는 주/월도 있는 일봉만으로 집계 "
+                             "(일봉 이력이 실제로 거기서 시작하는 경우, 예: 상장 직후 종목)")
+    parser.add_argument("--precompute", action="store_true",
+                        help="전체 종목 × horizon 의 예측 / 설명을 한 번 미리 계산하고 종료")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.rebuild_aggregates:
+        print(f"{rebuild_all_aggregates(args.market, complete_only=not args.include_partial)} rows rebuilt")
+        return
+
+    if args.precompute:
+        print(Precomputer().run(market=args.market))
+        return
+
+    if args.once:
+        summary = ChartIngestor().run(market=args.market, force=args.force)
+        print(summary)
+        return
+
+    markets = [args.market] if args.market else ["US", "KOSPI"]
+    scheduler = IngestScheduler(markets=markets)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# app/scheduler/ingest.py
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func
+
+from db.session import SessionLocal
+from db.models.chart_data import ChartData
+from db.models.ticker import Ticker
+from db.models.ingest_watermark import IngestWatermark
+from db.upsert import bulk_upsert
+
+from app.crud.aggregate import AGG_INTERVALS, rebuild_aggregates
+from app.crud.cache import chart_cache
+from app.crud.stream import update_hub
+from app.crud.chart import fetch_bars_batch, next_fetch_date
+from app.crud.market_calendar import INGEST_DELAY, last_session_close
+from app.scheduler.ratelimit import RateLimiter, retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_RATE_PER_SEC = float(os.getenv("INGEST_RATE_PER_SEC", "2"))
+INGEST_RETRIES = int(os.getenv("INGEST_RETRIES", "3"))
+# upstream 1회 호출에 묶을 종목 수 (batch 다운로드를 지원하는 market 만)
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+BATCH_MARKETS = {"US"}
+# upstream 에서는 일봉만 받고 주봉/월봉은 aggregate.rebuild_aggregates 로 파생
+INTERVALS = (1,)
+
+# (market, ticker_codes, start, end, interval) -> {ticker_code: bar dict 목록}
+# (chart.fetch_bars_batch 와 같은 형식)
+Fetcher = Callable[[str, List[str], date, date, int], Dict[str, List[Dict]]]
+
+@dataclass(frozen=True)
+class IngestJob:
+    ticker_id: int
+    ticker_code: str
+    market: str
+    interval: int
+    latest: Optional[date] = None   # 이미 저장된 마지막 bar 날짜
+
+class ChartIngestor:
+    """
+    seed 된 Ticker 전체의 ChartData 를 갱신하는 수집기
+    - 일봉을 저장하면 새 일봉이 속한 기간부터 주봉/월봉을 다시 집계
+    - 직전 장 마감(+INGEST_DELAY) 이후 이미 수집된 (ticker, interval) 은 건너뜀 → 중단 후 재실행 시 이어서 진행
+    - 같은 (market, interval, 시작일) job 은 batch_size 개씩 묶어 upstream 1회 호출 + bulk upsert 1회로 처리
+    - worker pool 크기, 초당 upstream 호출 수, 재시도 횟수로 upstream 부하를 제한
+    """
+
+    def __init__(self,
+                 session_factory=SessionLocal,
+                 fetcher: Fetcher = fetch_bars_batch,
+                 workers: int = INGEST_WORKERS,
+                 rate_per_sec: float = INGEST_RATE_PER_SEC,
+                 retries: int = INGEST_RETRIES,
+                 batch_size: int = INGEST_BATCH_SIZE,
+                 backoff: float = 1.0,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.session_factory = session_factory
+        self.fetcher = fetcher
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_per_sec, sleep=sleep)
+        self.retries = max(1, retries)
+        self.batch_size = max(1, batch_size)
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def plan(self,
+             market: Optional[str] = None,
+             intervals: Iterable[int] = INTERVALS,
+             now: Optional[datetime] = None,
+             force: bool = False) -> List[IngestJob]:
+        """이번 실행에서 수집할 job 목록"""
+        now = now or datetime.now(timezone.utc)
+        with self.session_factory() as db:
+            query = select(Ticker.id, Ticker.ticker_code, Ticker.market)
+            if market:
+                query = query.where(Ticker.market == market)
+            tickers = db.execute(query.order_by(Ticker.id)).all()
+            watermarks = {
+                (w.ticker_id, w.interval): w
+                for w in db.execute(select(IngestWatermark)).scalars()
+            }
+            # watermark 가 없는 (기존 데이터만 있는) 경우를 위한 fallback
+            stored = {
+                (tid, itv): latest
+                for tid, itv, latest in db.execute(
+                    select(ChartData.ticker_id, ChartData.interval, func.max(ChartData.date))
+                    .group_by(ChartData.ticker_id, ChartData.interval)
+                )
+            }
+
+        jobs = []
+        for ticker_id, code, mkt in tickers:
+            covered_since = last_session_close(mkt, now, after=INGEST_DELAY).replace(tzinfo=None)
+            for interval in intervals:
+                wm = watermarks.get((ticker_id, interval))
+                if not force and wm and wm.checked_at and wm.checked_at >= covered_since:
+                    continue
+                latest = wm.last_date if wm and wm.last_date else stored.get((ticker_id, interval))
+                jobs.append(IngestJob(ticker_id, code, mkt, interval, latest))
+        return jobs
+
+    def batches(self, jobs: List[IngestJob], today: date) -> List[Tuple[str, int, date, List[IngestJob]]]:
+        """(market, interval, 시작일) 로 묶은 뒤 batch_size 단위로 자른 upstream 호출 목록"""
+        groups: Dict[Tuple[str, int, date], List[IngestJob]] = defaultdict(list)
+        for job in jobs:
+            groups[(job.market, job.interval, next_fetch_date(job.latest, job.interval, today))].append(job)
+
+        batches = []
+        for (market, interval, start), group in groups.items():
+            size = self.batch_size if market.upper() in BATCH_MARKETS else 1
+            for i in range(0, len(group), size):
+                batches.append((market, interval, start, group[i:i + size]))
+        return batches
+
+    def run(self,
+            market: Optional[str] = None,
+            intervals: Iterable[int] = INTERVALS,
+            now: Optional[datetime] = None,
+            force: bool = False) -> Dict[str, int]:
+        """
+        수집 1회 실행. 반환: {"jobs", "ok", "failed", "rows"}
+        개별 batch 실패는 로그만 남기고 계속 진행 (watermark 가 갱신되지 않으므로 다음 실행에서 재시도)
+        """
+        now = now or datetime.now(timezone.utc)
+        jobs = self.plan(market, intervals, now, force)
+        summary = {"jobs": len(jobs), "ok": 0, "failed": 0, "rows": 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as pool:
+            futures = {
+                pool.submit(self.refresh, mkt, interval, start, batch, now): batch
+                for mkt, interval, start, batch in self.batches(jobs, now.date())
+            }
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    summary["rows"] += fut.result()
+                    summary["ok"] += len(batch)
+                except Exception:
+                    summary["failed"] += len(batch)
+                    logger.exception("ingest failed: %s interval=%s",
+                                     [j.ticker_code for j in batch], batch[0].interval)
+        return summary
+
+    def refresh(self,
+                market: str,
+                interval: int,
+                start: date,
+                jobs: List[IngestJob],
+                now: datetime) -> int:
+        """
+        같은 구간을 받는 job 묶음을 upstream 1회로 수집해 한 번에 저장. 저장한 행 수 반환
+        fetch 동안에는 DB connection 을 잡지 않음
+        """
+        today = now.date()
+        rows_by_code: Dict[str, List[Dict]] = {}
+        if start <= today:
+            codes = [j.ticker_code for j in jobs]
+
+            def _fetch() -> Dict[str, List[Dict]]:
+                self.limiter.acquire()
+                return self.fetcher(market, codes, start, today, interval)
+
+            rows_by_code = retry_with_backoff(_fetch, attempts=self.retries,
+                                              base_delay=self.backoff, sleep=self.sleep)
+
+        chart_rows, watermarks = [], []
+        checked_at = now.astimezone(timezone.utc).replace(tzinfo=None)
+        for job in jobs:
+            rows = rows_by_code.get(job.ticker_code, [])
+            chart_rows.extend({"ticker_id": job.ticker_id, "interval": interval, **r} for r in rows)
+            watermarks.append({
+                "ticker_id": job.ticker_id,
+                "interval": interval,
+                "last_date": max([d for d in [job.latest, *(r["date"] for r in rows)] if d], default=None),
+                "checked_at": checked_at,
+            })
+
+        with self.session_factory() as db:
+            bulk_upsert(db, ChartData, chart_rows)
+            if interval == 1:
+                for job in jobs:
+                    rows = rows_by_code.get(job.ticker_code)
+                    if rows:
+                        rebuild_aggregates(db, job.ticker_id, since=min(r["date"] for r in rows))
+            bulk_upsert(db, IngestWatermark, watermarks)
+            db.commit()
+
+        for job in jobs:
+            if rows_by_code.get(job.ticker_code):
+                for itv in ((1, *AGG_INTERVALS) if interval == 1 else (interval,)):
+                    chart_cache.invalidate((job.ticker_code, itv))
+                update_hub.notify(job.ticker_code)
+        return len(chart_rows)
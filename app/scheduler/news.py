@@ -0,0 +1,138 @@
+# app/scheduler/news.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from db.models.news_watermark import NewsWatermark
+from db.session import SessionLocal
+from db.upsert import bulk_upsert
+
+from app.crud.news import NEWS_FRESHNESS_SEC, NewsDemand, news_demand, refresh_news
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.scheduler.ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+NEWS_POLL_WORKERS = int(os.getenv("NEWS_POLL_WORKERS", "2"))
+# yfinance 뉴스 호출 수 / 초 (worker 전체 합, 0 = 제한 없음)
+NEWS_POLL_RATE_PER_SEC = float(os.getenv("NEWS_POLL_RATE_PER_SEC", "1"))
+# 확인할 종목을 고르는 주기 (초). 한 번에 최대 rate × tick 종목 (요청 빈도 높은 순)
+NEWS_POLL_TICK_SEC = float(os.getenv("NEWS_POLL_TICK_SEC", "5"))
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class NewsPoller:
+    """
+    요청 빈도 순으로 뉴스를 미리 확인하는 상주 루프 (API 프로세스 안의 daemon thread)
+    - 최근 요청된 종목(news_demand) 중 NewsWatermark.checked_at 이 freshness 보다 오래된 종목만
+    - 한 tick 에 rate × tick 종목까지, 점수 높은 순 → 많이 보는 종목이 먼저, 안 보는 종목은 확인하지 않음
+    - 처음 요청된 종목은 demand.wakeup 으로 tick 을 기다리지 않고 바로 확인
+    - checked_at 을 조건부 UPDATE 로 먼저 갱신(claim)한 worker 만 호출 → uvicorn worker 가 여럿이어도 종목당 1회
+    """
+
+    def __init__(self,
+                 session_factory: sessionmaker = SessionLocal,
+                 refresher: Callable[[str], int] = refresh_news,
+                 demand: NewsDemand = news_demand,
+                 freshness: float = NEWS_FRESHNESS_SEC,
+                 workers: int = NEWS_POLL_WORKERS,
+                 rate_per_sec: float = NEWS_POLL_RATE_PER_SEC,
+                 tick: float = NEWS_POLL_TICK_SEC,
+                 clock: Callable[[], datetime] = _utcnow) -> None:
+        self.session_factory = session_factory
+        self.refresher = refresher
+        self.demand = demand
+        self.freshness = timedelta(seconds=freshness)
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_per_sec)
+        self.per_tick = max(self.workers, int(rate_per_sec * tick)) if rate_per_sec > 0 else None
+        self.tick = tick
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self, db: Session, now: datetime) -> List[TickerInfo]:
+        """확인할 종목 (요청 빈도 높은 순, 최대 per_tick 개)"""
+        wanted = [t for t in (ticker_registry.get(db, code) for code, _ in self.demand.ranked()) if t]
+        if not wanted:
+            return []
+        checked = dict(db.execute(
+            select(NewsWatermark.ticker_id, NewsWatermark.checked_at)
+            .where(NewsWatermark.ticker_id.in_([t.id for t in wanted]))
+        ).all())
+        cutoff = now - self.freshness
+        stale = [t for t in wanted if checked.get(t.id) is None or checked[t.id] < cutoff]
+        return stale[:self.per_tick] if self.per_tick else stale
+
+    def claim(self, db: Session, ticker_id: int, now: datetime) -> bool:
+        """checked_at 이 아직 오래된 경우에만 now 로 갱신. 다른 worker 가 먼저 갱신했으면 False"""
+        bulk_upsert(db, NewsWatermark, [{"ticker_id": ticker_id, "checked_at": None}], update_cols=[])
+        claimed = db.execute(
+            update(NewsWatermark)
+            .where(
+                NewsWatermark.ticker_id == ticker_id,
+                or_(NewsWatermark.checked_at.is_(None), NewsWatermark.checked_at < now - self.freshness),
+            )
+            .values(checked_at=now)
+        ).rowcount == 1
+        db.commit()
+        return claimed
+
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """한 tick: 반환 {"due", "checked", "skipped", "failed", "inserted"}"""
+        now = now or self.clock()
+        with self.session_factory() as db:
+            jobs = self.due(db, now)
+            claimed = [t for t in jobs if self.claim(db, t.id, now)]
+        summary = {"due": len(jobs), "checked": 0, "skipped": len(jobs) - len(claimed), "failed": 0, "inserted": 0}
+
+        def check(ticker: TickerInfo) -> Optional[int]:
+            self.limiter.acquire()
+            try:
+                return self.refresher(ticker.ticker_code)
+            except Exception:
+                logger.exception("news refresh failed: %s", ticker.ticker_code)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for inserted in pool.map(check, claimed):
+                if inserted is None:
+                    summary["failed"] += 1
+                else:
+                    summary["checked"] += 1
+                    summary["inserted"] += inserted
+        return summary
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                summary = self.run_once()
+                if summary["due"]:
+                    logger.info("news poll: %s", summary)
+            except Exception:
+                logger.exception("news poll aborted")
+            # 처음 요청된 종목이 생기면 tick 을 기다리지 않음
+            self.demand.wakeup.wait(self.tick)
+            self.demand.wakeup.clear()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="news-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self.demand.wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,190 @@
+# app/scheduler/precompute.py
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from db.session import SessionLocal
+from db.models.explanation import Explanation
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+from db.upsert import bulk_upsert
+
+from app.crud.explanation import fetch_explanation
+from app.crud.market_calendar import INGEST_DELAY, next_session_close
+from app.crud.prediction import fetch_prediction
+from app.crud.tickers import TickerInfo
+from app.scheduler.ratelimit import RateLimiter, retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "4"))
+# 모델 서버 초당 호출 수 (0 = 제한 없음)
+PRECOMPUTE_RATE_PER_SEC = float(os.getenv("PRECOMPUTE_RATE_PER_SEC", "2"))
+PRECOMPUTE_RETRIES = int(os.getenv("PRECOMPUTE_RETRIES", "3"))
+HORIZONS = (1, 7, 30)
+
+Predictor = Callable[[TickerInfo, int], float]
+Explainer = Callable[[TickerInfo, int], Tuple[List[str], List[float]]]
+
+# kind -> 저장할 model
+MODELS = {"prediction": Prediction, "explanation": Explanation}
+
+@dataclass(frozen=True)
+class PrecomputeJob:
+    ticker: TickerInfo
+    horizon: int
+    kind: str                       # "prediction" / "explanation"
+    pred_dates: Tuple[date, ...]    # 아직 저장되지 않은 predicted_date
+
+class Precomputer:
+    """
+    장 마감 후 Ticker 전체 × horizon 의 Prediction / Explanation 을 미리 계산해 저장
+    - 요청 경로의 캐시 키는 (ticker, horizon, 오늘 + horizon) 이므로, 이번 실행부터 다음 장 마감 실행까지
+      서버 현지 날짜 각각의 키로 같은 결과를 저장 → 자정이 지나거나 주말이어도 요청은 DB 히트
+    - 이미 저장된 키는 건너뜀 → 중단 후 재실행하면 남은 job 만 이어서 진행
+    - (ticker, horizon, kind) 마다 모델 서버 1회 호출 + bulk upsert 1회, 성공한 job 은 바로 커밋
+    - worker pool 크기, 초당 호출 수, 재시도 횟수로 모델 서버 부하를 제한
+    """
+
+    def __init__(self,
+                 session_factory=SessionLocal,
+                 predictor: Predictor = fetch_prediction,
+                 explainer: Explainer = fetch_explanation,
+                 workers: int = PRECOMPUTE_WORKERS,
+                 rate_per_sec: float = PRECOMPUTE_RATE_PER_SEC,
+                 retries: int = PRECOMPUTE_RETRIES,
+                 backoff: float = 1.0,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.session_factory = session_factory
+        self.predictor = predictor
+        self.explainer = explainer
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate_per_sec, sleep=sleep)
+        self.retries = max(1, retries)
+        self.backoff = backoff
+        self.sleep = sleep
+
+    @staticmethod
+    def as_of_dates(market: str, now: datetime) -> List[date]:
+        """이번 실행 결과로 응답할 서버 현지 날짜들: 오늘 ~ 다음 장 마감 실행일"""
+        today = now.astimezone().date()
+        until = next_session_close(market, now, after=INGEST_DELAY).astimezone().date()
+        return [today + timedelta(days=i) for i in range((until - today).days + 1)]
+
+    def plan(self,
+             market: Optional[str] = None,
+             horizons: Iterable[int] = HORIZONS,
+             now: Optional[datetime] = None) -> List[PrecomputeJob]:
+        """이번 실행에서 모델 서버를 호출할 job 목록"""
+        now = now or datetime.now(timezone.utc)
+        horizons = tuple(horizons)
+        with self.session_factory() as db:
+            query = select(Ticker.id, Ticker.ticker_code, Ticker.company_name, Ticker.market)
+            if market:
+                query = query.where(Ticker.market == market)
+            tickers = [TickerInfo(*row) for row in db.execute(query.order_by(Ticker.id))]
+            since = now.astimezone().date()
+            stored = {kind: self._stored_keys(db, model, since) for kind, model in MODELS.items()}
+
+        jobs = []
+        dates_by_market: Dict[str, List[date]] = {}
+        for ticker in tickers:
+            if ticker.market not in dates_by_market:
+                dates_by_market[ticker.market] = self.as_of_dates(ticker.market, now)
+            for horizon in horizons:
+                wanted = [d + timedelta(days=horizon) for d in dates_by_market[ticker.market]]
+                for kind in MODELS:
+                    missing = tuple(d for d in wanted if (ticker.id, horizon, d) not in stored[kind])
+                    if missing:
+                        jobs.append(PrecomputeJob(ticker, horizon, kind, missing))
+        return jobs
+
+    def run(self,
+            market: Optional[str] = None,
+            horizons: Iterable[int] = HORIZONS,
+            now: Optional[datetime] = None) -> Dict[str, object]:
+        """
+        사전 계산 1회 실행
+        반환: {"jobs", "ok", "failed", "rows", "seconds", "coverage": {kind: 오늘 키 중 저장된 비율}}
+        실패한 job 은 로그만 남기고 계속 진행 (저장되지 않으므로 다음 실행에서 재시도)
+        """
+        started = time.monotonic()
+        now = now or datetime.now(timezone.utc)
+        horizons = tuple(horizons)
+        jobs = self.plan(market, horizons, now)
+        summary: Dict[str, object] = {"jobs": len(jobs), "ok": 0, "failed": 0, "rows": 0}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="precompute") as pool:
+            futures = {pool.submit(self.compute, job): job for job in jobs}
+            for fut in as_completed(futures):
+                job = futures[fut]
+                try:
+                    summary["rows"] += fut.result()
+                    summary["ok"] += 1
+                except Exception:
+                    summary["failed"] += 1
+                    logger.exception("precompute failed: %s %s horizon=%s",
+                                     job.kind, job.ticker.ticker_code, job.horizon)
+
+        summary["seconds"] = round(time.monotonic() - started, 1)
+        summary["coverage"] = self.coverage(market, horizons, now.astimezone().date())
+        return summary
+
+    def compute(self, job: PrecomputeJob) -> int:
+        """모델 서버 1회 호출 후 job 의 모든 predicted_date 로 저장. 저장한 행 수 반환"""
+        call = self.predictor if job.kind == "prediction" else self.explainer
+
+        def _fetch():
+            self.limiter.acquire()
+            return call(job.ticker, job.horizon)
+
+        result = retry_with_backoff(_fetch, attempts=self.retries,
+                                    base_delay=self.backoff, sleep=self.sleep)
+        base = {"ticker_id": job.ticker.id, "horizon_days": job.horizon}
+        if job.kind == "prediction":
+            values = {"prediction_result": result}
+        else:
+            values = Explanation.encode(*result)
+        rows = [{**base, "predicted_date": d, **values} for d in job.pred_dates]
+
+        # 그사이 요청 경로가 저장한 행은 그대로 둠
+        with self.session_factory() as db:
+            bulk_upsert(db, MODELS[job.kind], rows, update_cols=[],
+                        conflict_cols=["ticker_id", "predicted_date", "horizon_days"])
+            db.commit()
+        return len(rows)
+
+    def coverage(self,
+                 market: Optional[str],
+                 horizons: Iterable[int],
+                 today: date) -> Dict[str, float]:
+        """kind 별로 (ticker, horizon) 중 today 기준 키(today + horizon)가 저장된 비율"""
+        horizons = tuple(horizons)
+        with self.session_factory() as db:
+            query = select(Ticker.id)
+            if market:
+                query = query.where(Ticker.market == market)
+            ticker_ids = set(db.execute(query).scalars())
+            wanted = {(tid, h, today + timedelta(days=h)) for tid in ticker_ids for h in horizons}
+            if not wanted:
+                return {kind: 1.0 for kind in MODELS}
+            return {
+                kind: round(len(wanted & self._stored_keys(db, model, today)) / len(wanted), 4)
+                for kind, model in MODELS.items()
+            }
+
+    @staticmethod
+    def _stored_keys(db, model, since: date) -> Set[Tuple[int, int, date]]:
+        """predicted_date >= since 인 (ticker_id, horizon, predicted_date) 키"""
+        return set(db.execute(
+            select(model.ticker_id, model.horizon_days, model.predicted_date)
+            .where(model.predicted_date >= since)
+        ).tuples())
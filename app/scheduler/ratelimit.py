@@ -0,0 +1,60 @@
+# app/scheduler/ratelimit.py
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+class RateLimiter:
+    """
+    thread-safe token bucket
+    - rate: 초당 허용 호출 수, burst: 한 번에 몰아서 쓸 수 있는 최대 토큰
+    - rate <= 0 이면 제한 없음
+    """
+
+    def __init__(self, rate: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+def retry_with_backoff(fn: Callable[[], T],
+                       attempts: int = 3,
+                       base_delay: float = 1.0,
+                       max_delay: float = 30.0,
+                       sleep: Callable[[float], None] = time.sleep) -> T:
+    """
+    fn 이 예외를 던지면 지수 backoff(+jitter) 후 재시도. 마지막 예외는 그대로 전파
+    n 번째 재시도 전 대기: min(max_delay, base_delay * 2**n) * U(0.5, 1.5)
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            delay = min(max_delay, base_delay * 2 ** attempt)
+            sleep(delay * random.uniform(0.5, 1.5))
+    raise ValueError("attempts must be >= 1")
@@ -0,0 +1,85 @@
+# app/scheduler/runner.py
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+
+from app.crud.market_calendar import INGEST_DELAY, next_session_close
+from app.scheduler.ingest import ChartIngestor
+from app.scheduler.precompute import Precomputer
+
+logger = logging.getLogger(__name__)
+
+# "1" 이면 수집이 끝난 market 의 Prediction / Explanation 을 이어서 미리 계산 (모델 서버 주소가 있을 때만)
+PRECOMPUTE_AFTER_INGEST = os.getenv("PRECOMPUTE_AFTER_INGEST", "1") == "1"
+
+class IngestScheduler:
+    """
+    market 별 장 마감 + INGEST_DELAY 시각마다 ChartIngestor 를 실행하는 상주 루프
+    - 시작 직후 한 번 전체 market 을 돌려 놓친 수집을 보충
+    - 수집 후 precomputer 가 있으면 같은 market 의 예측 / 설명을 미리 계산
+    - start()/stop() 으로 FastAPI 프로세스 안의 daemon thread 로도 실행 가능
+    """
+
+    def __init__(self,
+                 ingestor: Optional[ChartIngestor] = None,
+                 markets: Iterable[str] = ("US", "KOSPI"),
+                 precomputer: Optional[Precomputer] = None) -> None:
+        self.ingestor = ingestor or ChartIngestor()
+        if precomputer is None and PRECOMPUTE_AFTER_INGEST and os.getenv("NGROK_API_URL"):
+            precomputer = Precomputer()
+        self.precomputer = precomputer
+        self.markets = tuple(markets)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def next_run(self, now: Optional[datetime] = None) -> Tuple[str, datetime]:
+        """다음으로 수집할 (market, 시각)"""
+        now = now or datetime.now(timezone.utc)
+        return min(
+            ((m, next_session_close(m, now, after=INGEST_DELAY)) for m in self.markets),
+            key=lambda item: item[1],
+        )
+
+    def run_market(self, market: str) -> None:
+        try:
+            summary = self.ingestor.run(market)
+            logger.info("ingest %s: %s", market, summary)
+        except Exception:
+            logger.exception("ingest %s aborted", market)
+        if self.precomputer is None:
+            return
+        try:
+            summary = self.precomputer.run(market)
+            logger.info("precompute %s: %s", market, summary)
+        except Exception:
+            logger.exception("precompute %s aborted", market)
+
+    def run_forever(self) -> None:
+        for market in self.markets:
+            if self._stop.is_set():
+                return
+            self.run_market(market)
+
+        while not self._stop.is_set():
+            market, due = self.next_run()
+            wait = (due - datetime.now(timezone.utc)).total_seconds()
+            logger.info("next ingest: %s at %s", market, due.isoformat())
+            if self._stop.wait(max(0.0, wait)):
+                break
+            self.run_market(market)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="ingest-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -19,20 +19,31 @@ class NewsItem(BaseModel):
 class PredictionData(BaseModel):
     predicted_date: str
     result: float
+    stale: bool = False   # 오늘 예측이 아직 없어 이전 예측으로 응답 (백그라운드에서 갱신 중)
 
 class ExplanationData(BaseModel):
     tokens: List[str]
     token_scores: List[float]
+    stale: bool = False   # 오늘 설명이 아직 없어 이전 설명으로 응답 (백그라운드에서 갱신 중)
 
 class ChartAndNewsResponse(BaseModel):
     ticker: str
     chartData: List[ChartDataItem]
     news: List[NewsItem]
+    partial: bool = False   # deadline 초과 등으로 일부 데이터가 빠진 경우 True
     
 class PredictionResponse(BaseModel):
     ticker: str
     prediction: PredictionData
 
+class PredictionBatchItem(BaseModel):
+    ticker: str
+    horizon: int
+    prediction: PredictionData
+
+class PredictionBatchResponse(BaseModel):
+    predictions: List[PredictionBatchItem]   # 요청한 tickers × horizons 순서
+
 class ExplanationResponse(BaseModel):
     ticker: str
-    explanation: ExplanationData
\ No newline at end of file
+    explanation: ExplanationData
\ No newline at end of file
@@ -1,22 +1,41 @@
 # db/init_db.py
+"""
+없는 테이블을 만들고 종목을 seed (여러 번 실행해도 기존 데이터는 유지)
+- 종목은 upsert: 새 종목 추가, 있는 종목은 회사명만 갱신
+- --reset: 모든 테이블을 지우고 다시 만듦 (저장된 시세 / 뉴스 / 예측도 모두 삭제)
+- 기존 테이블의 컬럼 변경은 create_all 이 하지 않음 → db/migrate_*.py
+
+실행:
+    python db/init_db.py
+    python db/init_db.py --only-new     # US 종목은 테이블에 없는 것만 yfinance 호출
+    python db/init_db.py --reset
+"""
+import argparse
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.session import engine, Base
-from db.models import explanation, ticker, chart_data, prediction, news
+from db.models import explanation, ticker, chart_data, prediction, news, ingest_watermark, news_watermark, app_meta
 
 from db.seeds.seed_kospi_tickers import seed_kospi_tickers
 from db.seeds.seed_us_tickers import seed_us_tickers
 
 if __name__ == "__main__":
-    Base.metadata.drop_all(bind=engine)
-    print("Dropped all tables.")
-    
+    parser = argparse.ArgumentParser(prog="python db/init_db.py")
+    parser.add_argument("--reset", action="store_true", help="모든 테이블을 지우고 다시 만듦")
+    parser.add_argument("--only-new", action="store_true", help="US 종목은 테이블에 없는 것만 이름 조회")
+    args = parser.parse_args()
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+        print("Dropped all tables.")
+
     Base.metadata.create_all(bind=engine)
-    print("All tables created.")
+    print("Missing tables created.")
 
     seed_kospi_tickers()
-    seed_us_tickers()
-    print("All seed data inserted.")
\ No newline at end of file
+    summary = seed_us_tickers(only_new=args.only_new)
+    print(f"US tickers upserted: {summary}")
+    print("All seed data inserted.")
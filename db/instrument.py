@@ -0,0 +1,215 @@
+# db/instrument.py
+"""
+DB 계측: pool checkout 대기, 쿼리 수/시간, 느린 쿼리 로그, 요청당 쿼리 수
+- TimedQueuePool / TimedAsyncQueuePool: checkout 대기 시간을 기록하는 QueuePool (MySQL 엔진에 사용)
+- instrument_engine: cursor 실행 전후 event 로 쿼리 시간 기록
+- track_queries: 요청 하나 동안의 쿼리 수/시간을 모음 (app.main middleware)
+집계는 GET /db/stats 로 노출
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# 이 시간(ms)을 넘는 쿼리는 WARNING 으로 로그
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class Histogram:
+    """누적 bucket 히스토그램 (ms). 호출자가 lock 을 잡음"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, le in enumerate(self.buckets):
+            if ms <= le:
+                self.counts[i] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": {**{str(le): n for le, n in zip(self.buckets, self.counts)}, "+Inf": self.count},
+        }
+
+class QueryStats:
+    """요청 하나의 쿼리 수 / 누적 시간. 한 요청 안에서 여러 스레드가 기록할 수 있음"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.total_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.total_ms += ms
+
+# asyncio.to_thread / threadpool 로 넘어간 crud 코드에도 context 가 복사되어 같은 객체에 기록됨
+_request_queries: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+class DBStats:
+    def __init__(self, slow_query_ms: float = DB_SLOW_QUERY_MS) -> None:
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self.checkout = Histogram()
+        self.query = Histogram()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkout.reset()
+            self.query.reset()
+            self.checkout_timeouts = 0
+            self.slow_queries = 0
+            self.requests: Dict[str, dict] = {}
+
+    def record_checkout(self, ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkout.observe(ms)
+            self.checkout_timeouts += timed_out
+
+    def record_query(self, statement: str, ms: float) -> None:
+        slow = ms >= self.slow_query_ms
+        with self._lock:
+            self.query.observe(ms)
+            self.slow_queries += slow
+        if slow:
+            logger.warning("slow query (%.1f ms): %s", ms, " ".join(statement.split())[:500])
+
+    def record_request(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            r = self.requests.setdefault(
+                route, {"requests": 0, "queries": 0, "query_ms": 0.0, "max_queries": 0}
+            )
+            r["requests"] += 1
+            r["queries"] += stats.queries
+            r["query_ms"] += stats.total_ms
+            r["max_queries"] = max(r["max_queries"], stats.queries)
+
+    def snapshot(self, engine: Optional[Engine] = None) -> dict:
+        with self._lock:
+            out = {
+                "checkout": {**self.checkout.snapshot(), "timeouts": self.checkout_timeouts},
+                "queries": {**self.query.snapshot(), "slow": self.slow_queries,
+                            "slow_threshold_ms": self.slow_query_ms},
+                "requests": {
+                    route: {
+                        **r,
+                        "query_ms": round(r["query_ms"], 3),
+                        "avg_queries": round(r["queries"] / r["requests"], 2),
+                        "avg_query_ms": round(r["query_ms"] / r["requests"], 3),
+                    }
+                    for route, r in sorted(self.requests.items())
+                },
+            }
+        if engine is not None:
+            out["pool"] = pool_status(engine)
+        return out
+
+db_stats = DBStats()
+
+class _TimedCheckout:
+    """checkout 에 걸린 시간(빈 연결을 기다린 시간 + 새 연결 생성)을 DBStats 에 기록"""
+
+    stats: DBStats = db_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_checkout((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.stats.record_checkout((time.perf_counter() - start) * 1000)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() 등으로 pool 을 새로 만들어도 같은 stats 에 기록
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """async engine (db.async_session) 용"""
+
+def pool_status(engine: Engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            recycle=pool._recycle,
+            pre_ping=pool._pre_ping,
+        )
+    return status
+
+def instrument_engine(engine: Engine, stats: DBStats = db_stats) -> Engine:
+    if isinstance(engine.pool, _TimedCheckout):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        stats.record_query(statement, ms)
+        current = _request_queries.get()
+        if current is not None:
+            current.add(ms)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    return engine
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """with 블록(요청 하나) 안에서 실행된 쿼리 수 / 시간"""
+    stats = QueryStats()
+    token = _request_queries.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_queries.reset(token)
@@ -0,0 +1,106 @@
+# db/migrate_explanation_blobs.py
+"""
+explanation.token / token_score(JSON text) → token_blob / token_score_blob(bytes) 변환
+1) blob 컬럼이 없으면 추가 → 새 버전 API 를 띄우기 전에 실행 (컬럼 추가는 바로 끝남)
+2) blob 이 비어 있는 행을 id 순서로 batch 씩 변환하고 batch 마다 커밋
+   중단 후 다시 실행하면 남은 행만 이어서 진행. API 는 변환 전 행도 JSON 으로 읽으므로 서비스 중 실행 가능
+3) 변환한 행의 JSON 컬럼은 NULL 로 비움 (--keep-json 이면 유지)
+
+실행:
+    python -m db.migrate_explanation_blobs
+    python -m db.migrate_explanation_blobs --batch-size 1000 --keep-json
+"""
+import argparse
+import json
+import logging
+from typing import Dict, List
+
+from sqlalchemy import LargeBinary, bindparam, func, inspect, select, text, update
+from sqlalchemy.engine import Engine
+
+from db.models.explanation import Explanation, pack_scores, pack_tokens
+
+logger = logging.getLogger(__name__)
+
+BLOB_COLUMNS = ("token_blob", "token_score_blob")
+
+def add_blob_columns(engine: Engine) -> List[str]:
+    """없는 blob 컬럼을 추가하고 추가한 컬럼 이름을 반환"""
+    existing = {c["name"] for c in inspect(engine).get_columns(Explanation.__tablename__)}
+    blob_type = LargeBinary().compile(dialect=engine.dialect)
+    added = []
+    with engine.begin() as conn:
+        for name in BLOB_COLUMNS:
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {Explanation.__tablename__} ADD COLUMN {name} {blob_type}"))
+                added.append(name)
+    return added
+
+def convert_rows(engine: Engine, batch_size: int = 500, keep_json: bool = False) -> Dict[str, int]:
+    """
+    JSON 만 있는 행을 blob 으로 변환. 반환: {"converted", "skipped"}
+    JSON 이 깨졌거나 token 에 NUL 이 있는 행은 건너뜀 (JSON 그대로 남아 계속 읽힘)
+    """
+    table = Explanation.__table__
+    values = {"token_blob": bindparam("b_token"), "token_score_blob": bindparam("b_score")}
+    if not keep_json:
+        values.update(token=None, token_score=None)
+    stmt = update(table).where(table.c.id == bindparam("b_id")).values(**values)
+
+    summary = {"converted": 0, "skipped": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.token, table.c.token_score)
+                .where(table.c.id > last_id, table.c.token_blob.is_(None), table.c.token.is_not(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return summary
+            params = []
+            for row_id, token, token_score in rows:
+                try:
+                    params.append({
+                        "b_id": row_id,
+                        "b_token": pack_tokens(json.loads(token)),
+                        "b_score": pack_scores(json.loads(token_score or "[]")),
+                    })
+                except (ValueError, TypeError) as e:
+                    summary["skipped"] += 1
+                    logger.warning("explanation id=%s not converted: %s", row_id, e)
+            if params:
+                conn.execute(stmt, params)
+        summary["converted"] += len(params)
+        last_id = rows[-1][0]
+
+def storage_bytes(engine: Engine) -> Dict[str, int]:
+    """형식별 저장 바이트 합계 (token + score)"""
+    table = Explanation.__table__
+    with engine.connect() as conn:
+        json_bytes, blob_bytes = conn.execute(select(
+            func.coalesce(func.sum(func.length(table.c.token) + func.coalesce(func.length(table.c.token_score), 0)), 0),
+            func.coalesce(func.sum(func.length(table.c.token_blob) + func.coalesce(func.length(table.c.token_score_blob), 0)), 0),
+        )).one()
+    return {"json": int(json_bytes), "blob": int(blob_bytes)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m db.migrate_explanation_blobs")
+    parser.add_argument("--batch-size", type=int, default=500, help="커밋 단위 행 수")
+    parser.add_argument("--keep-json", action="store_true", help="변환한 행의 JSON 컬럼을 비우지 않음")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from db.session import engine
+
+    added = add_blob_columns(engine)
+    print(f"columns added: {added or 'none'}")
+    before = storage_bytes(engine)
+    summary = convert_rows(engine, args.batch_size, args.keep_json)
+    after = storage_bytes(engine)
+    print(f"rows converted: {summary['converted']}, skipped: {summary['skipped']}")
+    print(f"bytes (json / blob): before {before['json']} / {before['blob']}, after {after['json']} / {after['blob']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# db/migrate_news_dedupe.py
+"""
+news 테이블에 link_hash / 중복 제거 / index 적용
+1) link_hash 컬럼이 없으면 추가 (기존 행 때문에 DB 에서는 NULL 허용으로 추가)
+2) link_hash 가 비어 있는 행을 id 순서로 batch 씩 채우고 batch 마다 커밋. 중단 후 다시 실행하면 남은 행만
+3) (ticker_id, link_hash) 가 같은 행 중 가장 먼저 저장된 행(id 최소)만 남기고 삭제
+4) unique index uq_news_link, 최신 N건 조회용 ix_news_ticker_pub 생성
+새 버전 API 는 link_hash 를 채워 INSERT 하므로 1) 이후에는 서비스 중에도 실행 가능
+(큰 테이블에서 4) 는 index 를 만드는 동안 쓰기를 막는 DB 가 있으므로 한가한 시간에)
+
+실행:
+    python -m db.migrate_news_dedupe
+    python -m db.migrate_news_dedupe --batch-size 5000
+"""
+import argparse
+import logging
+from typing import Dict, List
+
+from sqlalchemy import String, bindparam, inspect, select, text, update
+from sqlalchemy.engine import Engine
+
+from db.models.news import News, hash_link
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "uq_news_link": "CREATE UNIQUE INDEX uq_news_link ON news (ticker_id, link_hash)",
+    "ix_news_ticker_pub": "CREATE INDEX ix_news_ticker_pub ON news (ticker_id, pub_date, id)",
+}
+
+def add_hash_column(engine: Engine) -> bool:
+    """link_hash 컬럼이 없으면 추가. 추가했으면 True"""
+    existing = {c["name"] for c in inspect(engine).get_columns(News.__tablename__)}
+    if "link_hash" in existing:
+        return False
+    hash_type = String(40).compile(dialect=engine.dialect)
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {News.__tablename__} ADD COLUMN link_hash {hash_type}"))
+    return True
+
+def fill_hashes(engine: Engine, batch_size: int = 2000) -> int:
+    """link_hash 가 NULL 인 행을 채움. 반환: 채운 행 수"""
+    table = News.__table__
+    stmt = update(table).where(table.c.id == bindparam("b_id")).values(link_hash=bindparam("b_hash"))
+    filled = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.link)
+                .where(table.c.id > last_id, table.c.link_hash.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return filled
+            conn.execute(stmt, [{"b_id": row_id, "b_hash": hash_link(link)} for row_id, link in rows])
+        filled += len(rows)
+        last_id = rows[-1][0]
+
+def delete_duplicates(engine: Engine, batch_size: int = 2000) -> int:
+    """
+    (ticker_id, link_hash) 별로 id 가 가장 작은 행만 남김. 반환: 삭제한 행 수
+    index 가 생기기 전이므로 (ticker_id, link_hash, id) 순서로 한 번 정렬해 읽으며 지울 id 를 모은 뒤 primary key 로 삭제
+    """
+    table = News.__table__
+    ids: List[int] = []
+    previous = None
+    with engine.connect() as conn:
+        rows = conn.execution_options(stream_results=True).execute(
+            select(table.c.ticker_id, table.c.link_hash, table.c.id)
+            .order_by(table.c.ticker_id, table.c.link_hash, table.c.id)
+        )
+        for ticker_id, link_hash, row_id in rows:
+            if (ticker_id, link_hash) == previous:
+                ids.append(row_id)
+            previous = (ticker_id, link_hash)
+    for i in range(0, len(ids), batch_size):
+        with engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.id.in_(ids[i:i + batch_size])))
+    return len(ids)
+
+def create_indexes(engine: Engine) -> List[str]:
+    """없는 index 를 만들고 만든 index 이름을 반환"""
+    insp = inspect(engine)
+    existing = {i["name"] for i in insp.get_indexes(News.__tablename__)}
+    existing |= {u["name"] for u in insp.get_unique_constraints(News.__tablename__)}
+    created = []
+    with engine.begin() as conn:
+        for name, ddl in INDEXES.items():
+            if name not in existing:
+                conn.execute(text(ddl))
+                created.append(name)
+    return created
+
+def migrate(engine: Engine, batch_size: int = 2000) -> Dict[str, object]:
+    """1) ~ 4) 를 순서대로. 반환: 단계별 결과"""
+    return {
+        "column_added": add_hash_column(engine),
+        "hashed": fill_hashes(engine, batch_size),
+        "deleted": delete_duplicates(engine, batch_size),
+        "indexes_created": create_indexes(engine),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m db.migrate_news_dedupe")
+    parser.add_argument("--batch-size", type=int, default=2000, help="커밋 단위 행 수")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from db.session import engine
+
+    summary = migrate(engine, args.batch_size)
+    print(f"column added: {summary['column_added']}")
+    print(f"rows hashed: {summary['hashed']}, duplicates deleted: {summary['deleted']}")
+    print(f"indexes created: {summary['indexes_created'] or 'none'}")
+
+if __name__ == "__main__":
+    main()
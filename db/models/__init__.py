@@ -1,2 +1,2 @@
 # db/models/__init__.py
-from . import explanation, ticker, chart_data, prediction, news
+from . import explanation, ticker, chart_data, prediction, news, ingest_watermark, news_watermark, app_meta
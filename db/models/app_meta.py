@@ -0,0 +1,25 @@
+# db/models/app_meta.py
+import uuid
+
+from sqlalchemy import Column, String
+from sqlalchemy.orm import Session
+from ..session import Base
+
+TICKER_VERSION_KEY = "ticker_version"
+
+class AppMeta(Base):
+    __tablename__ = "app_meta"
+
+    key = Column(String(64), primary_key=True)
+    value = Column(String(255))
+
+def bump_ticker_version(db: Session) -> str:
+    """ticker 테이블이 바뀌었음을 알림 (API 프로세스의 ticker registry 가 다시 로드). 커밋 포함"""
+    version = uuid.uuid4().hex
+    row = db.get(AppMeta, TICKER_VERSION_KEY)
+    if row:
+        row.value = version
+    else:
+        db.add(AppMeta(key=TICKER_VERSION_KEY, value=version))
+    db.commit()
+    return version
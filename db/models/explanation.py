@@ -1,8 +1,59 @@
 # db/models/explaination.py
-from sqlalchemy import Column, Integer, Date, ForeignKey, Text, UniqueConstraint
+"""
+token / score 저장 형식
+- token_blob: UTF-8 token 마다 뒤에 NUL(\\x00) 을 붙여 이어 붙인 bytes → bytes.decode + str.split 한 번으로 복원
+- token_score_blob: little-endian float32 배열 → memoryview.cast 로 파싱 없이 list 로 변환 (score 1개당 4 bytes)
+- token / token_score(JSON text)는 이전 형식. blob 이 없는 행만 읽음
+  새로 쓰는 값은 blob 으로 나타낼 수 없을 때만(NUL 이 든 token, float 가 아닌 score) 이 형식으로 저장
+  → 모델 출력이 어떤 값이든 저장 / 응답이 실패하지 않음. 기존 행 변환은 python -m db.migrate_explanation_blobs
+"""
 import json
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column, Integer, Date, ForeignKey, LargeBinary, Text, UniqueConstraint
 from ..session import Base
 
+_SEP = "\x00"
+
+def pack_tokens(tokens: Sequence[str]) -> bytes:
+    if any(_SEP in t for t in tokens):
+        raise ValueError("token must not contain NUL")
+    return "".join(t + _SEP for t in tokens).encode("utf-8")
+
+def unpack_tokens(blob: bytes) -> List[str]:
+    # 마지막 구분자 뒤의 빈 문자열 제거 (빈 목록 b"" → [])
+    return blob.decode("utf-8").split(_SEP)[:-1]
+
+def pack_scores(scores: Sequence[float]) -> bytes:
+    packed = array("f", scores)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_scores(blob: bytes) -> List[float]:
+    if sys.byteorder == "big":
+        packed = array("f")
+        packed.frombytes(blob)
+        packed.byteswap()
+        return packed.tolist()
+    return memoryview(blob).cast("f").tolist()
+
+def _encode_tokens(tokens: Sequence[str]) -> Tuple[Optional[bytes], Optional[str]]:
+    """(token_blob, token). blob 으로 나타낼 수 없으면 JSON"""
+    try:
+        return pack_tokens(tokens), None
+    except (ValueError, TypeError):
+        return None, json.dumps(list(tokens), ensure_ascii=False)
+
+def _encode_scores(scores: Sequence[float]) -> Tuple[Optional[bytes], Optional[str]]:
+    """(token_score_blob, token_score). blob 으로 나타낼 수 없으면 JSON"""
+    try:
+        return pack_scores(scores), None
+    except (ValueError, TypeError):
+        return None, json.dumps(list(scores))
+
 class Explanation(Base):
     __tablename__ = "explanation"
 
@@ -10,22 +61,39 @@ class Explanation(Base):
     ticker_id = Column(Integer, ForeignKey("ticker.id"), nullable=False)
     predicted_date = Column(Date, nullable=False)
     horizon_days = Column(Integer, nullable=False)
-    token = Column(Text)
-    token_score = Column(Text)
+    token_blob = Column(LargeBinary)
+    token_score_blob = Column(LargeBinary)
+    token = Column(Text)          # 이전 형식 (JSON)
+    token_score = Column(Text)    # 이전 형식 (JSON)
 
     __table_args__ = (
         UniqueConstraint("ticker_id", "predicted_date", "horizon_days", name="uq_explanation_main"),
     )
 
+    @staticmethod
+    def encode(tokens: Sequence[str], scores: Sequence[float]) -> Dict[str, Optional[object]]:
+        """bulk insert 용 컬럼 값"""
+        token_blob, token = _encode_tokens(tokens)
+        token_score_blob, token_score = _encode_scores(scores)
+        return {
+            "token_blob": token_blob,
+            "token_score_blob": token_score_blob,
+            "token": token,
+            "token_score": token_score,
+        }
+
     def set_token(self, token_list):
-        self.token = json.dumps(token_list)
+        self.token_blob, self.token = _encode_tokens(token_list)
 
     def get_token(self):
+        if self.token_blob is not None:
+            return unpack_tokens(self.token_blob)
         return json.loads(self.token)
 
     def set_token_score(self, score_list):
-        self.token_score = json.dumps(score_list)
+        self.token_score_blob, self.token_score = _encode_scores(score_list)
 
     def get_token_score(self):
+        if self.token_score_blob is not None:
+            return unpack_scores(self.token_score_blob)
         return json.loads(self.token_score)
-
@@ -0,0 +1,11 @@
+# db/models/ingest_watermark.py
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey
+from ..session import Base
+
+class IngestWatermark(Base):
+    __tablename__ = "ingest_watermark"
+
+    ticker_id = Column(Integer, ForeignKey("ticker.id"), primary_key=True)
+    interval = Column(Integer, primary_key=True)  # 1, 7, 30
+    last_date = Column(Date)          # 마지막으로 저장된 bar 날짜
+    checked_at = Column(DateTime)     # 마지막 수집 성공 시각 (UTC)
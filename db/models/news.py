@@ -1,7 +1,23 @@
 # db/models/news.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+"""
+- link_hash: link 의 sha1 hex. (ticker_id, link_hash) unique → 같은 기사는 재발행(pubDate 변경)돼도 한 번만 저장
+  link 원문(최대 512자) 대신 40자 hash 로 unique index 를 작게 유지
+- ix_news_ticker_pub (ticker_id, pub_date, id): 종목별 최신 N건을 정렬 없이 index 순서대로 읽음
+  id 만 읽는 조회(ETag 버전)는 테이블을 읽지 않고 index 만으로 끝남
+  기존 DB 는 python -m db.migrate_news_dedupe
+"""
+import hashlib
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint
 from ..session import Base
 
+def hash_link(link: str) -> str:
+    return hashlib.sha1(link.strip().encode("utf-8")).hexdigest()
+
+def _default_link_hash(context) -> str:
+    # link_hash 를 직접 넘기지 않은 INSERT (ORM add, bulk_insert) 는 link 로 채움
+    return hash_link(context.get_current_parameters()["link"])
+
 class News(Base):
     __tablename__ = "news"
 
@@ -10,5 +26,11 @@ class News(Base):
     title = Column(String(256), nullable=False)
     summary = Column(Text)
     link = Column(String(512), nullable=False)
+    link_hash = Column(String(40), nullable=False, default=_default_link_hash)
     pub_date = Column(DateTime, nullable=False)
     provider = Column(String(64))
+
+    __table_args__ = (
+        UniqueConstraint("ticker_id", "link_hash", name="uq_news_link"),
+        Index("ix_news_ticker_pub", "ticker_id", "pub_date", "id"),
+    )
@@ -0,0 +1,9 @@
+# db/models/news_watermark.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from ..session import Base
+
+class NewsWatermark(Base):
+    __tablename__ = "news_watermark"
+
+    ticker_id = Column(Integer, ForeignKey("ticker.id"), primary_key=True)
+    checked_at = Column(DateTime)     # 마지막으로 yfinance 뉴스를 확인한 시각 (UTC)
@@ -8,6 +8,9 @@ import FinanceDataReader as fdr
 from sqlalchemy.orm import Session
 from db.session import SessionLocal
 from db.models.ticker import Ticker
+from db.models.app_meta import bump_ticker_version
+from db.upsert import bulk_upsert
+from app.crud.search import rebuild_search_index
 
 def get_kospi_tickers(limit=100):
     kospi = fdr.StockListing('KOSPI')
@@ -15,22 +18,22 @@ def get_kospi_tickers(limit=100):
     return top[['Code', 'Name']].reset_index(drop=True)
 
 def seed_kospi_tickers():
+    """시가총액 상위 종목을 한 문장으로 upsert (있는 종목은 회사명만 갱신)"""
     session: Session = SessionLocal()
     tickers = get_kospi_tickers()
-
-    for _, row in tickers.iterrows():
-        ticker_code = row['Code']
-        name = row['Name']
-
-        existing = session.query(Ticker).filter_by(ticker_code=ticker_code).first()
-        if existing:
-            existing.company_name = name
-        else:
-            session.add(Ticker(ticker_code=ticker_code, company_name=name, market='KOSPI'))
-
+    rows = [
+        {"ticker_code": row['Code'], "company_name": row['Name'], "market": 'KOSPI'}
+        for _, row in tickers.iterrows()
+    ]
+    bulk_upsert(session, Ticker, rows, update_cols=["company_name"], conflict_cols=["ticker_code"],
+                batch_size=max(1, len(rows)))
     session.commit()
+    bump_ticker_version(session)
+    # 자모/초성/로마자 검색 키 재생성 (API 프로세스는 ticker_version 변경을 보고 다시 만듦)
+    index = rebuild_search_index(session)
+    print(f"Search index rebuilt: {len(index)} tickers, {index.hangul_entries} with Korean search keys.")
     session.close()
-    print("KOSPI tickers inserted into MySQL successfully.")
+    print(f"KOSPI tickers upserted: {len(rows)}")
 
 if __name__ == "__main__":
     seed_kospi_tickers()
@@ -1,16 +1,44 @@
 # db/seeds/seed_us_tickers.py
+"""
+S&P 500 + NASDAQ-100 종목 seed
+- 회사명은 yfinance info 로 받음: SEED_WORKERS 개 thread, 전체 SEED_RATE_PER_SEC 회/초, 실패 시 backoff 재시도
+- 받은 이름은 SEED_CHECKPOINT 파일에 한 줄씩 기록 → 중단 후 다시 실행하면 남은 종목만 호출
+- 전부 받은 뒤 ticker 테이블에 한 번에 upsert (있는 종목은 회사명만 갱신) 하고 checkpoint 삭제
+- --only-new: ticker 테이블에 없는 종목만 호출 (정기 실행용)
+
+실행:
+    python -m db.seeds.seed_us_tickers
+    python -m db.seeds.seed_us_tickers --only-new
+"""
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+import argparse
+import json
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
 import pandas as pd
 import yfinance as yf
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
 
 from db.session import SessionLocal
 from db.models.ticker import Ticker
+from db.models.app_meta import bump_ticker_version
+from db.upsert import bulk_upsert
+from app.scheduler.ratelimit import RateLimiter, retry_with_backoff
+
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "8"))
+# yfinance info 호출 수 / 초 (worker 전체 합, 0 = 제한 없음)
+SEED_RATE_PER_SEC = float(os.getenv("SEED_RATE_PER_SEC", "5"))
+SEED_RETRIES = int(os.getenv("SEED_RETRIES", "3"))
+SEED_CHECKPOINT = os.getenv("SEED_CHECKPOINT", os.path.join(tempfile.gettempdir(), "seed_us_tickers.jsonl"))
 
 def fix_ticker_format(ticker: str) -> str:
     return ticker.replace(".", "-")
@@ -25,41 +53,132 @@ def get_nasdaq_100_tickers():
     df = pd.read_html(url)[4]  # NASDAQ-100 테이블
     return df["Ticker"].tolist()
 
-def fetch_company_name(ticker: str) -> str:
-    try:
-        info = yf.Ticker(ticker).info
-        return info.get("longName") or info.get("shortName")
-    except Exception:
-        return None
-
-def insert_ticker(db: Session, ticker: str, name: str):
-    if not name:
-        print(f"{ticker}: null")
-        return
-
-    existing = db.query(Ticker).filter(Ticker.ticker_code == ticker).first()
-    if existing:
-        existing.company_name = name
-    else:
-        db.add(Ticker(ticker_code=ticker, company_name=name, market="US"))
-    db.commit()
-    # print(f"{ticker}: {name}")
-
-def seed_us_tickers():
-    session = SessionLocal()
-
-    sp500 = get_sp500_tickers()
-    nasdaq = get_nasdaq_100_tickers()
-    all_tickers = list(set(sp500 + nasdaq))
-
-    for raw in all_tickers:
-        ticker = fix_ticker_format(raw)
-        name = fetch_company_name(ticker)
-        insert_ticker(session, ticker, name)
-        time.sleep(0.05)
-
-    session.close()
-    print("US tickers inserted into MySQL successfully!")
+def get_us_tickers() -> List[str]:
+    """두 지수 합집합 (yfinance 표기, 정렬)"""
+    return sorted({fix_ticker_format(t) for t in get_sp500_tickers() + get_nasdaq_100_tickers()})
+
+def fetch_company_name(ticker: str) -> Optional[str]:
+    """info 의 회사명. 이름이 없으면 None, 호출 실패는 예외 그대로 (재시도는 호출자가)"""
+    info = yf.Ticker(ticker).info
+    return info.get("longName") or info.get("shortName")
+
+class NameCheckpoint:
+    """
+    받은 회사명을 종목마다 JSON 한 줄로 덧붙이는 파일 (이름이 없던 종목은 null)
+    쓰다가 끊긴 마지막 줄은 읽을 때 버림
+    """
+
+    def __init__(self, path: str = SEED_CHECKPOINT) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Optional[str]]:
+        names: Dict[str, Optional[str]] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        ticker, name = json.loads(line)
+                    except ValueError:
+                        continue
+                    names[ticker] = name
+        except FileNotFoundError:
+            pass
+        return names
+
+    def add(self, ticker: str, name: Optional[str]) -> None:
+        line = json.dumps([ticker, name], ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def fetch_company_names(tickers: Iterable[str],
+                        checkpoint: NameCheckpoint,
+                        fetch: Callable[[str], Optional[str]] = fetch_company_name,
+                        workers: int = SEED_WORKERS,
+                        rate_per_sec: float = SEED_RATE_PER_SEC,
+                        retries: int = SEED_RETRIES,
+                        sleep: Callable[[float], None] = time.sleep) -> Tuple[Dict[str, Optional[str]], Dict[str, int]]:
+    """
+    checkpoint 에 없는 종목만 병렬로 호출. 반환: ({ticker: 이름}, {"resumed", "fetched", "failed"})
+    재시도까지 실패한 종목은 checkpoint 에 남기지 않음 → 다음 실행에서 다시 호출
+    """
+    tickers = list(tickers)
+    done = checkpoint.load()
+    names = {t: done[t] for t in tickers if t in done}
+    todo = [t for t in tickers if t not in done]
+    limiter = RateLimiter(rate_per_sec, sleep=sleep)
+    summary = {"resumed": len(names), "fetched": 0, "failed": 0}
+
+    def fetch_one(ticker: str) -> Tuple[str, Optional[str], bool]:
+        def _fetch():
+            limiter.acquire()
+            return fetch(ticker)
+
+        try:
+            name = retry_with_backoff(_fetch, attempts=retries, sleep=sleep)
+        except Exception as e:
+            print(f"{ticker}: fetch failed ({e})")
+            return ticker, None, False
+        checkpoint.add(ticker, name)
+        return ticker, name, True
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="seed") as pool:
+        for ticker, name, ok in pool.map(fetch_one, todo):
+            if ok:
+                names[ticker] = name
+                summary["fetched"] += 1
+            else:
+                summary["failed"] += 1
+    return names, summary
+
+def upsert_tickers(db, names: Dict[str, Optional[str]], market: str) -> int:
+    """이름이 있는 종목을 한 문장으로 upsert (있는 종목은 company_name 만 갱신). 커밋은 호출자가"""
+    rows = [{"ticker_code": t, "company_name": n, "market": market} for t, n in sorted(names.items()) if n]
+    return bulk_upsert(db, Ticker, rows, update_cols=["company_name"], conflict_cols=["ticker_code"],
+                       batch_size=max(1, len(rows)))
+
+def seed_us_tickers(session_factory: sessionmaker = SessionLocal,
+                    tickers: Optional[List[str]] = None,
+                    only_new: bool = False,
+                    checkpoint: Optional[NameCheckpoint] = None,
+                    **fetch_options) -> Dict[str, int]:
+    """
+    반환: {"symbols", "resumed", "fetched", "failed", "missing", "upserted"}
+    실패한 종목이 있으면 받은 만큼 저장하고 checkpoint 는 남김 (다시 실행하면 실패한 종목만 호출)
+    """
+    checkpoint = checkpoint or NameCheckpoint()
+    tickers = tickers if tickers is not None else get_us_tickers()
+    with session_factory() as session:
+        if only_new:
+            stored = set(session.execute(select(Ticker.ticker_code).where(Ticker.market == "US")).scalars())
+            tickers = [t for t in tickers if t not in stored]
+
+        names, summary = fetch_company_names(tickers, checkpoint, **fetch_options)
+        for ticker, name in sorted(names.items()):
+            if not name:
+                print(f"{ticker}: null")
+        summary = {"symbols": len(tickers), **summary,
+                   "missing": sum(1 for n in names.values() if not n)}
+        summary["upserted"] = upsert_tickers(session, names, "US")
+        session.commit()
+        if summary["upserted"]:
+            bump_ticker_version(session)
+    if not summary["failed"]:
+        checkpoint.clear()
+    return summary
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m db.seeds.seed_us_tickers")
+    parser.add_argument("--only-new", action="store_true", help="ticker 테이블에 없는 종목만 호출")
+    args = parser.parse_args()
+    summary = seed_us_tickers(only_new=args.only_new)
+    print(f"US tickers upserted: {summary}")
 
 if __name__ == "__main__":
-    seed_us_tickers()
\ No newline at end of file
+    main()
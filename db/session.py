@@ -4,13 +4,36 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
 
+from db.instrument import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env")
 
-engine = create_engine(DATABASE_URL)
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    env 로 조정하는 connection pool 설정
+    - pre_ping: checkout 때 연결 확인 → MySQL wait_timeout 으로 끊긴 연결("server has gone away") 재연결
+    - recycle: wait_timeout(기본 8시간)보다 짧게 두어 오래된 연결을 미리 교체
+    - size / overflow: uvicorn worker 당 동시 요청 수에 맞춰 조정 (GET /db/stats 의 checkout 대기 참고)
+      SINGLEFLIGHT_DB_LOCK=1 이면 GET_LOCK 을 기다리는 요청은 session 과 잠금용으로 connection 2개를 씀
+    sqlite 는 SQLAlchemy 기본 pool 을 그대로 사용. async engine(db.async_session)도 같은 설정을 씀
+    """
+    options = {"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1"}
+    if url.startswith("sqlite"):
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
+    return options
+
+engine = instrument_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
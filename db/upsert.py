@@ -0,0 +1,80 @@
+# db/upsert.py
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# executemany 한 번에 넘길 최대 행 수
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+def _batches(rows: Sequence[Dict], size: int) -> Iterable[Sequence[Dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+def bulk_upsert(
+    db: Session,
+    model,
+    rows: Sequence[Dict],
+    update_cols: Optional[List[str]] = None,
+    conflict_cols: Optional[List[str]] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> int:
+    """
+    rows 를 batch 단위 INSERT 로 저장하고, 키가 겹치면 update_cols 만 갱신
+    - MySQL: INSERT ... ON DUPLICATE KEY UPDATE
+    - SQLite / PostgreSQL: INSERT ... ON CONFLICT (conflict_cols) DO UPDATE
+    - conflict_cols 기본값은 primary key, update_cols 기본값은 그 외 모든 컬럼
+    - update_cols=[] 이면 겹치는 행은 건너뜀 (DO NOTHING)
+    커밋은 호출자가 함. 반환: 전달한 행 수
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    if conflict_cols is None:
+        conflict_cols = [c.name for c in table.primary_key.columns]
+    if update_cols is None:
+        update_cols = [c for c in rows[0] if c not in conflict_cols]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        # 갱신할 컬럼이 없으면 키 컬럼을 자기 자신으로 두어 no-op 처리
+        stmt = stmt.on_duplicate_key_update(
+            {c: stmt.inserted[c] for c in update_cols}
+            or {conflict_cols[0]: table.c[conflict_cols[0]]}
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        dialect_mod = sqlite if dialect == "sqlite" else postgresql
+        stmt = dialect_mod.insert(table)
+        if update_cols:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_cols,
+                set_={c: stmt.excluded[c] for c in update_cols},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_cols)
+    else:
+        raise NotImplementedError(f"bulk_upsert does not support dialect {dialect!r}")
+
+    # executemany: pymysql 은 batch 를 multi-row VALUES 한 문장으로 재작성,
+    # sqlite3 는 준비된 문장 하나를 C 레벨에서 반복 실행
+    for batch in _batches(list(rows), batch_size):
+        db.execute(stmt, list(batch))
+    return len(rows)
+
+def bulk_insert(
+    db: Session,
+    model,
+    rows: Sequence[Dict],
+    batch_size: int = BULK_BATCH_SIZE,
+) -> int:
+    """충돌 키가 없는 테이블용 batch INSERT. 커밋은 호출자가 함"""
+    if not rows:
+        return 0
+    stmt = insert(model.__table__)
+    for batch in _batches(list(rows), batch_size):
+        db.execute(stmt, list(batch))
+    return len(rows)
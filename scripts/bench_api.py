@@ -0,0 +1,427 @@
+# scripts/bench_api.py
+"""
+API 부하 / 회귀 벤치마크
+- FastAPI app 을 SQLite(기본: 임시 파일) 또는 로컬 MySQL 위에서 startup 까지 실행하고 ASGI 로 직접 호출
+- upstream 은 가짜로 대체: yfinance 시세(FakeProvider) / FDR / yfinance 뉴스 / 모델 서버(로컬 HTTP stub)
+- /search, /stock-info/basic, /stock-info/pred, /stock-info/exp 를 동시 접속 수 × 캐시 히트 비율로 실행하고
+  처리량(RPS), 지연 p50/p90/p95/p99/max, 오류 수, 요청당 DB 쿼리 수 출력
+- hit 요청은 미리 채운 종목, miss 요청은 아직 요청된 적 없는 (종목, horizon) 으로 보내므로 실행 내내 비율이 유지됨
+- --save-baseline 으로 결과를 저장하고, --baseline 으로 비교해 처리량 감소 / p95 증가가
+  --tolerance 를 넘거나 오류가 늘면 REGRESSION 으로 표시하고 exit 1
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_api.py --save-baseline bench_baseline.json
+    DATABASE_URL=sqlite:// python scripts/bench_api.py --baseline bench_baseline.json
+    DATABASE_URL=sqlite:// python scripts/bench_api.py --endpoints pred,exp --concurrency 1,50 --hit-ratio 0.5
+    DATABASE_URL=sqlite:// python scripts/bench_api.py --database-url mysql+pymysql://u:p@localhost/bench
+      (해당 DB 의 테이블을 drop/create 하므로 운영 DB 에 쓰지 말 것)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs, quote, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.main
+import db.async_session
+from app.crud import chart, news, utils
+from app.crud.aggregate import rebuild_aggregates
+from app.crud.bars import bars_to_records
+from app.crud.providers import FakeProvider, set_provider
+from db.async_session import async_url
+from db.instrument import db_stats, instrument_engine
+from db.models.explanation import Explanation
+from db.models.news import News
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+from db.session import Base, engine_options
+
+ENDPOINTS = {
+    "search": "/search",
+    "basic": "/stock-info/basic",
+    "pred": "/stock-info/pred",
+    "exp": "/stock-info/exp",
+}
+HORIZONS = (1, 7, 30)
+US_WORDS = ["Apple", "Global", "Micro", "Energy", "Health", "Capital", "Systems", "Bio", "Motor", "Data"]
+KO_WORDS = ["삼성", "현대", "LG", "SK", "한화", "전자", "화학", "바이오", "금융", "건설"]
+# 가짜 뉴스 피드가 항상 돌려주는 기사 날짜. hit 종목에는 같은 기사를 미리 저장
+NEWS_DATES = [datetime(2025, 1, d, 9) for d in range(2, 7)]
+# p95 가 이 값(ms) 미만으로만 늘면 허용치를 넘어도 잡음으로 봄
+MIN_P95_DELTA_MS = 1.0
+
+# 가짜 upstream
+class FakeFdr:
+    """FinanceDataReader.DataReader 대체"""
+
+    def __init__(self, latency: float) -> None:
+        self.provider = FakeProvider(latency=latency, seed=1)
+
+    def DataReader(self, ticker, start=None, end=None):
+        return self.provider.history(ticker, start, end + timedelta(days=1), 1)
+
+class FakeNewsFeed:
+    """yfinance.Ticker(code).news 대체: 항상 NEWS_DATES 의 기사 5건"""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    def Ticker(self, code):
+        time.sleep(self.latency)
+        return SimpleNamespace(news=[
+            {"content": {
+                "title": f"{code} headline {i}",
+                "summary": "bench",
+                "canonicalUrl": {"url": f"https://news.local/{code}/{i}"},
+                "pubDate": d.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "provider": {"displayName": "Bench"},
+            }}
+            for i, d in enumerate(NEWS_DATES)
+        ])
+
+def start_model_server(latency: float) -> ThreadingHTTPServer:
+    """/predict, /explain 에 응답하는 로컬 모델 서버 stub (NGROK_API_URL 로 지정)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            time.sleep(latency)
+            if url.path == "/predict":
+                body = {"prediction_result": 100.0 + int(params["horizon_days"][0])}
+            elif url.path == "/explain":
+                body = {"token_list": ["rate", "earnings", "guidance"], "token_score_list": [0.5, 0.3, 0.2]}
+            else:
+                self.send_error(404)
+                return
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# DB
+def make_engines(url: str):
+    options = engine_options(url)
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+    sync_engine = instrument_engine(create_engine(url, **options))
+    aurl = async_url(url)
+    async_engine = create_async_engine(aurl, **engine_options(aurl, is_async=True))
+    instrument_engine(async_engine.sync_engine)
+
+    if url.startswith("sqlite"):
+        # miss 요청의 쓰기 중에도 다른 요청이 읽을 수 있도록
+        for e in (sync_engine, async_engine.sync_engine):
+            event.listen(e, "connect", lambda conn, _: conn.execute("PRAGMA journal_mode=WAL"))
+    return sync_engine, async_engine
+
+def make_tickers(n: int, prefix: str, rnd: random.Random):
+    rows = []
+    for i in range(n):
+        if i % 2:
+            rows.append(Ticker(ticker_code=f"{prefix}{i:05d}", market="KOSPI",
+                               company_name="".join(rnd.sample(KO_WORDS, 2)) + str(i)))
+        else:
+            rows.append(Ticker(ticker_code=f"{prefix}U{i}", market="US",
+                               company_name=" ".join(rnd.sample(US_WORDS, 2)) + f" {i} Inc."))
+    return rows
+
+def seed(sync_engine, n_hot: int, n_cold: int, rnd: random.Random):
+    """hot: chart(오늘까지) / 뉴스 / 모든 horizon 의 예측·설명이 저장된 종목, cold: 종목 행만"""
+    Base.metadata.drop_all(sync_engine)
+    Base.metadata.create_all(sync_engine)
+    hot = make_tickers(n_hot, "H", rnd)
+    cold = make_tickers(n_cold, "C", rnd)
+    today = datetime.now(timezone.utc).date()
+    provider = FakeProvider()
+
+    with sessionmaker(bind=sync_engine)() as s:
+        s.add_all(hot + cold)
+        s.flush()
+        for t in hot:
+            bars = bars_to_records(provider._frame(t.ticker_code, today - timedelta(days=120), today, 1), date.min)
+            # 요청 경로가 upstream 을 부르지 않도록 마지막 bar 를 오늘 날짜로 맞춤 (주말 포함)
+            bars.append({**bars[-1], "date": today})
+            chart.store_chart_rows(s, t.id, 1, bars)
+            rebuild_aggregates(s, t.id)
+            s.add_all(
+                News(ticker_id=t.id, title=f"{t.ticker_code} headline {i}", summary="bench",
+                     link=f"https://news.local/{t.ticker_code}/{i}", pub_date=d, provider="Bench")
+                for i, d in enumerate(NEWS_DATES)
+            )
+            for h in HORIZONS:
+                pred_date = date.today() + timedelta(days=h)
+                s.add(Prediction(ticker_id=t.id, predicted_date=pred_date, horizon_days=h, prediction_result=1.0))
+                exp = Explanation(ticker_id=t.id, predicted_date=pred_date, horizon_days=h)
+                exp.set_token(["rate", "earnings"])
+                exp.set_token_score([0.6, 0.4])
+                s.add(exp)
+        hot_names = [(t.ticker_code, t.company_name) for t in hot]
+        cold_codes = [t.ticker_code for t in cold]
+        s.commit()
+    return [code for code, _ in hot_names], hot_names, cold_codes
+
+# 요청 목록
+class Workload:
+    def __init__(self, hot, hot_names, cold, hit_ratio: float, rnd: random.Random) -> None:
+        self.hot = hot
+        self.hot_names = hot_names
+        self.hit_ratio = hit_ratio
+        self.rnd = rnd
+        # endpoint 별로 아직 요청하지 않은 키. basic 은 종목 단위(chart·news), pred/exp 는 (종목, horizon) 단위
+        self.fresh = {
+            "basic": iter([(c, rnd.choice(HORIZONS)) for c in cold]),
+            "pred": iter([(c, h) for c in cold for h in HORIZONS]),
+            "exp": iter([(c, h) for c in cold for h in HORIZONS]),
+        }
+
+    def queries(self, endpoint: str, n: int):
+        path = ENDPOINTS[endpoint]
+        if endpoint == "search":
+            # 자동완성: 종목명/코드의 앞부분을 한 글자 이상 입력한 상태
+            out = []
+            for _ in range(n):
+                code, name = self.rnd.choice(self.hot_names)
+                word = self.rnd.choice((code, name))
+                out.append((path, "keyword=" + quote(word[:self.rnd.randint(1, len(word))])))
+            return out
+
+        n_miss = round(n * (1 - self.hit_ratio))
+        plan = [False] * n_miss + [True] * (n - n_miss)
+        self.rnd.shuffle(plan)
+        out = []
+        for hit in plan:
+            if hit:
+                code, horizon = self.rnd.choice(self.hot), self.rnd.choice(HORIZONS)
+            else:
+                code, horizon = next(self.fresh[endpoint])
+            out.append((path, f"ticker={code}&horizon={horizon}"))
+        return out
+
+def cold_tickers_needed(endpoints, requests: int, runs: int, hit_ratio: float) -> int:
+    misses = round(requests * (1 - hit_ratio)) * runs
+    if "basic" in endpoints:
+        return misses
+    return math.ceil(misses / len(HORIZONS))
+
+# 실행
+async def call(path: str, query: str) -> int:
+    status = 500
+    received = False
+
+    async def receive():
+        # middleware 가 연결 종료를 확인하려고 다시 부르면 응답이 끝날 때까지 대기
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    await app.main.app(scope, receive, send)
+    return status
+
+def percentile(sorted_values, p: float) -> float:
+    """nearest-rank"""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+async def run_scenario(endpoint: str, concurrency: int, queries) -> dict:
+    latencies, errors = [], 0
+    pending = iter(queries)
+
+    async def client():
+        nonlocal errors
+        for path, query in pending:
+            start = time.perf_counter()
+            status = await call(path, query)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+
+    db_stats.reset()
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - began
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    route = db_stats.snapshot()["requests"].get(ENDPOINTS[endpoint], {})
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p90_ms": round(percentile(ms, 90), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(ms[-1], 2),
+        "queries_per_request": route.get("avg_queries", 0.0),
+    }
+
+async def run_all(args, workload) -> dict:
+    await app.main.app.router.startup()
+    results = {}
+    try:
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                queries = workload.queries(endpoint, args.requests)
+                results[f"{endpoint}@c{concurrency}"] = await run_scenario(endpoint, concurrency, queries)
+    finally:
+        await app.main.app.router.shutdown()
+    return results
+
+# 출력 / baseline
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """key → (rps 변화율, p95 변화율, regression 여부)"""
+    out = {}
+    for key, cur in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        rps_change = cur["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        p95_change = cur["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        regressed = (
+            rps_change < -tolerance
+            or (p95_change > tolerance and cur["p95_ms"] - base["p95_ms"] >= MIN_P95_DELTA_MS)
+            or cur["errors"] > base["errors"]
+        )
+        out[key] = (rps_change, p95_change, regressed)
+    return out
+
+def print_table(results: dict, diffs: dict) -> None:
+    header = f"{'scenario':<14} {'rps':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8} {'err':>4} {'q/req':>6}"
+    if diffs:
+        header += f" {'rps Δ':>8} {'p95 Δ':>8}"
+    print(header + "   (latency ms)")
+    for key, r in results.items():
+        line = (f"{key:<14} {r['rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p90_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                f"{r['p99_ms']:>8.2f} {r['max_ms']:>8.2f} {r['errors']:>4} {r['queries_per_request']:>6.2f}")
+        if key in diffs:
+            rps_change, p95_change, regressed = diffs[key]
+            line += f" {rps_change:>+8.1%} {p95_change:>+8.1%}" + ("  REGRESSION" if regressed else "")
+        print(line)
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python scripts/bench_api.py")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        type=lambda s: [e for e in s.split(",") if e],
+                        help="쉼표로 구분 (search,basic,pred,exp)")
+    parser.add_argument("--concurrency", default="1,20", type=lambda s: [int(c) for c in s.split(",")],
+                        help="동시 접속 수 목록 (쉼표로 구분)")
+    parser.add_argument("--requests", type=int, default=300, help="시나리오(endpoint × 동시 접속 수)당 요청 수")
+    parser.add_argument("--hit-ratio", type=float, default=0.9, help="캐시 히트 비율 (search 는 해당 없음)")
+    parser.add_argument("--tickers", type=int, default=100, help="미리 데이터를 채운(hit) 종목 수")
+    parser.add_argument("--upstream-latency", type=float, default=0.02, help="가짜 yfinance/FDR/뉴스 호출 지연 (초)")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="모델 서버 stub 응답 지연 (초)")
+    parser.add_argument("--database-url", help="기본: 임시 sqlite 파일. MySQL 은 테이블을 drop/create 함")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", metavar="PATH", help="결과를 baseline JSON 으로 저장")
+    parser.add_argument("--baseline", metavar="PATH", help="저장된 baseline 과 비교")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="처리량 감소 / p95 증가 허용 비율 (기본 0.15 = 15%%)")
+    args = parser.parse_args()
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+def main() -> int:
+    args = parse_args()
+    # sqlite 쓰기 잠금 대기가 느린 쿼리 경고로 쏟아지지 않도록 (요청당 쿼리 수는 표에 출력)
+    logging.getLogger("db.instrument").setLevel(logging.ERROR)
+    rnd = random.Random(args.seed)
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_api.db')}"
+    sync_engine, async_engine = make_engines(url)
+
+    n_cold = cold_tickers_needed(args.endpoints, args.requests, len(args.concurrency), args.hit_ratio)
+    hot, hot_names, cold = seed(sync_engine, args.tickers, n_cold, rnd)
+    workload = Workload(hot, hot_names, cold, args.hit_ratio, rnd)
+    model_server = start_model_server(args.model_latency)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.object(utils, "SessionLocal", sessionmaker(bind=sync_engine, autoflush=False)))
+        stack.enter_context(patch.object(db.async_session, "AsyncSessionLocal", AsyncSession))
+        stack.enter_context(patch.object(app.main, "AsyncSessionLocal", AsyncSession))
+        stack.enter_context(patch.object(chart, "fdr", FakeFdr(args.upstream_latency)))
+        stack.enter_context(patch.object(news, "yf", FakeNewsFeed(args.upstream_latency)))
+        stack.enter_context(patch.dict(os.environ, {"NGROK_API_URL": f"http://127.0.0.1:{model_server.server_port}/"}))
+        previous = set_provider("US", FakeProvider(latency=args.upstream_latency))
+        stack.callback(set_provider, "US", previous)
+        results = asyncio.run(run_all(args, workload))
+
+    model_server.shutdown()
+    sync_engine.dispose()
+
+    config = {k: getattr(args, k) for k in
+              ("endpoints", "concurrency", "requests", "hit_ratio", "tickers", "upstream_latency", "model_latency")}
+    print(f"{sync_engine.dialect.name}, hit ratio {args.hit_ratio:.0%}, {args.requests} requests per scenario, "
+          f"upstream {args.upstream_latency * 1000:.0f} ms, model server {args.model_latency * 1000:.0f} ms")
+
+    diffs = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"warning: baseline was recorded with a different config: {baseline.get('config')}")
+        diffs = compare(results, baseline, args.tolerance)
+    print_table(results, diffs)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                                "database": sync_engine.dialect.name},
+                "config": config,
+                "results": results,
+            }, f, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    regressions = [key for key, (_, _, regressed) in diffs.items() if regressed]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
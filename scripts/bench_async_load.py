@@ -0,0 +1,154 @@
+# scripts/bench_async_load.py
+"""
+- /stock-info/pred (캐시 히트 경로) 부하 테스트: 이전 sync 라우터 vs async 라우터
+- sync 라우터는 Starlette threadpool(기본 40 스레드)에서 실행되어 DB 대기 동안 스레드를 점유
+  async 라우터는 AsyncSession 으로 대기하는 동안 이벤트 루프가 다른 요청을 처리
+- sqlite 파일 DB 에 쿼리마다 BENCH_DB_RTT_MS 만큼 지연을 넣어 MySQL 왕복 시간을 흉내냄
+  sync 엔진은 pymysql 처럼 호출 스레드가 막히고(time.sleep), async 엔진은 aiomysql 처럼
+  이벤트 루프에서 기다림(asyncio.sleep). aiosqlite 의 스레드 전달 비용은 그대로 남으므로
+  async 쪽에 불리한(보수적인) 비교
+- 동시 접속 수별로 BENCH_SECONDS 동안 ASGI app 을 직접 호출해 worker 1개의 RPS / p50 / p99 출력
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_async_load.py
+    BENCH_DB_RTT_MS=5 BENCH_CONCURRENCY=50,200 DATABASE_URL=sqlite:// python scripts/bench_async_load.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from fastapi import FastAPI, Query
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util import await_only
+
+from db.session import Base
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+from app.crud import utils
+from app.crud.prediction import run_prediction
+from app.routers import stock
+from app.schemas import PredictionResponse
+import db.async_session
+
+RTT_MS = float(os.getenv("BENCH_DB_RTT_MS", "2"))
+SECONDS = float(os.getenv("BENCH_SECONDS", "3"))
+CONCURRENCY = [int(c) for c in os.getenv("BENCH_CONCURRENCY", "10,50,100,200").split(",")]
+POOL_SIZE = max(CONCURRENCY)
+N_TICKERS = 200
+
+def add_round_trip(engine, wait):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _rtt(conn, cursor, statement, parameters, context, executemany):
+        wait(RTT_MS / 1000)
+
+def make_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    pred_date = date.today() + timedelta(days=7)
+    with sessionmaker(bind=engine)() as s:
+        s.add_all(Ticker(id=i, ticker_code=f"T{i}", market="US") for i in range(1, N_TICKERS + 1))
+        s.add_all(
+            Prediction(ticker_id=i, predicted_date=pred_date, horizon_days=7, prediction_result=1.0)
+            for i in range(1, N_TICKERS + 1)
+        )
+        s.commit()
+    engine.dispose()
+
+def sync_app():
+    """user-013 이전의 sync 라우터"""
+    app = FastAPI()
+
+    @app.get("/stock-info/pred", response_model=PredictionResponse)
+    def get_prediction(ticker: str = Query(...), horizon: int = Query(7)):
+        return PredictionResponse(ticker=ticker, prediction=run_prediction(ticker, horizon))
+
+    return app
+
+def async_app():
+    app = FastAPI()
+    app.include_router(stock.router)
+    return app
+
+async def call(app, path, query):
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    await app(scope, receive, send)
+    return status
+
+async def load(app, concurrency):
+    latencies, errors = [], 0
+    stop = time.perf_counter() + SECONDS
+
+    async def client(n):
+        nonlocal errors
+        i = n
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            status = await call(app, "/stock-info/pred", f"ticker=T{i % N_TICKERS + 1}&horizon=7")
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+            i += concurrency
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - began
+    latencies.sort()
+    return (
+        len(latencies) / elapsed,
+        latencies[len(latencies) // 2] * 1000,
+        latencies[int(len(latencies) * 0.99)] * 1000,
+        errors,
+    )
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    make_db(path)
+
+    pool = dict(pool_size=POOL_SIZE, max_overflow=0, pool_timeout=60)
+    sync_engine = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}, poolclass=QueuePool, **pool
+    )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, **pool)
+    add_round_trip(sync_engine, time.sleep)
+    # async 엔진의 cursor 실행은 greenlet 안에서 돌므로 await_only 로 루프에 양보
+    add_round_trip(async_engine.sync_engine, lambda s: await_only(asyncio.sleep(s)))
+
+    async def main():
+        print(f"simulated DB round trip {RTT_MS} ms, {SECONDS}s per run, pool {POOL_SIZE}")
+        print(f"{'router':<8} {'conc':>5} {'rps':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for label, app in (("sync", sync_app()), ("async", async_app())):
+            # ticker 스냅샷 로드 등 첫 요청 비용은 제외
+            await call(app, "/stock-info/pred", "ticker=T1&horizon=7")
+            for concurrency in CONCURRENCY:
+                rps, p50, p99, errors = await load(app, concurrency)
+                print(f"{label:<8} {concurrency:>5} {rps:>9.0f} {p50:>8.1f} {p99:>8.1f} {errors:>7}")
+        await async_engine.dispose()
+        sync_engine.dispose()
+
+    with patch.object(utils, "SessionLocal", sessionmaker(bind=sync_engine)), \
+         patch.object(db.async_session, "AsyncSessionLocal", async_sessionmaker(async_engine, expire_on_commit=False)):
+        asyncio.run(main())
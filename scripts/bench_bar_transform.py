@@ -0,0 +1,54 @@
+# scripts/bench_bar_transform.py
+"""
+- 10년치 일봉(약 2,600 bar) 변환 속도 비교
+  iterrows (이전 _fetch_us/_fetch_kospi) vs bars_to_records vs bars_to_columns
+- KOSPI 주봉 경로(resample + 변환)도 함께 측정
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_bar_transform.py
+"""
+
+import os
+import sys
+import timeit
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from app.crud.bars import bars_to_columns, bars_to_records, resample_bars
+from app.crud.providers import FakeProvider
+
+REPEAT = 20
+
+def iterrows_rows(df, start):
+    rows, prev_close = [], None
+    for dt, row in df.round(2).iterrows():
+        if dt.date() < start:
+            prev_close = row["Close"]
+            continue
+        change = (
+            round((row["Close"] - prev_close) / prev_close, 4)
+            if prev_close and prev_close != 0 else 0
+        )
+        rows.append({
+            "date": dt.date(), "open": row["Open"], "high": row["High"], "low": row["Low"],
+            "close": row["Close"], "volume": int(row.get("Volume", 0)), "change": change,
+        })
+        prev_close = row["Close"]
+    return rows
+
+def bench(label, fn):
+    best = min(timeit.repeat(fn, number=1, repeat=REPEAT))
+    print(f"{label:<34} {best * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    daily = FakeProvider()._frame("AAPL", date(2015, 1, 1), date(2025, 1, 1), 1)
+    start = date(2015, 1, 15)
+    print(f"{len(daily)} daily bars, best of {REPEAT}")
+
+    bench("iterrows (previous)", lambda: iterrows_rows(daily, start))
+    bench("bars_to_records", lambda: bars_to_records(daily, start))
+    bench("bars_to_columns", lambda: bars_to_columns(daily, start))
+    bench("weekly: resample + iterrows", lambda: iterrows_rows(resample_bars(daily, 7), start))
+    bench("weekly: resample + bars_to_records", lambda: bars_to_records(resample_bars(daily, 7), start))
@@ -0,0 +1,84 @@
+# scripts/bench_bulk_upsert.py
+"""
+- ChartData 적재 속도 비교: 행 단위 db.add (이전 방식) vs bulk_upsert
+- 티커 N개 x 일봉 D일 백필을 흉내내 rows/sec 출력
+- 기본은 sqlite 메모리 DB, BENCH_DATABASE_URL 로 로컬 MySQL 지정 가능
+  (해당 DB 의 테이블을 drop/create 하므로 운영 DB 에 쓰지 말 것)
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_bulk_upsert.py
+    BENCH_DATABASE_URL=mysql+pymysql://user:pw@localhost/bench python scripts/bench_bulk_upsert.py
+"""
+
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.session import Base
+from db.models import chart_data, ticker  # noqa: F401  (테이블 등록)
+from db.models.chart_data import ChartData
+from db.models.ticker import Ticker
+from db.upsert import bulk_upsert
+
+N_TICKERS = 100
+N_DAYS = 250
+
+def make_rows():
+    start = date(2024, 1, 1)
+    return [
+        {
+            "ticker_id": t, "date": start + timedelta(days=d), "interval": 1,
+            "open": 100.0 + d, "high": 101.0 + d, "low": 99.0 + d, "close": 100.5 + d,
+            "volume": 1_000_000, "change": 0.01,
+        }
+        for t in range(1, N_TICKERS + 1)
+        for d in range(N_DAYS)
+    ]
+
+def fresh_session(url: str):
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    s = Session()
+    s.add_all(Ticker(id=i, ticker_code=f"T{i}", market="US") for i in range(1, N_TICKERS + 1))
+    s.commit()
+    return s
+
+def orm_path(s, rows):
+    for row in rows:
+        s.add(ChartData(**row))
+    s.commit()
+
+def bulk_path(s, rows):
+    bulk_upsert(s, ChartData, rows)
+    s.commit()
+
+if __name__ == "__main__":
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite:///:memory:")
+    rows = make_rows()
+    print(f"{len(rows)} rows ({N_TICKERS} tickers x {N_DAYS} days) on {url.split('://')[0]}")
+
+    for name, fn in (("orm db.add", orm_path), ("bulk_upsert", bulk_path)):
+        s = fresh_session(url)
+        start = time.perf_counter()
+        fn(s, rows)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12} {elapsed:7.2f}s  {len(rows) / elapsed:>10,.0f} rows/sec")
+        s.close()
+
+    # 같은 구간 재적재 (ORM 경로는 PK 충돌로 실패하는 경우)
+    s = fresh_session(url)
+    bulk_path(s, rows)
+    start = time.perf_counter()
+    bulk_path(s, rows)
+    elapsed = time.perf_counter() - start
+    print(f"{'re-upsert':<12} {elapsed:7.2f}s  {len(rows) / elapsed:>10,.0f} rows/sec (idempotent)")
+    s.close()
@@ -0,0 +1,102 @@
+# scripts/bench_explanation_storage.py
+"""
+- Explanation token / score 저장 형식 비교: 이전 JSON text vs blob (NUL 구분 UTF-8 + float32 배열)
+  1) token 수별 행 크기(bytes), 인코딩 / 디코딩 시간
+  2) sqlite 파일 DB 에서 캐시 히트 경로처럼 ORM 으로 행을 읽고 get_token / get_token_score 까지 한 시간
+- score 는 모델이 float32 로 내보낸 값(JSON 으로는 17자리 안팎)을 가정, token 은 영문 / 한글 단어 혼합
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_explanation_storage.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from db.models.explanation import Explanation, pack_scores, pack_tokens, unpack_scores, unpack_tokens
+from db.session import Base
+
+TOKEN_COUNTS = (16, 64, 256, 1024)
+WORDS = ["rate", "earnings", "guidance", "inflation", "demand", "supply", "금리", "실적", "환율", "반도체"]
+DB_ROWS = 2000
+DB_TOKENS = 256
+
+def sample(n, rnd):
+    tokens = [rnd.choice(WORDS) for _ in range(n)]
+    # float32 로 한 번 왕복시켜 모델 출력과 같은 값으로
+    scores = unpack_scores(pack_scores([rnd.uniform(-1, 1) for _ in range(n)]))
+    return tokens, scores
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+def codec_table(rnd):
+    print(f"{'tokens':>6} {'json B':>8} {'blob B':>8} {'size':>6} "
+          f"{'json enc us':>11} {'blob enc us':>11} {'json dec us':>11} {'blob dec us':>11} {'speedup':>7}")
+    for n in TOKEN_COUNTS:
+        tokens, scores = sample(n, rnd)
+        jt, js = json.dumps(tokens), json.dumps(scores)
+        bt, bs = pack_tokens(tokens), pack_scores(scores)
+        json_bytes = len(jt.encode()) + len(js.encode())
+        blob_bytes = len(bt) + len(bs)
+        number = max(10, 20000 // n)
+        json_enc = per_call(lambda: (json.dumps(tokens), json.dumps(scores)), number)
+        blob_enc = per_call(lambda: (pack_tokens(tokens), pack_scores(scores)), number)
+        json_dec = per_call(lambda: (json.loads(jt), json.loads(js)), number)
+        blob_dec = per_call(lambda: (unpack_tokens(bt), unpack_scores(bs)), number)
+        print(f"{n:>6} {json_bytes:>8} {blob_bytes:>8} {blob_bytes / json_bytes:>6.0%} "
+              f"{json_enc * 1e6:>11.1f} {blob_enc * 1e6:>11.1f} {json_dec * 1e6:>11.1f} {blob_dec * 1e6:>11.1f} "
+              f"{json_dec / blob_dec:>6.1f}x")
+
+def db_read(rnd):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    tokens, scores = sample(DB_TOKENS, rnd)
+    start = date(2020, 1, 1)
+    with Session() as s:
+        for i in range(DB_ROWS):
+            legacy = i % 2 == 0
+            row = Explanation(ticker_id=1 if legacy else 2, predicted_date=start + timedelta(days=i // 2),
+                              horizon_days=7)
+            if legacy:
+                row.token, row.token_score = json.dumps(tokens), json.dumps(scores)
+            else:
+                row.set_token(tokens)
+                row.set_token_score(scores)
+            s.add(row)
+        s.commit()
+
+    def read(ticker_id):
+        with Session() as s:
+            for r in s.execute(select(Explanation).where(Explanation.ticker_id == ticker_id)).scalars():
+                r.get_token()
+                r.get_token_score()
+
+    print(f"\nsqlite ORM read + decode, {DB_ROWS // 2} rows x {DB_TOKENS} tokens per format")
+    for label, tid in (("json", 1), ("blob", 2)):
+        read(tid)   # warm up
+        began = time.perf_counter()
+        for _ in range(5):
+            read(tid)
+        elapsed = (time.perf_counter() - began) / 5
+        print(f"{label:<5} {elapsed * 1e3:8.1f} ms  ({elapsed / (DB_ROWS // 2) * 1e6:.1f} us/row)")
+    print(f"file size: {os.path.getsize(path) / 1024:.0f} KiB (both formats)")
+    engine.dispose()
+
+if __name__ == "__main__":
+    rnd = random.Random(0)
+    codec_table(rnd)
+    db_read(rnd)
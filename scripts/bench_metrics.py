@@ -0,0 +1,123 @@
+# scripts/bench_metrics.py
+"""
+- /metrics 계측 비용 측정
+  1) 기록 1회 비용 (stage timer / counter / 요청 히스토그램)
+  2) /stock-info/pred 캐시 히트 요청(가장 짧은 경로 → 비율상 가장 불리)을 app 전체로 실행하며
+     metrics on / off 를 번갈아 측정해 요청당 시간 차이 비교
+  차이가 실행 간 편차보다 작으므로 1) 의 합 / 요청 시간 도 함께 출력
+- DB 는 sqlite 파일 (aiosqlite)
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_metrics.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date, timedelta
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import db.async_session
+from app.main import app
+from app.metrics import Metrics, metrics
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+from db.session import Base
+
+ROUNDS = 15
+REQUESTS_PER_ROUND = 300
+
+def make_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as s:
+        s.add(Ticker(id=1, ticker_code="AAPL", market="US"))
+        s.add(Prediction(ticker_id=1, predicted_date=date.today() + timedelta(days=7),
+                         horizon_days=7, prediction_result=1.0))
+        s.commit()
+    engine.dispose()
+
+async def call(path, query):
+    status = None
+    received = False
+
+    async def receive():
+        # middleware 가 연결 종료를 확인하려고 다시 부르면 응답이 끝날 때까지 대기
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("bench", 80), "client": ("bench", 1), "root_path": "",
+    }
+    await app(scope, receive, send)
+    assert status == 200, status
+
+async def run_round(enabled):
+    metrics.enabled = enabled
+    start = time.perf_counter()
+    for _ in range(REQUESTS_PER_ROUND):
+        await call("/stock-info/pred", "ticker=AAPL&horizon=7")
+    return (time.perf_counter() - start) / REQUESTS_PER_ROUND
+
+def record_costs():
+    m = Metrics()
+    n = 200_000
+
+    def stage():
+        with m.stage("run_prediction", "cache_query"):
+            pass
+
+    return {
+        "stage timer": timeit.timeit(stage, number=n) / n,
+        "cache counter": timeit.timeit(lambda: m.count_cache("run_prediction", True), number=n) / n,
+        "request histogram": timeit.timeit(
+            lambda: m.observe_request("/stock-info/pred", "GET", 200, 0.002), number=n) / n,
+    }
+
+async def main(engine):
+    await call("/stock-info/pred", "ticker=AAPL&horizon=7")   # ticker 스냅샷 로드
+    on, off = [], []
+    for _ in range(ROUNDS):
+        off.append(await run_round(False))
+        on.append(await run_round(True))
+    metrics.enabled = True
+    await engine.dispose()
+    return statistics.median(on), statistics.median(off)
+
+if __name__ == "__main__":
+    costs = record_costs()
+    for name, seconds in costs.items():
+        print(f"{name:<18} {seconds * 1e9:7.0f} ns")
+    # 캐시 히트 1회: 요청 히스토그램 1 + stage 3 (ticker_lookup, cache_query, serialize) + cache counter 1
+    per_request = costs["request histogram"] + 3 * costs["stage timer"] + costs["cache counter"]
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    make_db(path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    with patch.object(db.async_session, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False)):
+        on, off = asyncio.run(main(engine))
+    print(f"/stock-info/pred cache hit, median of {ROUNDS} rounds x {REQUESTS_PER_ROUND} requests")
+    print(f"metrics off {off * 1e6:8.1f} us/request")
+    print(f"metrics on  {on * 1e6:8.1f} us/request  ({(on - off) / off:+.2%}, 실행 간 편차 포함)")
+    print(f"recording cost {per_request * 1e6:.1f} us/request = {per_request / off:.2%} of a request")
@@ -0,0 +1,140 @@
+# scripts/bench_news_index.py
+"""
+- 수백만 행 news 테이블에서 종목별 뉴스 조회 비교: index 없는 이전 스키마 vs link_hash + ix_news_ticker_pub
+  1) 이전 스키마(ticker_id / pub_date index 없음)에 --rows 행 적재. 1% 는 같은 link 가 pubDate 만 바꿔 다시 들어온 중복
+  2) 이전 스키마에서 최신 10건(행 / id) 조회, 이전 중복 판정용 max(pub_date) 조회 시간과 query plan
+  3) db.migrate_news_dedupe 로 hash 채우기 / 중복 삭제 / index 생성 (단계별 시간)
+  4) 새 스키마에서 최신 10건 조회, 새 중복 판정용 link_hash IN (...) 조회 시간과 query plan
+- sqlite 파일 DB 기준. MySQL(InnoDB)도 secondary index 에 PK 가 붙어 plan 은 같음 (id 조회는 covering index)
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_news_index.py
+    DATABASE_URL=sqlite:// python scripts/bench_news_index.py --rows 5000000 --tickers 3000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine, text
+
+from db import migrate_news_dedupe
+from db.models.news import hash_link
+
+LEGACY_DDL = """
+CREATE TABLE news (
+    id INTEGER NOT NULL PRIMARY KEY,
+    ticker_id INTEGER NOT NULL,
+    title VARCHAR(256) NOT NULL,
+    summary TEXT,
+    link VARCHAR(512) NOT NULL,
+    pub_date DATETIME NOT NULL,
+    provider VARCHAR(64)
+)
+"""
+LATEST_ROWS = ("SELECT id, ticker_id, title, summary, link, pub_date, provider FROM news "
+               "WHERE ticker_id = :tid ORDER BY pub_date DESC, id DESC LIMIT 10")
+LATEST_IDS = "SELECT id FROM news WHERE ticker_id = :tid ORDER BY pub_date DESC, id DESC LIMIT 10"
+MAX_PUB = "SELECT max(pub_date) FROM news WHERE ticker_id = :tid"
+FEED_SIZE = 20
+DUP_RATE = 0.01
+
+def load(engine, rows, tickers, rnd):
+    start = datetime(2015, 1, 1)
+    per_ticker = rows // tickers
+    step = timedelta(days=3650) / per_ticker
+
+    def gen():
+        for tid in range(1, tickers + 1):
+            for i in range(per_ticker):
+                pub = start + step * i + timedelta(seconds=rnd.randrange(3600))
+                n = i
+                if i and rnd.random() < DUP_RATE:
+                    n = i - 1   # 재발행: 직전 기사와 같은 link, 더 늦은 pubDate
+                yield (tid, f"T{tid} headline {n}", "summary of the article",
+                       f"https://news.example.com/t{tid}/article-{n}", pub.isoformat(sep=" "), "wire")
+
+    raw = engine.raw_connection()
+    try:
+        raw.execute(LEGACY_DDL)
+        raw.executemany("INSERT INTO news (ticker_id, title, summary, link, pub_date, provider) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", gen())
+        raw.commit()
+    finally:
+        raw.close()
+    return per_ticker * tickers
+
+def timed(engine, sql, params_list):
+    with engine.connect() as conn:
+        conn.execute(text(sql), params_list[0]).all()   # warm up
+        began = time.perf_counter()
+        for params in params_list:
+            conn.execute(text(sql), params).all()
+        return (time.perf_counter() - began) / len(params_list)
+
+def plan(engine, sql, params):
+    with engine.connect() as conn:
+        return "; ".join(r[-1] for r in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+
+def report(engine, label, queries, ticker_ids):
+    print(f"\n[{label}] {len(ticker_ids)} random tickers")
+    for name, sql, params_of in queries:
+        params = [params_of(t) for t in ticker_ids]
+        print(f"  {name:<12} {timed(engine, sql, params) * 1e3:9.3f} ms/query   plan: {plan(engine, sql, params[0])}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--tickers", type=int, default=2000)
+    args = parser.parse_args()
+    rnd = random.Random(0)
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_news.db")
+    engine = create_engine(f"sqlite:///{path}")
+    began = time.perf_counter()
+    rows = load(engine, args.rows, args.tickers, rnd)
+    print(f"loaded {rows} rows for {args.tickers} tickers in {time.perf_counter() - began:.1f}s "
+          f"({os.path.getsize(path) / 2**20:.0f} MiB)")
+
+    def feed(tid):
+        # 최근 기사 FEED_SIZE 개 (yfinance 응답 크기 정도). 대부분 이미 저장된 link
+        per_ticker = args.rows // args.tickers
+        hashes = {f"h{i}": hash_link(f"https://news.example.com/t{tid}/article-{per_ticker - 1 - i}")
+                  for i in range(FEED_SIZE)}
+        return {"tid": tid, **hashes}
+
+    by_ticker = lambda tid: {"tid": tid}
+    report(engine, "before: no index", [
+        ("latest rows", LATEST_ROWS, by_ticker),
+        ("latest ids", LATEST_IDS, by_ticker),
+        ("max pub_date", MAX_PUB, by_ticker),
+    ], rnd.sample(range(1, args.tickers + 1), 20))
+
+    print("\nmigrate_news_dedupe")
+    for step, fn in (("add column", migrate_news_dedupe.add_hash_column),
+                     ("fill hashes", migrate_news_dedupe.fill_hashes),
+                     ("dedupe", migrate_news_dedupe.delete_duplicates),
+                     ("indexes", migrate_news_dedupe.create_indexes)):
+        began = time.perf_counter()
+        result = fn(engine)
+        print(f"  {step:<12} {time.perf_counter() - began:8.1f}s  -> {result}")
+
+    hash_in = ("SELECT link_hash FROM news WHERE ticker_id = :tid AND link_hash IN ("
+               + ", ".join(f":h{i}" for i in range(FEED_SIZE)) + ")")
+    report(engine, "after: uq_news_link + ix_news_ticker_pub", [
+        ("latest rows", LATEST_ROWS, by_ticker),
+        ("latest ids", LATEST_IDS, by_ticker),
+        ("stored hash", hash_in, feed),
+    ], rnd.sample(range(1, args.tickers + 1), min(2000, args.tickers)))
+    print(f"\nfile size after migration: {os.path.getsize(path) / 2**20:.0f} MiB")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/bench_search.py
+"""
+- /search 자동완성 비교: ILIKE '%kw%' DB 경로 (이전) vs 메모리 SearchIndex
+- 미국 + KOSPI 를 흉내낸 종목 N개를 넣고, 사용자가 한 글자씩 입력하는 질의열을 반복 실행
+- 질의당 평균 / p99 지연과 단일 스레드 처리량(QPS) 출력
+- 기본은 sqlite 메모리 DB, BENCH_DATABASE_URL 로 로컬 MySQL 지정 가능
+  (해당 DB 의 테이블을 drop/create 하므로 운영 DB 에 쓰지 말 것)
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_search.py
+"""
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.session import Base
+from db.models import ticker  # noqa: F401  (테이블 등록)
+from db.models.ticker import Ticker
+from app.crud.search import search_tickers_db, ticker_search
+
+N_US = 3000
+N_KOSPI = 950
+ROUNDS = 20
+
+WORDS = ["Apple", "Global", "Micro", "Energy", "Health", "Capital", "Systems", "Bio", "Motor", "Data"]
+KO_WORDS = ["삼성", "현대", "LG", "SK", "한화", "전자", "화학", "바이오", "금융", "건설"]
+TYPED = ["apple", "micro", "삼성전자", "0059", "AAPL", "health sys", "현대차", "zz", "ㅅㅅㅈㅈ", "samsung"]
+
+def make_tickers():
+    rnd = random.Random(0)
+    rows = []
+    for i in range(N_US):
+        code = "".join(rnd.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rnd.randint(1, 4))) + str(i)
+        name = " ".join(rnd.sample(WORDS, 2)) + " Inc."
+        rows.append(Ticker(ticker_code=code, company_name=name, market="US"))
+    rows.append(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    for i in range(N_KOSPI):
+        rows.append(Ticker(ticker_code=f"{5000 + i * 7:06d}", company_name="".join(rnd.sample(KO_WORDS, 2)), market="KOSPI"))
+    rows.append(Ticker(ticker_code="005930", company_name="삼성전자", market="KOSPI"))
+    return rows
+
+def keystrokes():
+    # "apple" → "a", "ap", "app", ...
+    return [word[:n] for word in TYPED for n in range(1, len(word) + 1)]
+
+def bench(label, fn, queries):
+    latencies = []
+    for _ in range(ROUNDS):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    mean = sum(latencies) / len(latencies)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f"{label:<16} mean {mean * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us   {1 / mean:10.0f} qps")
+
+if __name__ == "__main__":
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(make_tickers())
+    db.commit()
+
+    start = time.perf_counter()
+    index = ticker_search.index(db)
+    print(f"{len(index)} tickers, index build {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = keystrokes()
+    for q in queries:
+        expected = {t.ticker_code for t in search_tickers_db(db, q, limit=None)}
+        got = [t.ticker_code for t in index.search(q, limit=None)]
+        # 한글 키(초성/로마자) 매칭은 DB 경로 매칭 뒤에만 붙음
+        assert set(got[:len(expected)]) == expected, q
+    print(f"{len(queries)} keystroke queries x {ROUNDS}, DB path matches ranked first")
+
+    bench("DB ILIKE", lambda q: search_tickers_db(db, q), queries)
+    bench("SearchIndex", lambda q: index.search(q), queries)
+    bench("via registry", lambda q: ticker_search.search(db, q), queries)
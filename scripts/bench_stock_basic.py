@@ -0,0 +1,59 @@
+# scripts/bench_stock_basic.py
+"""
+- /stock-info/basic 의 chart·news 동시 실행 효과 측정
+- upstream 은 sleep stub 으로 대체 (네트워크/DB 불필요)
+- 직렬 호출(이전 방식) vs 동시 호출 지연 비교
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_stock_basic.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from app.routers import stock
+
+CHART_DELAY = 0.20   # yfinance/FDR 왕복 흉내
+NEWS_DELAY = 0.15    # yf news 왕복 흉내
+ROUNDS = 10
+
+# 라우터가 호출하는 async crud 와 같은 모양: upstream 대기는 스레드에서
+async def fake_chart(*args, **kwargs):
+    await asyncio.to_thread(time.sleep, CHART_DELAY)
+    return []
+
+async def fake_news(*args, **kwargs):
+    await asyncio.to_thread(time.sleep, NEWS_DELAY)
+    return []
+
+async def _serial():
+    await fake_chart("AAPL", interval=7)
+    await fake_news("AAPL")
+
+def serial_once() -> float:
+    start = time.perf_counter()
+    asyncio.run(_serial())
+    return time.perf_counter() - start
+
+def concurrent_once() -> float:
+    start = time.perf_counter()
+    asyncio.run(stock.get_stock_basic(ticker="AAPL", horizon=7))
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    with patch.object(stock, "get_chart_data_async", fake_chart), \
+         patch.object(stock, "get_recent_news_async", fake_news):
+        serial = [serial_once() for _ in range(ROUNDS)]
+        concurrent = [concurrent_once() for _ in range(ROUNDS)]
+
+    print(f"upstream: chart={CHART_DELAY:.2f}s news={NEWS_DELAY:.2f}s "
+          f"(sum={CHART_DELAY + NEWS_DELAY:.2f}s, max={max(CHART_DELAY, NEWS_DELAY):.2f}s)")
+    print(f"serial     median {statistics.median(serial):.3f}s")
+    print(f"concurrent median {statistics.median(concurrent):.3f}s")
@@ -0,0 +1,49 @@
+# scripts/bench_us_batch_fetch.py
+"""
+- US 차트 refresh 시 종목별 호출 vs batch 다운로드 비교
+- yfinance 대신 FakeProvider (호출 1회당 LATENCY 초) 사용 → 네트워크 불필요
+- 종목 수는 seed_us_tickers 규모(~520)
+
+실행:
+    DATABASE_URL=sqlite:// python scripts/bench_us_batch_fetch.py
+"""
+
+import os
+import sys
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+sys.path.append(ROOT)
+
+from app.crud.chart import fetch_bars, fetch_bars_batch
+from app.crud.providers import FakeProvider, set_provider
+
+N_TICKERS = 520
+LATENCY = 0.02      # upstream 왕복 1회
+BATCH_SIZE = 50
+START, END = date(2025, 1, 2), date(2025, 5, 15)
+
+def run(label, fn):
+    provider = FakeProvider(latency=LATENCY)
+    set_provider("US", provider)
+    began = time.perf_counter()
+    n_rows = fn()
+    elapsed = time.perf_counter() - began
+    print(f"{label:<22} {elapsed:6.2f}s  upstream calls={len(provider.calls):>4}  rows={n_rows}")
+
+def per_ticker(codes):
+    return sum(len(fetch_bars("US", c, START, END, 1)) for c in codes)
+
+def batched(codes):
+    total = 0
+    for i in range(0, len(codes), BATCH_SIZE):
+        rows = fetch_bars_batch("US", codes[i:i + BATCH_SIZE], START, END, 1)
+        total += sum(len(r) for r in rows.values())
+    return total
+
+if __name__ == "__main__":
+    codes = [f"T{i:03d}" for i in range(N_TICKERS)]
+    print(f"{N_TICKERS} tickers, daily bars {START}..{END}, latency {LATENCY * 1000:.0f}ms/call")
+    run("per-ticker history", lambda: per_ticker(codes))
+    run(f"batch of {BATCH_SIZE}", lambda: batched(codes))
@@ -5,9 +5,14 @@ sys.path.append(str(ROOT))
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from db.session import Base
+from app.crud.cache import chart_cache
+from app.crud.news import news_index
+from app.crud.tickers import ticker_registry
 
 @pytest.fixture
 def db():
@@ -23,3 +28,30 @@ def db():
         yield session                         # 여기서 테스트 실행
         # 자동 rollback·close
     # with 블록을 벗어나면 engine 도 GC 되면서 메모리 DB 제거
+
+@pytest.fixture
+def async_db(tmp_path):
+    """
+    같은 sqlite 파일을 보는 (sync session, async sessionmaker)
+    - sync session 으로 데이터를 넣고 async crud 를 검증
+    - 테스트마다 asyncio.run 으로 loop 가 바뀌므로 async engine 은 연결을 재사용하지 않음(NullPool)
+    """
+    url = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{url}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", poolclass=NullPool)
+
+    with sessionmaker(bind=engine)() as session:
+        yield session, async_sessionmaker(async_engine, expire_on_commit=False)
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    # 테스트 간 in-process 응답 캐시 / 뉴스 index / ticker registry 가 공유되지 않도록 초기화
+    chart_cache.clear()
+    news_index.clear()
+    ticker_registry.invalidate()
+    yield
+    chart_cache.clear()
+    news_index.clear()
+    ticker_registry.invalidate()
@@ -0,0 +1,111 @@
+# tests/test_aggregate.py
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+from freezegun import freeze_time
+from sqlalchemy import select
+
+from app.crud.aggregate import period_start, rebuild_aggregates
+from app.crud.bars import bars_to_records, resample_bars
+from app.crud.chart import get_chart_data, store_chart_rows
+from app.crud.providers import FakeProvider
+from db.models.chart_data import ChartData
+from db.models.ticker import Ticker
+
+def _seed(db, until):
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+    tid = db.execute(select(Ticker.id)).scalar_one()
+    daily = FakeProvider()._frame("AAPL", date(2024, 12, 30), until, 1)
+    store_chart_rows(db, tid, 1, bars_to_records(daily, date.min))
+    db.commit()
+    return tid, daily
+
+def _stored(db, tid, interval):
+    return [
+        (r.date, r.open, r.high, r.low, r.close, r.volume, r.change)
+        for r in db.execute(
+            select(ChartData)
+            .where(ChartData.ticker_id == tid, ChartData.interval == interval)
+            .order_by(ChartData.date)
+        ).scalars()
+    ]
+
+def test_period_start():
+    assert period_start(date(2025, 5, 15), 7) == date(2025, 5, 12)
+    assert period_start(date(2025, 5, 15), 30) == date(2025, 5, 1)
+
+def test_rebuild_aggregates_matches_resample_of_daily(db):
+    """주봉/월봉이 저장된 일봉의 W-MON / MS 집계와 같은지"""
+    tid, daily = _seed(db, date(2025, 5, 16))
+    rebuild_aggregates(db, tid)
+    db.commit()
+
+    for interval in (7, 30):
+        expected = [
+            tuple(r.values())
+            for r in bars_to_records(resample_bars(daily.round(2), interval), date.min)
+        ]
+        assert _stored(db, tid, interval) == expected
+
+def test_rebuild_keeps_upstream_bars_of_partially_covered_periods(db):
+    """complete_only: 일봉이 최근 일부만 있으면 앞부분이 잘린 기간의 upstream 주봉/월봉은 그대로 둠"""
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+    tid = db.execute(select(Ticker.id)).scalar_one()
+    # 2025-04-17(목)부터 일봉 30일치, 4월 / 그 주는 upstream 에서 받은 온전한 bar
+    daily = FakeProvider()._frame("AAPL", date(2025, 4, 17), date(2025, 5, 17), 1)
+    store_chart_rows(db, tid, 1, bars_to_records(daily, date.min))
+    april = {"date": date(2025, 4, 1), "open": 1.0, "high": 9.0, "low": 0.5, "close": 2.0, "volume": 999, "change": 0.1}
+    store_chart_rows(db, tid, 30, [april])
+    store_chart_rows(db, tid, 7, [{**april, "date": date(2025, 4, 14)}])
+    db.commit()
+
+    rebuild_aggregates(db, tid, complete_only=True)
+    db.commit()
+    monthly, weekly = _stored(db, tid, 30), _stored(db, tid, 7)
+    assert monthly[0] == (date(2025, 4, 1), 1.0, 9.0, 0.5, 2.0, 999, 0.1)
+    assert [r[0] for r in monthly] == [date(2025, 4, 1), date(2025, 5, 1)]
+    assert weekly[0][0] == date(2025, 4, 14) and weekly[0][5] == 999
+    assert weekly[1][0] == date(2025, 4, 21)
+    # 첫 온전한 기간의 change 는 잘린 직전 기간의 마지막 종가 기준
+    may = bars_to_records(resample_bars(daily.round(2), 30), date(2025, 5, 1))
+    assert monthly[1] == tuple(may[0].values())
+
+def test_incremental_rebuild_equals_full_rebuild(db):
+    """새 일봉이 들어온 기간부터만 다시 집계해도 전체 재집계와 결과가 같음"""
+    tid, _ = _seed(db, date(2025, 4, 23))
+    rebuild_aggregates(db, tid)
+    db.commit()
+
+    # 4/23 ~ 5/15 일봉 추가 (4월 마지막 주 / 4월 월봉이 갱신되어야 함)
+    more = FakeProvider(seed=1)._frame("AAPL", date(2025, 4, 23), date(2025, 5, 16), 1)
+    new_rows = bars_to_records(more, date.min)
+    store_chart_rows(db, tid, 1, new_rows)
+    rebuild_aggregates(db, tid, since=new_rows[0]["date"])
+    db.commit()
+    incremental = {i: _stored(db, tid, i) for i in (7, 30)}
+
+    rebuild_aggregates(db, tid)
+    db.commit()
+    assert incremental == {i: _stored(db, tid, i) for i in (7, 30)}
+
+@freeze_time("2025-05-15")
+@patch("app.crud.chart.yf.Ticker")
+def test_weekly_request_fetches_daily_only(mock_yf, db):
+    """주봉 요청도 upstream 에는 일봉만 요청하고 주봉은 로컬 집계"""
+    mock_yf.return_value.history.return_value = pd.DataFrame(
+        {"Open": [1, 2, 3], "High": [1, 2, 3], "Low": [1, 2, 3],
+         "Close": [10, 11, 12], "Volume": [1, 1, 1]},
+        index=pd.to_datetime(["2025-05-08", "2025-05-12", "2025-05-15"]),
+    )
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+
+    rows = get_chart_data("AAPL", interval=7, session=db)
+
+    assert {c.kwargs["interval"] for c in mock_yf.return_value.history.call_args_list} == {"1d"}
+    assert [r["date"] for r in rows] == ["2025-05-05", "2025-05-12"]
+    assert rows[-1]["close"] == 12
+    assert rows[-1]["change"] == round((12 - 10) / 10, 4)
@@ -0,0 +1,128 @@
+# tests/test_async_crud.py
+import asyncio
+import threading
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.crud import chart, explanation, news, prediction, tickers
+from app.crud.bars import bars_to_records
+from app.crud.providers import FakeProvider
+from db.models.explanation import Explanation
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+@pytest.fixture
+def seeded(async_db):
+    db, AsyncSession = async_db
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tid = db.query(Ticker.id).scalar()
+    return db, AsyncSession, tid
+
+def _run(AsyncSession, fn, *args, **kwargs):
+    async def call():
+        async with AsyncSession() as adb:
+            return await fn(*args, session=adb, **kwargs)
+    return asyncio.run(call())
+
+def test_chart_async_matches_sync_when_up_to_date(seeded):
+    db, AsyncSession, tid = seeded
+    daily = FakeProvider()._frame("AAPL", date(2025, 1, 1), date(2025, 3, 1), 1)
+    chart.store_chart_rows(db, tid, 1, bars_to_records(daily, date.min))
+    db.commit()
+
+    with patch.object(chart, "CHART_FETCH_ON_REQUEST", False):
+        rows = _run(AsyncSession, chart.get_chart_data_async, "AAPL", interval=1)
+        chart.chart_cache.clear()
+        expected = chart.get_chart_data("AAPL", interval=1, session=db)
+
+    assert rows == expected
+    assert len(rows) == 30
+    # 두 번째 호출은 응답 캐시
+    assert chart.chart_cache.get(("AAPL", 1)) == rows
+
+def test_chart_async_delegates_upstream_refresh_to_thread(seeded):
+    _, AsyncSession, _ = seeded
+    with patch.object(chart, "get_chart_data", return_value=[{"date": "x"}]) as sync_path:
+        rows = _run(AsyncSession, chart.get_chart_data_async, "AAPL", interval=7)
+
+    assert rows == [{"date": "x"}]
+    sync_path.assert_called_once_with("AAPL", 7, session=None)
+
+def test_unknown_ticker_never_leaves_event_loop(seeded):
+    _, AsyncSession, _ = seeded
+    with patch("asyncio.to_thread") as to_thread:
+        assert _run(AsyncSession, chart.get_chart_data_async, "NOPE") == []
+        assert _run(AsyncSession, news.get_recent_news_async, "NOPE") == []
+        assert _run(AsyncSession, prediction.run_prediction_async, "NOPE", 7)["result"] == 0.0
+    to_thread.assert_not_called()
+
+def test_prediction_async_cache_hit_reads_db_only(seeded):
+    db, AsyncSession, tid = seeded
+    pred_date = date.today() + timedelta(days=7)
+    db.add(Prediction(ticker_id=tid, predicted_date=pred_date, horizon_days=7, prediction_result=1.5))
+    db.commit()
+
+    with patch.object(prediction, "run_prediction") as sync_path:
+        result = _run(AsyncSession, prediction.run_prediction_async, "AAPL", 7)
+
+    assert result == {"predicted_date": pred_date.isoformat(), "result": 1.5}
+    sync_path.assert_not_called()
+
+def test_prediction_async_miss_uses_sync_single_flight(seeded):
+    _, AsyncSession, _ = seeded
+    with patch.object(prediction, "run_prediction", return_value={"result": 2.0}) as sync_path:
+        result = _run(AsyncSession, prediction.run_prediction_async, "AAPL", 1)
+
+    assert result == {"result": 2.0}
+    sync_path.assert_called_once_with("AAPL", 1, session=None)
+
+def test_async_miss_writes_through_the_injected_sync_session(seeded):
+    """session(AsyncSession)은 조회에만 쓰이고, 스레드의 저장은 sync_session 으로 (SessionLocal 을 열지 않음)"""
+    db, AsyncSession, tid = seeded
+    with patch.object(prediction, "fetch_prediction", return_value=2.5), \
+         patch.object(explanation, "fetch_explanation", return_value=(["a"], [1.0])), \
+         patch("app.crud.utils.SessionLocal", side_effect=AssertionError("opened a new session")):
+        pred = _run(AsyncSession, prediction.run_prediction_async, "AAPL", 1, sync_session=db)
+        exp = _run(AsyncSession, explanation.generate_explanation_async, "AAPL", 1, sync_session=db)
+
+    assert pred["result"] == 2.5 and exp["tokens"] == ["a"]
+    assert db.query(Prediction.prediction_result).filter_by(ticker_id=tid, horizon_days=1).scalar() == 2.5
+    assert db.query(Explanation).filter_by(ticker_id=tid, horizon_days=1).count() == 1
+
+def test_explanation_async_cache_hit(seeded):
+    db, AsyncSession, tid = seeded
+    pred_date = date.today() + timedelta(days=30)
+    row = Explanation(ticker_id=tid, predicted_date=pred_date, horizon_days=30)
+    row.set_token(["a", "b"])
+    row.set_token_score([0.25, 0.75])
+    db.add(row)
+    db.commit()
+
+    with patch.object(explanation, "generate_explanation") as sync_path:
+        result = _run(AsyncSession, explanation.generate_explanation_async, "AAPL", 30)
+
+    assert result == {"predicted_date": pred_date, "tokens": ["a", "b"], "token_scores": [0.25, 0.75]}
+    sync_path.assert_not_called()
+
+def test_concurrent_cold_registry_loads_do_not_block_event_loop(seeded):
+    """registry 가 비어 있을 때 동시에 들어온 async 요청들이 lock 에서 루프를 멈추지 않음"""
+    _, AsyncSession, tid = seeded
+    tickers.ticker_registry.invalidate()
+    results = []
+
+    async def lookup():
+        async with AsyncSession() as adb:
+            return await tickers.ticker_registry.aget(adb, "AAPL")
+
+    async def main():
+        results.extend(await asyncio.gather(*(lookup() for _ in range(5))))
+
+    # 교착되면 이벤트 루프 스레드가 멈추므로 별도 스레드에서 실행하고 시간 제한
+    worker = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+    assert [t.id for t in results] == [tid] * 5
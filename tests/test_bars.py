@@ -0,0 +1,64 @@
+# tests/test_bars.py
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app.crud.bars import bars_to_columns, bars_to_records, resample_bars
+from app.crud.providers import FakeProvider
+
+def _iterrows_reference(df, start):
+    """이전 _fetch_us/_fetch_kospi 의 iterrows 구현 (비교 기준)"""
+    rows, prev_close = [], None
+    for dt, row in df.round(2).iterrows():
+        if dt.date() < start:
+            prev_close = row["Close"]
+            continue
+        change = (
+            round((row["Close"] - prev_close) / prev_close, 4)
+            if prev_close and prev_close != 0 else 0
+        )
+        rows.append({
+            "date": dt.date(), "open": row["Open"], "high": row["High"], "low": row["Low"],
+            "close": row["Close"], "volume": int(row.get("Volume", 0)), "change": change,
+        })
+        prev_close = row["Close"]
+    return rows
+
+def test_bars_to_records_matches_iterrows_implementation():
+    """vectorized 변환이 기존 iterrows 결과와 같은지 (start 이전 행은 change 기준으로만 사용)"""
+    frame = FakeProvider()._frame("AAPL", date(2024, 1, 1), date(2025, 5, 16), 1)
+    start = date(2024, 3, 1)
+
+    assert bars_to_records(frame, start) == _iterrows_reference(frame, start)
+
+def test_bars_to_records_returns_python_types():
+    frame = FakeProvider()._frame("AAPL", date(2025, 1, 1), date(2025, 2, 1), 1)
+    row = bars_to_records(frame, date(2025, 1, 1))[0]
+
+    assert type(row["date"]) is date
+    assert type(row["close"]) is float and type(row["volume"]) is int
+    assert row["change"] == 0.0   # 직전 종가가 없는 첫 bar
+
+def test_bars_to_columns_zero_previous_close():
+    frame = pd.DataFrame(
+        {"Open": [0, 1], "High": [0, 1], "Low": [0, 1], "Close": [0, 1], "Volume": [1, 1]},
+        index=pd.to_datetime(["2025-05-14", "2025-05-15"]),
+    )
+    cols = bars_to_columns(frame, date(2025, 5, 14))
+
+    assert cols["change"].tolist() == [0.0, 0.0]
+    assert cols["volume"].dtype == np.int64
+
+def test_resample_weekly_and_monthly_share_transform():
+    """KOSPI 주봉/월봉도 같은 변환을 거쳐 직전 bar 종가 대비 change 를 가짐"""
+    daily = FakeProvider()._frame("005930", date(2025, 3, 3), date(2025, 5, 17), 1)
+
+    weekly = resample_bars(daily, 7)
+    assert all(d.weekday() == 0 for d in weekly.index)
+    assert weekly["Volume"].sum() == daily["Volume"].sum()
+
+    monthly = bars_to_records(resample_bars(daily, 30), date(2025, 4, 1))
+    assert [r["date"] for r in monthly] == [date(2025, 4, 1), date(2025, 5, 1)]
+    closes = resample_bars(daily, 30)["Close"].round(2).tolist()
+    assert monthly[-1]["change"] == round((closes[2] - closes[1]) / closes[1], 4)
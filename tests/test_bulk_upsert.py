@@ -0,0 +1,47 @@
+# tests/test_bulk_upsert.py
+from datetime import date, timedelta
+
+from sqlalchemy import select, func
+
+from db.models.chart_data import ChartData
+from db.models.ticker import Ticker
+from db.upsert import bulk_upsert
+
+def _bars(ticker_id, start, n, close):
+    return [
+        {
+            "ticker_id": ticker_id, "date": start + timedelta(days=i), "interval": 1,
+            "open": close, "high": close, "low": close, "close": close,
+            "volume": 1000, "change": 0.0,
+        }
+        for i in range(n)
+    ]
+
+def test_bulk_upsert_overlapping_window_is_idempotent(db):
+    """겹치는 구간을 다시 넣어도 PK 충돌 없이 최신 값으로 갱신"""
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+    tid = db.execute(select(Ticker.id)).scalar_one()
+
+    bulk_upsert(db, ChartData, _bars(tid, date(2025, 5, 1), 10, 100.0), batch_size=3)
+    db.commit()
+    # 5/6 ~ 5/15 : 5/6~5/10 은 기존 행과 겹침
+    bulk_upsert(db, ChartData, _bars(tid, date(2025, 5, 6), 10, 200.0), batch_size=3)
+    db.commit()
+
+    assert db.execute(select(func.count()).select_from(ChartData)).scalar_one() == 15
+    closes = dict(db.execute(select(ChartData.date, ChartData.close)).all())
+    assert closes[date(2025, 5, 5)] == 100.0
+    assert closes[date(2025, 5, 6)] == 200.0
+
+def test_bulk_upsert_do_nothing_keeps_existing_rows(db):
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+    tid = db.execute(select(Ticker.id)).scalar_one()
+
+    bulk_upsert(db, ChartData, _bars(tid, date(2025, 5, 1), 2, 100.0))
+    bulk_upsert(db, ChartData, _bars(tid, date(2025, 5, 1), 3, 200.0), update_cols=[])
+    db.commit()
+
+    closes = sorted(db.execute(select(ChartData.close)).scalars())
+    assert closes == [100.0, 100.0, 200.0]
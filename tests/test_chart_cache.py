@@ -0,0 +1,124 @@
+# tests/test_chart_cache.py
+import asyncio
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from freezegun import freeze_time
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import chart
+from app.crud.cache import DictBackend, ResponseCache, chart_cache
+from app.crud.chart import get_chart_data
+from app.crud.market_calendar import next_session_close
+from app.scheduler import ChartIngestor
+from db.models.chart_data import ChartData
+from db.models.ingest_watermark import IngestWatermark
+from db.models.ticker import Ticker
+
+@pytest.mark.parametrize("market, now, expected", [
+    # 장중 → 당일 마감 (뉴욕 16:00 EDT = 20:00 UTC)
+    ("US",    "2025-05-15T14:00:00+00:00", "2025-05-15T20:00:00+00:00"),
+    # 마감 후 → 다음 거래일 마감
+    ("US",    "2025-05-15T21:00:00+00:00", "2025-05-16T20:00:00+00:00"),
+    # 금요일 마감 후 → 월요일 마감
+    ("US",    "2025-05-16T21:00:00+00:00", "2025-05-19T20:00:00+00:00"),
+    # 서울 15:30 KST = 06:30 UTC
+    ("KOSPI", "2025-05-15T01:00:00+00:00", "2025-05-15T06:30:00+00:00"),
+    ("KOSPI", "2025-05-17T01:00:00+00:00", "2025-05-19T06:30:00+00:00"),
+])
+def test_next_session_close(market, now, expected):
+    assert next_session_close(market, datetime.fromisoformat(now)) == datetime.fromisoformat(expected)
+
+@freeze_time("2025-05-15 14:00:00")
+@patch("app.crud.chart.yf.Ticker")
+def test_chart_cache_serves_hot_ticker_without_db(mock_yf, db):
+    """두 번째 호출은 DB·upstream 없이 응답 캐시에서 반환"""
+    mock_yf.return_value.history.return_value = pd.DataFrame(
+        {"Open": [100, 102], "High": [105, 106], "Low": [99, 100],
+         "Close": [102, 101], "Volume": [1_000_000, 900_000]},
+        index=pd.to_datetime(["2025-05-14", "2025-05-15"]),
+    )
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+
+    first = get_chart_data("AAPL", interval=1, session=db)
+    with patch.object(db, "execute", side_effect=AssertionError("DB touched")):
+        second = get_chart_data("AAPL", interval=1, session=db)
+
+    assert second == first
+    assert mock_yf.call_count == 1
+    assert chart_cache.stats()["l1_hits"] == 1
+    assert chart_cache.stats()["misses"] == 1
+
+def test_response_cache_falls_back_to_shared_backend():
+    """L1 이 비어도 공유 backend(L2)에 있으면 hit 으로 처리하고 L1 을 채움"""
+    backend = DictBackend()
+    expires_at = datetime.now(timezone.utc).timestamp() + 60
+    worker_a = ResponseCache("chart", 8, backend)
+    worker_b = ResponseCache("chart", 8, backend)
+
+    worker_a.set(("AAPL", 1), [{"close": 1.0}], expires_at)
+
+    assert worker_b.get(("AAPL", 1)) == [{"close": 1.0}]
+    assert worker_b.get(("AAPL", 1)) == [{"close": 1.0}]
+    assert worker_b.stats() == {"l1_hits": 1, "l2_hits": 1, "misses": 0, "size": 1}
+
+    worker_a.invalidate(("AAPL", 1))
+    worker_b.local.clear()
+    assert worker_b.get(("AAPL", 1)) is None
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache("chart", 2)
+    expires_at = datetime.now(timezone.utc).timestamp() + 60
+    cache.set("a", 1, expires_at)
+    cache.set("b", 2, expires_at)
+    cache.get("a")
+    cache.set("c", 3, expires_at)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+def _bar(day):
+    return {"date": day, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 10, "change": 0.0}
+
+def test_external_scheduler_request_mid_ingest_does_not_pin_old_bars(async_db):
+    """
+    INGEST_SCHEDULER=external: 수집 도중(마감+INGEST_DELAY 이후, 이 종목 watermark 갱신 전) 요청한 응답은
+    짧게만 캐시되어, 다른 프로세스의 수집 후 invalidate 가 닿지 않아도 새 bar 를 읽음
+    """
+    db, async_session = async_db
+    db.add(Ticker(ticker_code="005930", market="KOSPI"))
+    db.add(ChartData(ticker_id=1, interval=1, **_bar(date(2025, 5, 14))))
+    db.add(IngestWatermark(ticker_id=1, interval=1, last_date=date(2025, 5, 14),
+                           checked_at=datetime(2025, 5, 14, 7, 0)))
+    db.commit()
+
+    def request():
+        async def _run():
+            async with async_session() as s:
+                return await chart.get_chart_data_async("005930", 1, session=s)
+        return [bar["date"] for bar in asyncio.run(_run())]
+
+    # scheduler 프로세스: 응답 캐시가 API 프로세스와 따로 (공유 backend 없음)
+    ingestor = ChartIngestor(sessionmaker(bind=db.get_bind()),
+                             lambda market, codes, start, end, interval: {c: [_bar(end)] for c in codes},
+                             rate_per_sec=0, sleep=lambda _: None)
+
+    # KOSPI 마감 06:30 UTC + INGEST_DELAY 30분 → 07:00 에 수집 시작
+    with patch.object(chart, "CHART_FETCH_ON_REQUEST", False), \
+         patch("app.scheduler.ingest.chart_cache", ResponseCache("chart", 8)), \
+         freeze_time("2025-05-15 07:02:00") as clock:
+        assert request() == ["2025-05-14"]
+        ingestor.run(market="KOSPI", now=datetime(2025, 5, 15, 7, 0, tzinfo=timezone.utc))
+        assert request() == ["2025-05-14"]          # 아직 짧은 TTL 안
+
+        clock.tick(chart.CHART_PENDING_TTL_SEC + 1)
+        assert request() == ["2025-05-14", "2025-05-15"]
+
+        # 이번 마감분 수집이 끝난 뒤 캐시한 응답은 다음 수집 시작(다음 마감 + INGEST_DELAY)까지 유지
+        clock.move_to("2025-05-16 06:59:00")
+        assert chart_cache.peek(("005930", 1)) is not None
+        clock.move_to("2025-05-16 07:00:01")
+        assert chart_cache.peek(("005930", 1)) is None
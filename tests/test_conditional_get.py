@@ -0,0 +1,130 @@
+# tests/test_conditional_get.py
+import asyncio
+from datetime import date, datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import Request, Response
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import chart, news, utils, versions
+from app.crud.bars import bars_to_records
+from app.crud.providers import FakeProvider
+from app.http_cache import STOCK_INFO_MAX_AGE, etag_matches, make_etag
+from app.routers import stock
+from db.models.news import News
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+@pytest.fixture
+def api(async_db):
+    """router 가 기본 session 대신 테스트 sqlite 파일을 보도록 교체"""
+    db, AsyncSession = async_db
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tid = db.query(Ticker.id).scalar()
+    daily = FakeProvider()._frame("AAPL", date(2025, 1, 1), date(2025, 3, 1), 1)
+    chart.store_chart_rows(db, tid, 1, bars_to_records(daily, date.min))
+    _add_news(db, tid, datetime(2025, 3, 1, 9))
+    with patch("db.async_session.AsyncSessionLocal", AsyncSession), \
+         patch.object(utils, "SessionLocal", sessionmaker(bind=db.get_bind())), \
+         patch.object(chart, "CHART_FETCH_ON_REQUEST", False):
+        yield db, tid
+
+def _add_news(db, tid, pub_date):
+    db.add(News(ticker_id=tid, title="t", summary="s", link=f"l{pub_date:%H}", pub_date=pub_date, provider="p"))
+    db.commit()
+
+def _request(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+def _call(endpoint, etag=None, **kwargs):
+    response = Response()
+    result = asyncio.run(endpoint(_request(etag), response, ticker="AAPL", horizon=1, **kwargs))
+    return result, response
+
+def test_etag_helpers():
+    assert make_etag(None) is None
+    etag = make_etag(("basic", 1, "2025-03-01"))
+    assert etag == make_etag(("basic", 1, "2025-03-01")) != make_etag(("basic", 7, "2025-03-01"))
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+    assert not etag_matches("*", None)
+
+def test_basic_returns_304_without_loading_chart_or_news(api):
+    db, tid = api
+    first, response = _call(stock.get_stock_basic)
+    etag = response.headers["etag"]
+    assert len(first.chartData) == 30 and len(first.news) == 1
+    assert response.headers["cache-control"] == f"public, max-age={STOCK_INFO_MAX_AGE}"
+
+    with patch.object(stock, "get_chart_data_async") as chart_path, \
+         patch.object(stock, "get_recent_news_async") as news_path:
+        second, _ = _call(stock.get_stock_basic, etag)
+    assert second.status_code == 304 and second.headers["etag"] == etag
+    chart_path.assert_not_called()
+    news_path.assert_not_called()
+
+    # 새 뉴스가 들어오면 다시 본문 (refresh_news 가 저장하면서 최신 10건 index 를 비움)
+    _add_news(db, tid, datetime(2025, 3, 1, 10))
+    news.news_index.delete(tid)
+    third, response = _call(stock.get_stock_basic, etag)
+    assert response.headers["etag"] != etag and len(third.news) == 2
+
+def test_basic_partial_response_is_not_cached(api):
+    async def fail(*args, **kwargs):
+        raise RuntimeError("yfinance down")
+
+    with patch.object(stock, "get_recent_news_async", fail):
+        result, response = _call(stock.get_stock_basic)
+    assert result.partial is True
+    assert response.headers["cache-control"] == "no-store" and "etag" not in response.headers
+
+def test_chart_version_follows_response_cache(api):
+    db, tid = api
+    ticker = versions.TickerInfo(tid, "AAPL", "Apple Inc.", "US")
+    latest = chart.latest_chart_date(db, tid, 1)
+    assert versions.chart_version(db, ticker, 1)[0] == latest.isoformat()
+    # scheduler 가 DB 를 먼저 갱신해도 본문은 캐시에서 나가므로 버전도 캐시 기준
+    cached = [{"date": "2025-02-17", "close": 1.0, "volume": 10}]
+    chart.chart_cache.set(("AAPL", 1), cached, datetime.now().timestamp() + 60)
+    assert versions.chart_version(db, ticker, 1) == ("2025-02-17", 1.0, 10)
+    # peek 은 캐시 통계를 바꾸지 않음
+    assert chart.chart_cache.stats()["l1_hits"] == 0
+
+def test_chart_version_unknown_when_upstream_refresh_is_due(api):
+    db, tid = api
+    ticker = versions.TickerInfo(tid, "AAPL", "Apple Inc.", "US")
+    with patch.object(chart, "CHART_FETCH_ON_REQUEST", True):
+        assert versions.chart_version(db, ticker, 1) is None
+
+def test_prediction_304_skips_model_and_row_load(api):
+    db, tid = api
+    with patch.object(stock, "run_prediction_async", AsyncMock(return_value={
+        "predicted_date": "2025-03-02", "result": 1.0, "stale": True,
+    })):
+        _, response = _call(stock.get_prediction)
+    # 오늘 예측이 없던 응답은 ETag 없이
+    assert response.headers["cache-control"] == "no-cache" and "etag" not in response.headers
+
+    db.add(Prediction(ticker_id=tid, predicted_date=date.today() + timedelta(days=1),
+                      horizon_days=1, prediction_result=2.0))
+    db.commit()
+    first, response = _call(stock.get_prediction)
+    assert first.prediction.result == 2.0
+    etag = response.headers["etag"]
+
+    with patch.object(stock, "run_prediction_async") as run:
+        second, _ = _call(stock.get_prediction, etag)
+    assert second.status_code == 304
+    run.assert_not_called()
+
+def test_explanation_etag_absent_until_row_exists(api):
+    with patch.object(stock, "generate_explanation_async", AsyncMock(return_value={
+        "predicted_date": date.today(), "tokens": [], "token_scores": [],
+    })) as generate:
+        _, response = _call(stock.get_explanation, '"anything"')
+    generate.assert_awaited_once()
+    assert "etag" not in response.headers
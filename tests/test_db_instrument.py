@@ -0,0 +1,124 @@
+# tests/test_db_instrument.py
+import asyncio
+import logging
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from db.instrument import DBStats, TimedQueuePool, db_stats, instrument_engine, track_queries
+from db.models.ticker import Ticker
+from db.async_session import get_async_db
+from db.session import engine_options
+
+def _get(path: str):
+    """TestClient(httpx) 없이 ASGI app 을 직접 호출"""
+    messages = []
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("test", 80), "client": ("test", 1), "root_path": "",
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return messages[0]["status"]
+
+def test_engine_options_from_env(monkeypatch):
+    assert engine_options("sqlite://") == {"pool_pre_ping": True}
+
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+    options = engine_options("mysql+pymysql://u:p@localhost/db")
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 3
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is True
+
+def test_checkout_wait_and_timeout_are_recorded(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2,
+    )
+    stats = DBStats()
+    instrument_engine(engine, stats)
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert stats.checkout_timeouts == 1
+
+    # 다른 스레드가 0.3초 뒤 반납 → 그동안 대기한 시간이 기록됨
+    engine.pool._timeout = 2
+    threading.Timer(0.3, held.close).start()
+    with engine.connect():
+        pass
+    snap = stats.snapshot(engine)
+    assert snap["checkout"]["max_ms"] >= 250
+    assert snap["pool"]["size"] == 1 and snap["pool"]["class"] == "TimedQueuePool"
+
+def test_slow_queries_are_logged(caplog):
+    engine = create_engine("sqlite://")
+    stats = DBStats(slow_query_ms=0)
+    instrument_engine(engine, stats)
+
+    with caplog.at_level(logging.WARNING, logger="db.instrument"), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert stats.slow_queries == 1
+    assert stats.query.count == 1
+    assert "slow query" in caplog.text and "SELECT 1" in caplog.text
+
+def test_track_queries_follows_worker_threads():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    instrument_engine(engine, DBStats())
+
+    def query():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def handler():
+        await asyncio.gather(asyncio.to_thread(query), asyncio.to_thread(query))
+
+    with track_queries() as stats:
+        asyncio.run(handler())
+        query()
+    assert stats.queries == 3
+
+def test_db_stats_endpoint_reports_queries_per_route(async_db):
+    db, AsyncSession = async_db
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    instrument_engine(AsyncSession.kw["bind"].sync_engine)
+
+    async def override():
+        async with AsyncSession() as s:
+            yield s
+
+    db_stats.reset()
+    app.dependency_overrides[get_async_db] = override
+    try:
+        assert _get("/search") == 200
+        assert _get("/search") == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    per_route = db_stats.snapshot()["requests"]["/search"]
+    assert per_route["requests"] == 2
+    # 첫 요청만 ticker 스냅샷을 읽고, 두 번째는 메모리 인덱스에서 응답
+    assert per_route["max_queries"] >= 1
+    assert per_route["queries"] == per_route["max_queries"]
+    assert _get("/db/stats") == 200
@@ -0,0 +1,116 @@
+# tests/test_explanation_storage.py
+import json
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import explanation
+from db.models.ticker import Ticker
+from db.migrate_explanation_blobs import add_blob_columns, convert_rows, storage_bytes
+from db.models.explanation import Explanation, pack_scores, pack_tokens, unpack_scores, unpack_tokens
+
+def test_token_blob_round_trip():
+    for tokens in ([], [""], ["rate", "", "금리", "earnings guidance"]):
+        assert unpack_tokens(pack_tokens(tokens)) == tokens
+    with pytest.raises(ValueError):
+        pack_tokens(["bad\x00token"])
+
+def test_scores_are_float32_packed():
+    scores = [0.25, -1.5, 3.0, 0.1]
+    blob = pack_scores(scores)
+    assert len(blob) == 4 * len(scores)
+    assert unpack_scores(blob)[:3] == [0.25, -1.5, 3.0]
+    assert unpack_scores(blob)[3] == pytest.approx(0.1, rel=1e-7)
+    assert unpack_scores(b"") == []
+
+def test_model_reads_blob_and_legacy_json(db):
+    new = Explanation(ticker_id=1, predicted_date=date(2025, 5, 22), horizon_days=7)
+    new.set_token(["a", "b"])
+    new.set_token_score([0.5, 0.25])
+    # 변환 전 행: JSON 만 있음
+    old = Explanation(ticker_id=1, predicted_date=date(2025, 5, 21), horizon_days=7,
+                      token=json.dumps(["x"]), token_score=json.dumps([0.75]))
+    db.add_all([new, old])
+    db.commit()
+    db.expire_all()
+
+    assert (new.get_token(), new.get_token_score()) == (["a", "b"], [0.5, 0.25])
+    assert new.token is None and new.token_score is None
+    assert (old.get_token(), old.get_token_score()) == (["x"], [0.75])
+
+def test_values_blob_cannot_hold_fall_back_to_json(db):
+    tokens, scores = ["ok", "bad\x00token"], [0.5, None]
+    values = Explanation.encode(tokens, scores)
+    assert values["token_blob"] is None and values["token_score_blob"] is None
+    row = Explanation(ticker_id=1, predicted_date=date(2025, 5, 22), horizon_days=7, **values)
+    db.add(row)
+    db.commit()
+    db.expire_all()
+    assert (row.get_token(), row.get_token_score()) == (tokens, scores)
+
+    # 한쪽만 못 나타내면 그쪽만 JSON
+    row.set_token(["a"])
+    assert row.token is None and row.get_token() == ["a"]
+    assert Explanation.encode(["a\x00"], [0.5])["token_score_blob"] == pack_scores([0.5])
+
+def test_model_output_with_nul_token_is_stored_and_returned(db):
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tokens = ["rate", "odd\x00token"]
+    with patch.object(explanation, "fetch_explanation", return_value=(tokens, [0.5, 0.25])):
+        result = explanation.generate_explanation("AAPL", 7, session=db)
+    assert result["tokens"] == tokens and result["token_scores"] == [0.5, 0.25]
+
+    # 다음 요청은 저장된 행에서 (모델 서버 호출 없음)
+    with patch.object(explanation, "fetch_explanation", side_effect=AssertionError):
+        cached = explanation.generate_explanation("AAPL", 7, session=db)
+    assert cached["tokens"] == tokens
+    assert cached["predicted_date"] == date.today() + timedelta(days=7)
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """blob 컬럼이 없던 시절의 explanation 테이블"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE explanation (id INTEGER PRIMARY KEY, ticker_id INTEGER NOT NULL, "
+            "predicted_date DATE NOT NULL, horizon_days INTEGER NOT NULL, token TEXT, token_score TEXT)"
+        ))
+        for i in range(1, 8):
+            conn.execute(
+                text("INSERT INTO explanation VALUES (:id, 1, :d, :h, :t, :s)"),
+                {"id": i, "d": f"2025-05-{10 + i}", "h": 7,
+                 "t": json.dumps([f"tok{i}", "earnings"]), "s": json.dumps([0.5, 0.25])},
+            )
+        conn.execute(text("INSERT INTO explanation VALUES (8, 1, '2025-05-30', 7, 'not json', '[]')"))
+    yield engine
+    engine.dispose()
+
+def test_migration_adds_columns_and_converts_in_batches(legacy_engine):
+    assert add_blob_columns(legacy_engine) == ["token_blob", "token_score_blob"]
+    assert add_blob_columns(legacy_engine) == []   # 다시 실행해도 안전
+    before = storage_bytes(legacy_engine)
+
+    assert convert_rows(legacy_engine, batch_size=3) == {"converted": 7, "skipped": 1}
+    # 남은 행이 없으면 아무것도 하지 않음 (중단 후 재실행)
+    assert convert_rows(legacy_engine, batch_size=3) == {"converted": 0, "skipped": 1}
+
+    after = storage_bytes(legacy_engine)
+    assert after["json"] < before["json"] and after["blob"] > 0
+    with sessionmaker(bind=legacy_engine)() as s:
+        rows = {r.id: r for r in s.query(Explanation)}
+        assert rows[3].get_token() == ["tok3", "earnings"]
+        assert rows[3].get_token_score() == [0.5, 0.25]
+        assert rows[3].token is None
+        # 변환하지 못한 행은 JSON 그대로
+        assert rows[8].token == "not json" and rows[8].token_blob is None
+
+def test_migration_keep_json(legacy_engine):
+    add_blob_columns(legacy_engine)
+    convert_rows(legacy_engine, keep_json=True)
+    with sessionmaker(bind=legacy_engine)() as s:
+        row = s.get(Explanation, 1)
+        assert row.token is not None and row.get_token() == ["tok1", "earnings"]
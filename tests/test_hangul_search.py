@@ -0,0 +1,105 @@
+# tests/test_hangul_search.py
+import time
+
+import pytest
+
+from app.crud import hangul
+from app.crud.search import SearchIndex, rebuild_search_index
+from app.crud.tickers import TickerInfo
+from db.models.ticker import Ticker
+
+KOSPI = [
+    ("005930", "삼성전자"), ("000660", "SK하이닉스"), ("207940", "삼성바이오로직스"),
+    ("005380", "현대차"), ("000270", "기아"), ("006400", "삼성SDI"), ("028260", "삼성물산"),
+    ("035420", "NAVER"), ("035720", "카카오"), ("051910", "LG화학"), ("012330", "현대모비스"),
+    ("011170", "롯데케미칼"), ("003550", "LG"), ("032830", "삼성생명"), ("105560", "KB금융"),
+]
+US = [("SAM", "Samsara Inc."), ("HYG", "High Yield Corp"), ("KO", "Coca-Cola Company")]
+
+def _index():
+    tickers = [TickerInfo(id=i, ticker_code=c, company_name=n, market="KOSPI") for i, (c, n) in enumerate(KOSPI)]
+    tickers += [TickerInfo(id=100 + i, ticker_code=c, company_name=n, market="US") for i, (c, n) in enumerate(US)]
+    return SearchIndex(tickers)
+
+def _codes(rows):
+    return [t.ticker_code for t in rows]
+
+def test_decompose_chosung_romanize():
+    assert hangul.decompose("삼성전자") == "ㅅㅏㅁㅅㅓㅇㅈㅓㄴㅈㅏ"
+    assert hangul.decompose("값") == "ㄱㅏㅂㅅ"            # 겹받침은 낱자로
+    assert hangul.decompose("화") == "ㅎㅗㅏ"             # 겹모음도 낱자로
+    assert hangul.chosung("삼성전자") == "ㅅㅅㅈㅈ"
+    assert hangul.chosung("SK하이닉스") == "skㅎㅇㄴㅅ"
+    assert hangul.romanize("삼성전자") == "samseongjeonja"
+    assert hangul.romanize("현대차") == "hyeondaecha"
+
+@pytest.mark.parametrize("official, common", [
+    ("samseong", "samsung"), ("hyeondae", "hyundai"), ("rotde", "lotte"), ("gia", "kia"), ("kakao", "Kakao"),
+])
+def test_fold_roman_matches_common_spellings(official, common):
+    assert hangul.fold_roman(official) == hangul.fold_roman(common)
+
+@pytest.mark.parametrize("query, expected", [
+    ("ㅅㅅㅈㅈ", ["005930"]),
+    ("ㅎㄷㅊ", ["005380"]),
+    ("ㅋㅋㅇ", ["035720"]),
+    ("samsung electronics", []),                # 로마자 키에 영문 번역어는 없음
+    ("samsungjunja", ["005930"]),
+    ("hyundai", ["005380", "012330"]),
+    ("kia", ["000270"]),
+    ("lotte", ["011170"]),
+    ("kakao", ["035720"]),
+    ("삼성젅", ["005930"]),                      # "삼성전자" 입력 중 (ㄴ+ㅈ 이 겹받침으로 붙은 상태)
+    ("현ㄷ", ["005380", "012330"]),
+])
+def test_korean_queries(query, expected):
+    assert _codes(_index().search(query, limit=None)) == expected
+
+def test_chosung_prefix_ranks_before_substring():
+    got = _codes(_index().search("ㅅㅅ", limit=None))
+    # 초성 prefix (삼성*) 가 먼저, 순서는 코드 순위(짧은 코드 > 알파벳)
+    assert set(got[:5]) == {"005930", "006400", "028260", "032830", "207940"}
+
+    got = _codes(_index().search("ㅈㅈ", limit=None))
+    assert got == ["005930"]                     # 초성 부분 문자열
+
+def test_sql_matches_rank_before_romanized_matches():
+    # "sam" 은 Samsara 의 ILIKE 매칭이 먼저, 삼성* 로마자 매칭은 그 뒤
+    got = _codes(_index().search("sam", limit=None))
+    assert got[0] == "SAM"
+    assert set(got[1:]) == {"005930", "006400", "028260", "032830", "207940"}
+
+def test_rebuild_search_index_after_seed(db):
+    db.add(Ticker(ticker_code="005930", company_name="삼성전자", market="KOSPI"))
+    db.commit()
+    assert _codes(rebuild_search_index(db).search("ㅅㅅ")) == ["005930"]
+
+    db.add(Ticker(ticker_code="000270", company_name="기아", market="KOSPI"))
+    db.commit()
+    index = rebuild_search_index(db)
+    assert index.hangul_entries == 2
+    assert _codes(index.search("kia")) == ["000270"]
+
+def test_korean_search_latency():
+    """KOSPI 950 + US 3000 종목에서 초성/자모/로마자 질의가 질의당 1ms 미만"""
+    syllables = "가나다라마바사아자차카타파하삼성현대전자화학금융"
+    tickers = [
+        TickerInfo(id=i, ticker_code=f"{i:06d}",
+                   company_name="".join(syllables[(i * k) % len(syllables)] for k in (1, 3, 7, 11)),
+                   market="KOSPI")
+        for i in range(950)
+    ]
+    tickers += [
+        TickerInfo(id=10_000 + i, ticker_code=f"U{i}", company_name=f"Company {i} Holdings", market="US")
+        for i in range(3000)
+    ]
+    index = SearchIndex(tickers)
+    queries = ["ㅅ", "ㅅㅅ", "ㅅㅅㅈ", "삼", "삼ㅅ", "삼성", "삼성저", "sa", "sam", "samsung", "hyundai", "ㅎㄷ"]
+
+    start = time.perf_counter()
+    for _ in range(50):
+        for q in queries:
+            index.search(q)
+    per_query = (time.perf_counter() - start) / (50 * len(queries))
+
+    assert per_query < 1e-3
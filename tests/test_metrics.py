@@ -0,0 +1,113 @@
+# tests/test_metrics.py
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.crud.model_client import model_client
+from app.crud.prediction import run_prediction
+from app.main import app
+from app.metrics import Metrics, metrics
+from app.routers import stock
+from db.models.ticker import Ticker
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def _get(path: str, query: str = ""):
+    """TestClient(httpx) 없이 ASGI app 을 직접 호출 → (status, body)"""
+    messages = []
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "headers": [], "http_version": "1.1", "scheme": "http",
+        "server": ("test", 80), "client": ("test", 1), "root_path": "",
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return messages[0]["status"], body.decode()
+
+def test_histogram_buckets_are_cumulative_in_render():
+    m = Metrics(buckets=(0.1, 1))
+    for seconds in (0.05, 0.5, 5):
+        m.observe_stage("run_prediction", "cache_query", seconds)
+    m.count_cache("run_prediction", True)
+    m.count_cache("get_chart_data", False)
+
+    text = m.render()
+    labels = 'op="run_prediction",stage="cache_query"'
+    assert f'stage_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'stage_duration_seconds_bucket{{{labels},le="1"}} 2' in text
+    assert f'stage_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"stage_duration_seconds_count{{{labels}}} 3" in text
+    assert 'cache_requests_total{op="run_prediction",result="hit"} 1' in text
+    assert 'cache_requests_total{op="get_chart_data",result="miss"} 1' in text
+    assert "# TYPE db_query_duration_seconds histogram" in text
+
+def test_upstream_timer_counts_errors_and_reraises():
+    m = Metrics()
+    with m.upstream("fdr"):
+        pass
+    with pytest.raises(ValueError), m.upstream("fdr"):
+        raise ValueError("boom")
+
+    assert m.counter("upstream_requests_total", "fdr", "ok") == 1
+    assert m.counter("upstream_requests_total", "fdr", "error") == 1
+    assert m.histogram_count("upstream_request_duration_seconds", "fdr") == 2
+
+def test_disabled_metrics_record_nothing():
+    m = Metrics(enabled=False)
+    with m.stage("run_prediction", "insert"), m.upstream("yfinance"):
+        m.count_cache("run_prediction", False)
+    assert m.histogram_count("stage_duration_seconds", "run_prediction", "insert") == 0
+    assert m.counter("cache_requests_total", "run_prediction", "miss") == 0
+
+def test_run_prediction_records_stages_and_cache_results(db, monkeypatch):
+    monkeypatch.setenv("NGROK_API_URL", "http://model.local/")
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    with patch.object(model_client, "get_json", return_value={"prediction_result": 1.5}):
+        run_prediction("AAPL", 7, session=db)    # miss → 모델 서버 호출 + insert
+        run_prediction("AAPL", 7, session=db)    # hit
+    with patch.object(model_client, "get_json", side_effect=ConnectionError("down")):
+        assert run_prediction("AAPL", 1, session=db)["result"] == 0.0
+
+    assert metrics.counter("cache_requests_total", "run_prediction", "hit") == 1
+    assert metrics.counter("cache_requests_total", "run_prediction", "miss") == 2
+    assert metrics.counter("upstream_requests_total", "model_predict", "ok") == 1
+    assert metrics.counter("upstream_requests_total", "model_predict", "error") == 1
+    for stage, count in (("ticker_lookup", 3), ("cache_query", 3), ("upstream_fetch", 2), ("insert", 1)):
+        assert metrics.histogram_count("stage_duration_seconds", "run_prediction", stage) == count
+
+def test_metrics_endpoint_reports_route_latency_and_serialization():
+    async def fake_prediction(ticker, horizon):
+        return {"predicted_date": "2025-05-22", "result": 1.5}
+
+    with patch.object(stock, "run_prediction_async", fake_prediction), \
+         patch.object(stock, "prediction_version_async", AsyncMock(return_value=None)):
+        assert _get("/stock-info/pred", "ticker=AAPL&horizon=7")[0] == 200
+        assert _get("/stock-info/pred", "ticker=AAPL&horizon=5")[0] == 400
+    assert _get("/no-such-path")[0] == 404
+
+    status, text = _get("/metrics")
+    assert status == 200
+    assert 'http_request_duration_seconds_count{route="/stock-info/pred",method="GET",status="200"} 1' in text
+    assert 'http_request_duration_seconds_count{route="/stock-info/pred",method="GET",status="400"} 1' in text
+    # 매칭되지 않은 경로는 한 label 로 묶음 (label 수 폭증 방지)
+    assert 'route="unmatched",method="GET",status="404"' in text
+    # 400 은 endpoint 안에서 예외로 끝나므로 직렬화 단계가 없음
+    assert 'stage_duration_seconds_count{op="/stock-info/pred",stage="serialize"} 1' in text
@@ -0,0 +1,173 @@
+# tests/test_model_client.py
+import json
+import socket
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from app.crud import explanation, prediction, revalidate
+from app.crud.model_client import CircuitBreaker, CircuitOpenError, ModelClient
+from db.models.explanation import Explanation
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+class StubModelServer:
+    """
+    로컬 모델 서버 stub (HTTP/1.1 keep-alive)
+    statuses 에 넣은 상태 코드를 차례로 응답하고, 다 쓰면 200
+    """
+
+    def __init__(self):
+        self.statuses = []
+        self.requests = []
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                stub.requests.append((url.path, parse_qs(url.query)))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                body = json.dumps({"prediction_result": 1.5}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def stub():
+    server = StubModelServer()
+    yield server
+    server.close()
+
+def _closed_port_url():
+    # 바로 닫은 포트 → connection refused
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+def _client(url, **kw):
+    kw.setdefault("backoff", 0)
+    return ModelClient(base_url=url, **kw)
+
+def test_client_reuses_keep_alive_connection(stub):
+    client = _client(stub.url)
+    for horizon in (1, 7, 30):
+        assert client.get_json("predict", {"ticker": "AAPL", "horizon_days": horizon}) == {"prediction_result": 1.5}
+    client.close()
+
+    assert stub.connections == 1
+    assert [q["horizon_days"] for _, q in stub.requests] == [["1"], ["7"], ["30"]]
+
+def test_client_retries_gateway_errors_then_succeeds(stub):
+    stub.statuses = [502, 503]
+    client = _client(stub.url, retries=2)
+    assert client.get_json("predict", {"ticker": "AAPL"}) == {"prediction_result": 1.5}
+    assert len(stub.requests) == 3
+    assert client.breaker.state == "closed"
+
+def test_client_gives_up_after_retries_and_counts_one_failure(stub):
+    stub.statuses = [503] * 3
+    client = _client(stub.url, retries=1, breaker=CircuitBreaker(threshold=2))
+    with pytest.raises(requests.HTTPError):
+        client.get_json("predict", {})
+    assert len(stub.requests) == 2
+    assert client.breaker.state == "closed"
+
+def test_client_4xx_does_not_trip_breaker(stub):
+    stub.statuses = [404, 404]
+    client = _client(stub.url, breaker=CircuitBreaker(threshold=1))
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.get_json("predict", {})
+    assert client.breaker.state == "closed"
+
+def test_breaker_opens_fails_fast_and_recovers_via_trial_call(stub):
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30, clock=lambda: now[0])
+    down = _client(_closed_port_url(), retries=0, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            down.get_json("predict", {})
+    assert breaker.state == "open"
+
+    # 열려 있는 동안은 네트워크 없이 즉시 실패
+    with patch.object(down.session, "get") as get, pytest.raises(CircuitOpenError):
+        down.get_json("predict", {})
+    get.assert_not_called()
+
+    # reset 이후 시험 호출이 실패하면 다시 open
+    now[0] = 31
+    assert breaker.state == "half_open"
+    with pytest.raises(requests.ConnectionError):
+        down.get_json("predict", {})
+    assert breaker.state == "open"
+
+    # 서버가 살아난 뒤 시험 호출이 성공하면 closed
+    now[0] = 62
+    up = _client(stub.url, breaker=breaker)
+    assert up.get_json("predict", {}) == {"prediction_result": 1.5}
+    assert breaker.state == "closed"
+
+def test_half_open_allows_a_single_trial():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10
+    assert breaker.allow() is True
+    assert breaker.allow() is False   # 시험 호출이 끝나기 전까지 나머지는 fail fast
+
+def test_open_circuit_serves_last_stored_values(async_db):
+    db, _ = async_db   # 배치는 thread 마다 session 을 열므로 파일 sqlite
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tid = db.query(Ticker.id).scalar()
+    old = date.today() - timedelta(days=2)
+    for days_ago, result in ((5, 1.0), (2, 2.0)):
+        db.add(Prediction(ticker_id=tid, predicted_date=date.today() - timedelta(days=days_ago),
+                          horizon_days=7, prediction_result=result))
+    row = Explanation(ticker_id=tid, predicted_date=old, horizon_days=7)
+    row.set_token(["a"])
+    row.set_token_score([1.0])
+    db.add(row)
+    db.commit()
+
+    # stale-while-revalidate 를 끄면 모델 서버 실패 시에만 이전 값으로 응답
+    with patch.object(revalidate, "MAX_STALE_DAYS", 0), \
+         patch.object(prediction.model_client, "get_json", side_effect=CircuitOpenError("open")):
+        assert prediction.run_prediction("AAPL", 7, session=db) == {
+            "predicted_date": old.isoformat(), "result": 2.0, "stale": True,
+        }
+        # 저장된 값이 없는 horizon 은 이전처럼 0.0
+        assert prediction.run_prediction("AAPL", 30, session=db)["result"] == 0.0
+        batch = prediction.run_prediction_batch([("AAPL", 7), ("AAPL", 1)], session=db)
+        assert batch[("AAPL", 7)]["result"] == 2.0 and batch[("AAPL", 1)]["result"] == 0.0
+        assert explanation.generate_explanation("AAPL", 7, session=db) == {
+            "predicted_date": old, "tokens": ["a"], "token_scores": [1.0], "stale": True,
+        }
+    # 이전 값은 오늘 키로 다시 저장하지 않음
+    assert db.query(Prediction).count() == 2
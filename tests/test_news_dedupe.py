@@ -0,0 +1,83 @@
+# tests/test_news_dedupe.py
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.crud import news
+from db import migrate_news_dedupe
+from db.models.news import News, hash_link
+from db.models.ticker import Ticker
+
+def _article(title, link, pub):
+    return {"content": {
+        "title": title, "summary": "", "pubDate": pub,
+        "canonicalUrl": {"url": link}, "provider": {"displayName": "p"},
+    }}
+
+@pytest.fixture
+def seeded(db):
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.add(News(ticker_id=1, title="old", link="l0", pub_date=datetime(2025, 5, 19, 9), provider="p"))
+    db.commit()
+    return db
+
+def test_refresh_dedupes_by_link_not_pub_date(seeded):
+    feed = SimpleNamespace(news=[
+        _article("old again", "l0", "2025-05-20T09:00:00Z"),   # 재발행: pubDate 만 바뀜
+        _article("same time", "l1", "2025-05-19T09:00:00Z"),   # DB 최신 기사와 pubDate 가 같은 새 기사
+        _article("twice", "l2", "2025-05-18T09:00:00Z"),
+        _article("twice", "l2", "2025-05-18T09:00:00Z"),
+    ])
+    with patch.object(news.yf, "Ticker", return_value=feed):
+        assert news.refresh_news("AAPL", session=seeded) == 2
+        assert news.refresh_news("AAPL", session=seeded) == 0
+    rows = seeded.execute(select(News.title, News.link_hash).order_by(News.id)).all()
+    assert rows == [("old", hash_link("l0")), ("same time", hash_link("l1")), ("twice", hash_link("l2"))]
+
+def test_link_hash_default_and_unique_per_ticker(seeded):
+    seeded.add(Ticker(ticker_code="MSFT", company_name="Microsoft", market="US"))
+    # 같은 link 라도 종목이 다르면 따로 저장
+    seeded.add(News(ticker_id=2, title="old", link="l0", pub_date=datetime(2025, 5, 19), provider="p"))
+    seeded.commit()
+    seeded.add(News(ticker_id=1, title="dup", link="l0 ", pub_date=datetime(2025, 5, 20), provider="p"))
+    with pytest.raises(IntegrityError):
+        seeded.commit()
+
+def test_latest_queries_read_the_index_in_order(db):
+    def plan(stmt):
+        sql = str(stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+        return " ".join(r[-1] for r in db.execute(text("EXPLAIN QUERY PLAN " + sql)))
+
+    rows = select(News).where(News.ticker_id == 1).order_by(News.pub_date.desc(), News.id.desc()).limit(10)
+    ids = select(News.id).where(News.ticker_id == 1).order_by(News.pub_date.desc(), News.id.desc()).limit(10)
+    assert "USING INDEX ix_news_ticker_pub" in plan(rows) and "TEMP B-TREE" not in plan(rows)
+    assert "USING COVERING INDEX ix_news_ticker_pub" in plan(ids)
+
+def test_migration_fills_hashes_removes_duplicates_and_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE news (id INTEGER PRIMARY KEY, ticker_id INTEGER NOT NULL, title VARCHAR(256) NOT NULL, "
+            "summary TEXT, link VARCHAR(512) NOT NULL, pub_date DATETIME NOT NULL, provider VARCHAR(64))"
+        ))
+        conn.execute(text(
+            "INSERT INTO news (ticker_id, title, link, pub_date) VALUES "
+            "(1, 'a', 'l0', '2025-05-19'), (1, 'b', 'l1', '2025-05-19'), (1, 'a again', 'l0', '2025-05-20'), "
+            "(2, 'a', 'l0', '2025-05-19'), (1, 'a third', 'l0', '2025-05-21')"
+        ))
+
+    summary = migrate_news_dedupe.migrate(engine, batch_size=2)
+    assert summary == {"column_added": True, "hashed": 5, "deleted": 2,
+                       "indexes_created": ["uq_news_link", "ix_news_ticker_pub"]}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, title FROM news ORDER BY id")).all() == [(1, "a"), (2, "b"), (4, "a")]
+    assert {i["name"] for i in inspect(engine).get_indexes("news")} >= {"uq_news_link", "ix_news_ticker_pub"}
+
+    # 다시 실행해도 할 일 없음
+    assert migrate_news_dedupe.migrate(engine) == {"column_added": False, "hashed": 0, "deleted": 0,
+                                                   "indexes_created": []}
+    engine.dispose()
@@ -0,0 +1,123 @@
+# tests/test_news_poller.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import news
+from app.crud.news import NewsDemand
+from app.scheduler.news import NewsPoller
+from db.models.news import News
+from db.models.news_watermark import NewsWatermark
+from db.models.ticker import Ticker
+
+NOW = datetime(2025, 5, 20, 12, 0)
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def seeded(db):
+    db.add_all([Ticker(ticker_code=c, company_name=c, market="US") for c in ("AAPL", "MSFT", "NVDA")])
+    db.add(News(ticker_id=1, title="old", link="l0", pub_date=datetime(2025, 5, 19), provider="p"))
+    db.commit()
+    return db
+
+def _poller(db, demand, calls, **kwargs):
+    def refresher(code):
+        calls.append(code)
+        if code == "NVDA":
+            raise RuntimeError("rate limited")
+        return 1
+    kwargs.setdefault("rate_per_sec", 0)
+    return NewsPoller(sessionmaker(bind=db.get_bind()), refresher, demand, freshness=600, workers=1, **kwargs)
+
+def test_demand_decays_and_ranks_by_recent_requests():
+    clock = Clock()
+    demand = NewsDemand(half_life=60, clock=clock)
+    demand.hit("AAPL")
+    assert demand.wakeup.is_set()
+    demand.wakeup.clear()
+    demand.hit("AAPL")
+    assert not demand.wakeup.is_set()   # 이미 알려진 종목은 poller 를 깨우지 않음
+    for _ in range(3):
+        demand.hit("MSFT")
+    assert demand.wakeup.is_set()
+    assert [c for c, _ in demand.ranked()] == ["MSFT", "AAPL"]
+
+    clock.now = 60
+    assert dict(demand.ranked()) == pytest.approx({"MSFT": 1.5, "AAPL": 1.0})
+    clock.now = 600   # 오래 요청이 없으면 잊음
+    assert demand.ranked() == []
+
+def test_request_path_reads_db_and_index_without_upstream(seeded):
+    demand = NewsDemand()
+    with patch.object(news, "news_demand", demand), \
+         patch.object(news, "yf", SimpleNamespace(Ticker=None)):   # 호출되면 TypeError
+        first = news.get_recent_news("AAPL", session=seeded)
+        # 두 번째 요청은 최신 10건 index 에서 (DB 행을 지워도 그대로)
+        seeded.query(News).delete()
+        seeded.commit()
+        assert news.get_recent_news("AAPL", session=seeded) == first
+    assert [n["title"] for n in first] == ["old"]
+    assert demand.ranked()[0][0] == "AAPL" and demand.wakeup.is_set()
+
+def test_refresh_news_stores_new_items_and_invalidates_index(seeded):
+    feed = SimpleNamespace(news=[{"content": {
+        "title": "new", "summary": "", "pubDate": "2025-05-20T09:00:00Z",
+        "canonicalUrl": {"url": "l1"}, "provider": {"displayName": "p"},
+    }}])
+    news.get_recent_news("AAPL", session=seeded)
+    with patch.object(news.yf, "Ticker", return_value=feed):
+        assert news.refresh_news("AAPL", session=seeded) == 1
+        assert news.refresh_news("AAPL", session=seeded) == 0
+    assert [n["title"] for n in news.get_recent_news("AAPL", session=seeded)] == ["new", "old"]
+
+def test_poller_checks_stale_tickers_in_demand_order(seeded):
+    clock = Clock()
+    demand = NewsDemand(clock=clock)
+    for code, hits in (("AAPL", 1), ("MSFT", 3), ("NVDA", 2)):
+        for _ in range(hits):
+            demand.hit(code)
+    # MSFT 는 방금 확인함
+    seeded.add(NewsWatermark(ticker_id=2, checked_at=NOW - timedelta(seconds=60)))
+    seeded.commit()
+    calls = []
+
+    summary = _poller(seeded, demand, calls).run_once(NOW)
+    assert calls == ["NVDA", "AAPL"]
+    assert summary == {"due": 2, "checked": 1, "skipped": 0, "failed": 1, "inserted": 1}
+
+    # 확인한 종목은 freshness 동안 다시 확인하지 않음 (실패한 종목도 다음 창까지)
+    calls.clear()
+    assert _poller(seeded, demand, calls).run_once(NOW + timedelta(seconds=300))["due"] == 0
+    assert _poller(seeded, demand, calls).run_once(NOW + timedelta(seconds=601))["due"] == 3
+    assert calls == ["MSFT", "NVDA", "AAPL"]
+
+def test_poller_limits_each_tick_to_the_busiest_tickers(seeded):
+    demand = NewsDemand()
+    for code, hits in (("AAPL", 1), ("MSFT", 3), ("NVDA", 2)):
+        for _ in range(hits):
+            demand.hit(code)
+    calls = []
+    # 초당 0.2회 × 5초 tick → 한 번에 1종목
+    _poller(seeded, demand, calls, rate_per_sec=0.2, tick=5).run_once(NOW)
+    assert calls == ["MSFT"]
+
+def test_claim_lets_only_one_worker_fetch(seeded):
+    demand = NewsDemand()
+    demand.hit("AAPL")
+    first, second = [], []
+    a, b = _poller(seeded, demand, first), _poller(seeded, demand, second)
+    with a.session_factory() as s1, b.session_factory() as s2:
+        # 두 worker 가 같은 tick 에 AAPL 을 due 로 봄
+        assert [t.ticker_code for t in a.due(s1, NOW)] == ["AAPL"]
+        assert [t.ticker_code for t in b.due(s2, NOW)] == ["AAPL"]
+        assert a.claim(s1, 1, NOW) is True
+        assert b.claim(s2, 1, NOW) is False
@@ -0,0 +1,208 @@
+# tests/test_prediction_batch.py
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import prediction, utils
+from app.crud.singleflight import SingleFlight
+from app.routers import stock
+from db.instrument import DBStats, instrument_engine, track_queries
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+@pytest.fixture
+def db(async_db):
+    # 배치의 미스는 thread 마다 같은 engine 으로 session 을 열므로 (in-memory sqlite 는 thread 마다 다른 DB) 파일 sqlite
+    session, _ = async_db
+    return session
+
+@pytest.fixture
+def tickers(db):
+    db.add_all([
+        Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"),
+        Ticker(ticker_code="MSFT", company_name="Microsoft", market="US"),
+        Ticker(ticker_code="005930", company_name="삼성전자", market="KOSPI"),
+    ])
+    db.commit()
+    return {code: tid for tid, code in db.query(Ticker.id, Ticker.ticker_code)}
+
+def _cache(db, tid, horizon, result):
+    db.add(Prediction(ticker_id=tid, predicted_date=date.today() + timedelta(days=horizon),
+                      horizon_days=horizon, prediction_result=result))
+    db.commit()
+
+def test_batch_reads_cache_in_one_query_and_stores_misses(db, tickers):
+    _cache(db, tickers["AAPL"], 7, 1.5)
+    calls = []
+
+    def fake_fetch(ticker, horizon):
+        calls.append((ticker.ticker_code, horizon))
+        return float(horizon)
+
+    keys = [("AAPL", 7), ("AAPL", 1), ("MSFT", 7), ("NOPE", 7)]
+    prediction.ticker_registry.all(db)   # registry 스냅샷 로드는 쿼리 수에서 제외
+    instrument_engine(db.get_bind(), DBStats())
+    with patch.object(prediction, "fetch_prediction", side_effect=fake_fetch), track_queries() as stats:
+        results = prediction.run_prediction_batch(keys, session=db)
+
+    assert sorted(calls) == [("AAPL", 1), ("MSFT", 7)]
+    assert results[("AAPL", 7)]["result"] == 1.5
+    assert results[("AAPL", 1)] == {
+        "predicted_date": (date.today() + timedelta(days=1)).isoformat(), "result": 1.0,
+    }
+    assert results[("MSFT", 7)]["result"] == 7.0
+    assert results[("NOPE", 7)]["result"] == 0.0
+    # 캐시 조회 1 + stale 후보 조회 1 (+ registry 에 없는 NOPE 확인 1) + 미스마다 잠금 안 재확인 1, insert 1
+    assert stats.queries == 7
+    assert db.query(Prediction).count() == 3
+
+def test_batch_failed_fetch_returns_zero_and_is_not_stored(db, tickers):
+    def flaky(ticker, horizon):
+        if ticker.ticker_code == "MSFT":
+            raise ConnectionError("down")
+        return 2.0
+
+    with patch.object(prediction, "fetch_prediction", side_effect=flaky):
+        results = prediction.run_prediction_batch([("AAPL", 30), ("MSFT", 30)], session=db)
+
+    assert results[("AAPL", 30)]["result"] == 2.0
+    assert results[("MSFT", 30)]["result"] == 0.0
+    assert db.query(Prediction.ticker_id).all() == [(tickers["AAPL"],)]
+
+def test_batch_keeps_rows_stored_concurrently(async_db):
+    db, _ = async_db
+    db.add_all([Ticker(ticker_code="AAPL", market="US"), Ticker(ticker_code="MSFT", market="US")])
+    db.commit()
+    ids = dict(db.query(Ticker.ticker_code, Ticker.id))
+
+    def racing(ticker, horizon):
+        # 모델 서버를 기다리는 동안 단건 요청(다른 session)이 같은 키를 먼저 저장
+        if ticker.ticker_code == "AAPL":
+            with sessionmaker(bind=db.get_bind())() as other:
+                _cache(other, ticker.id, horizon, 9.0)
+        return 1.0
+
+    with patch.object(prediction, "fetch_prediction", side_effect=racing):
+        prediction.run_prediction_batch([("AAPL", 7), ("MSFT", 7)], session=db)
+
+    stored = dict(db.query(Prediction.ticker_id, Prediction.prediction_result))
+    assert stored == {ids["AAPL"]: 9.0, ids["MSFT"]: 1.0}
+
+@pytest.mark.parametrize("first", ["batch", "single"])
+def test_batch_and_single_request_share_one_model_call(db, tickers, first):
+    """같은 키의 배치·단건 미스가 겹치면 먼저 온 쪽의 모델 서버 호출 하나를 공유"""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_fetch(ticker, horizon):
+        calls.append((ticker.ticker_code, horizon))
+        started.set()
+        release.wait(5)
+        return 3.0
+
+    class JoinCounter(SingleFlight):
+        def __init__(self):
+            super().__init__()
+            self.joined = 0
+
+        def do(self, key, fn):
+            self.joined += 1
+            return super().do(key, fn)
+
+    flight = JoinCounter()
+    requests = {
+        "batch": lambda: prediction.run_prediction_batch([("AAPL", 7)])[("AAPL", 7)],
+        "single": lambda: prediction.run_prediction("AAPL", 7),
+    }
+    results = {}
+
+    def call(name):
+        results[name] = requests[name]()
+
+    with patch.object(utils, "SessionLocal", sessionmaker(bind=db.get_bind())), \
+         patch.object(prediction, "_flight", flight), \
+         patch.object(prediction, "fetch_prediction", side_effect=slow_fetch):
+        leader = threading.Thread(target=call, args=(first,))
+        leader.start()
+        assert started.wait(5)
+        waiter = threading.Thread(target=call, args=("single" if first == "batch" else "batch",))
+        waiter.start()
+        # 나중 요청이 모델 서버를 기다리는 중인 flight 에 합류한 뒤에 응답을 돌려줌
+        deadline = time.monotonic() + 2
+        while flight.joined < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        waiter.join(5)
+
+    assert calls == [("AAPL", 7)]
+    assert results["batch"]["result"] == results["single"]["result"] == 3.0
+    assert db.query(Prediction).count() == 1
+
+def test_batch_model_calls_are_concurrent_but_bounded(db, tickers):
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def slow_fetch(ticker, horizon):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return 1.0
+
+    keys = [(code, h) for code in ("AAPL", "MSFT", "005930") for h in (1, 7, 30)]
+    with patch.object(prediction, "PRED_BATCH_CONCURRENCY", 3), \
+         patch.object(prediction, "fetch_prediction", side_effect=slow_fetch):
+        prediction.run_prediction_batch(keys, session=db)
+
+    assert peak == 3
+    assert db.query(Prediction).count() == 9
+
+def test_batch_async_all_hits_stay_on_event_loop(async_db):
+    db, AsyncSession = async_db
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tid = db.query(Ticker.id).scalar()
+    for h in (1, 7):
+        _cache(db, tid, h, float(h))
+
+    async def call(keys):
+        async with AsyncSession() as adb:
+            return await prediction.run_prediction_batch_async(keys, session=adb)
+
+    with patch.object(prediction, "run_prediction_batch") as sync_path:
+        results = asyncio.run(call([("AAPL", 1), ("AAPL", 7)]))
+    sync_path.assert_not_called()
+    assert {k: v["result"] for k, v in results.items()} == {("AAPL", 1): 1.0, ("AAPL", 7): 7.0}
+
+    with patch.object(prediction, "run_prediction_batch",
+                      return_value={("AAPL", 30): {"predicted_date": "x", "result": 3.0}}) as sync_path:
+        results = asyncio.run(call([("AAPL", 1), ("AAPL", 30)]))
+    # 미스만 sync 경로로
+    sync_path.assert_called_once_with([("AAPL", 30)], session=None)
+    assert results[("AAPL", 1)]["result"] == 1.0 and results[("AAPL", 30)]["result"] == 3.0
+
+def test_batch_endpoint_validates_and_keeps_request_order():
+    async def fake_batch(keys):
+        return {k: {"predicted_date": "2025-05-22", "result": float(k[1])} for k in keys}
+
+    with patch.object(stock, "run_prediction_batch_async", fake_batch):
+        resp = asyncio.run(stock.get_prediction_batch(tickers="MSFT, AAPL,MSFT", horizons="30,1"))
+        assert [(p.ticker, p.horizon, p.prediction.result) for p in resp.predictions] == [
+            ("MSFT", 30, 30.0), ("MSFT", 1, 1.0), ("AAPL", 30, 30.0), ("AAPL", 1, 1.0),
+        ]
+        for tickers, horizons in (("AAPL", "5"), ("AAPL", "x"), (" , ", "7")):
+            with pytest.raises(HTTPException) as e:
+                asyncio.run(stock.get_prediction_batch(tickers=tickers, horizons=horizons))
+            assert e.value.status_code == 400
+        with patch.object(stock, "PRED_BATCH_MAX_KEYS", 3), pytest.raises(HTTPException):
+            asyncio.run(stock.get_prediction_batch(tickers="A,B", horizons="1,7"))
@@ -0,0 +1,153 @@
+# tests/test_revalidate.py
+import asyncio
+import threading
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import explanation, prediction, revalidate, utils
+from app.crud.revalidate import Revalidator
+from app.metrics import metrics
+from app.schemas import ExplanationData, PredictionData
+from db.models.explanation import Explanation
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+@pytest.fixture
+def swr(async_db):
+    """파일 sqlite + 백그라운드 갱신이 같은 DB 를 보도록 SessionLocal / revalidator 교체"""
+    db, AsyncSession = async_db
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    tid = db.query(Ticker.id).scalar()
+    rv = Revalidator(workers=2)
+    metrics.reset()
+    with patch.object(utils, "SessionLocal", sessionmaker(bind=db.get_bind())), \
+         patch.object(revalidate, "revalidator", rv), \
+         patch.object(revalidate, "MAX_STALE_DAYS", 3):
+        yield db, AsyncSession, tid, rv
+    metrics.reset()
+
+def _wait_idle(rv, timeout=5):
+    deadline = time.monotonic() + timeout
+    while rv.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert rv.pending() == 0
+
+def _predict(db, tid, horizon, days_ago, result):
+    """days_ago 일 전에 계산된(= 그날 기준 키) 예측"""
+    db.add(Prediction(ticker_id=tid, horizon_days=horizon, prediction_result=result,
+                      predicted_date=date.today() + timedelta(days=horizon - days_ago)))
+    db.commit()
+
+class BlockingModel:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def __call__(self, path, params):
+        self.calls.append((path, params["horizon_days"]))
+        self.release.wait(5)
+        if path == "predict":
+            return {"prediction_result": 9.0}
+        return {"token_list": ["new"], "token_score_list": [1.0]}
+
+def test_stale_prediction_returns_immediately_and_refreshes_in_background(swr):
+    db, _, tid, rv = swr
+    _predict(db, tid, 7, days_ago=1, result=1.0)
+    model = BlockingModel()
+
+    with patch.object(prediction.model_client, "get_json", side_effect=model):
+        first = prediction.run_prediction("AAPL", 7, session=db)
+        # 모델 서버가 아직 응답하지 않았는데도 이전 예측으로 응답
+        assert first == {
+            "predicted_date": (date.today() + timedelta(days=6)).isoformat(), "result": 1.0, "stale": True,
+        }
+        # 갱신 중에 들어온 요청은 갱신을 다시 걸지 않음
+        assert prediction.run_prediction("AAPL", 7, session=db)["stale"] is True
+        model.release.set()
+        _wait_idle(rv)
+
+    assert model.calls == [("predict", 7)]
+    assert prediction.run_prediction("AAPL", 7, session=db) == {
+        "predicted_date": (date.today() + timedelta(days=7)).isoformat(), "result": 9.0,
+    }
+    assert metrics.counter("cache_requests_total", "run_prediction", "stale") == 2
+    assert metrics.counter("cache_requests_total", "run_prediction", "hit") == 1
+
+def test_rows_older_than_max_staleness_wait_for_model(swr):
+    db, _, tid, rv = swr
+    _predict(db, tid, 1, days_ago=4, result=1.0)
+
+    with patch.object(prediction.model_client, "get_json", return_value={"prediction_result": 2.0}) as get_json:
+        result = prediction.run_prediction("AAPL", 1, session=db)
+    assert result == {"predicted_date": (date.today() + timedelta(days=1)).isoformat(), "result": 2.0}
+    get_json.assert_called_once()
+    assert rv.pending() == 0
+
+def test_max_stale_days_zero_disables_stale_responses(swr):
+    db, _, tid, _ = swr
+    _predict(db, tid, 30, days_ago=1, result=1.0)
+    with patch.object(revalidate, "MAX_STALE_DAYS", 0), \
+         patch.object(prediction.model_client, "get_json", return_value={"prediction_result": 2.0}):
+        assert prediction.run_prediction("AAPL", 30, session=db)["result"] == 2.0
+
+def test_batch_serves_stale_keys_and_fetches_the_rest(swr):
+    db, _, tid, rv = swr
+    _predict(db, tid, 7, days_ago=2, result=1.0)
+    model = BlockingModel()
+    model.release.set()
+
+    with patch.object(prediction.model_client, "get_json", side_effect=model):
+        results = prediction.run_prediction_batch([("AAPL", 7), ("AAPL", 1)], session=db)
+        _wait_idle(rv)
+
+    assert results[("AAPL", 7)]["stale"] is True and results[("AAPL", 7)]["result"] == 1.0
+    assert results[("AAPL", 1)] == {"predicted_date": (date.today() + timedelta(days=1)).isoformat(), "result": 9.0}
+    # 7일은 백그라운드 갱신, 1일은 요청 안에서 호출
+    assert sorted(model.calls) == [("predict", 1), ("predict", 7)]
+    assert db.query(Prediction).count() == 3
+
+def test_stale_explanation_async_stays_on_event_loop(swr):
+    db, AsyncSession, tid, rv = swr
+    row = Explanation(ticker_id=tid, predicted_date=date.today() + timedelta(days=6), horizon_days=7)
+    row.set_token(["old"])
+    row.set_token_score([0.5])
+    db.add(row)
+    db.commit()
+    model = BlockingModel()
+
+    async def call():
+        async with AsyncSession() as adb:
+            return await explanation.generate_explanation_async("AAPL", 7, session=adb)
+
+    with patch.object(explanation.model_client, "get_json", side_effect=model), \
+         patch.object(explanation, "generate_explanation") as sync_path:
+        result = asyncio.run(call())
+        sync_path.assert_not_called()
+        model.release.set()
+        _wait_idle(rv)
+
+    assert result["tokens"] == ["old"] and result["stale"] is True
+    assert ExplanationData(**result).stale is True
+    assert explanation.generate_explanation("AAPL", 7, session=db)["tokens"] == ["new"]
+
+def test_schema_defaults_to_fresh():
+    assert PredictionData(predicted_date="2025-05-22", result=1.0).stale is False
+
+def test_revalidator_dedupes_and_survives_errors():
+    rv = Revalidator(workers=1)
+    gate = threading.Event()
+    assert rv.submit("k", gate.wait) is not None
+    assert rv.submit("k", gate.wait) is None
+    gate.set()
+    _wait_idle(rv)
+
+    def boom():
+        raise RuntimeError("model down")
+
+    rv.submit("k", boom).result()   # 예외는 로그만 남기고 key 는 비움
+    assert rv.submit("k", lambda: 1).result() == 1
@@ -0,0 +1,244 @@
+# tests/test_scheduler.py
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from freezegun import freeze_time
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import chart, explanation, prediction
+from app.crud.model_client import model_client
+from app.crud.providers import FakeProvider, set_provider
+from app.scheduler import ChartIngestor, IngestScheduler, Precomputer
+from app.scheduler.ratelimit import RateLimiter, retry_with_backoff
+from db.session import Base
+from db.models.chart_data import ChartData
+from db.models.explanation import Explanation
+from db.models.ingest_watermark import IngestWatermark
+from db.models.prediction import Prediction
+from db.models.ticker import Ticker
+
+# 2025-05-15(목) 22:00 UTC : US 마감(20:00 UTC)+30분 이후, KOSPI 마감(06:30 UTC)+30분 이후
+NOW = datetime(2025, 5, 15, 22, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # worker thread 마다 connection 이 필요하므로 파일 기반 sqlite 사용
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}", connect_args={"timeout": 10})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as s:
+        s.add_all([
+            Ticker(ticker_code="AAPL", market="US"),
+            Ticker(ticker_code="MSFT", market="US"),
+            Ticker(ticker_code="005930", market="KOSPI"),
+        ])
+        s.commit()
+    return Session
+
+class FakeFetcher:
+    def __init__(self, fail_times=0):
+        self.calls = []
+        self.fail_times = fail_times
+
+    def __call__(self, market, codes, start, end, interval):
+        self.calls.extend((market, code, start, end, interval) for code in codes)
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("rate limited")
+        return {
+            code: [{
+                "date": end, "open": 1.0, "high": 1.0, "low": 1.0,
+                "close": 1.0, "volume": 10, "change": 0.0,
+            }]
+            for code in codes
+        }
+
+def _ingestor(session_factory, fetcher, **kw):
+    return ChartIngestor(session_factory, fetcher, workers=3, rate_per_sec=0,
+                         sleep=lambda _: None, **kw)
+
+def test_ingestor_refreshes_all_tickers_and_persists_watermark(session_factory):
+    """seed 된 모든 ticker 의 일봉 수집 + 주봉/월봉 집계 후 watermark 저장"""
+    fetcher = FakeFetcher()
+    summary = _ingestor(session_factory, fetcher).run(now=NOW)
+
+    assert summary == {"jobs": 3, "ok": 3, "failed": 0, "rows": 3}
+    assert {c[4] for c in fetcher.calls} == {1}   # upstream 은 일봉만
+    with session_factory() as s:
+        per_interval = dict(s.execute(
+            select(ChartData.interval, func.count()).group_by(ChartData.interval)
+        ).all())
+        assert per_interval == {1: 3, 7: 3, 30: 3}
+        wms = s.execute(select(IngestWatermark)).scalars().all()
+        assert len(wms) == 3
+        assert all(w.last_date == date(2025, 5, 15) for w in wms)
+
+def test_ingestor_resumes_and_skips_covered_jobs(session_factory):
+    """같은 장 마감 이후 재실행하면 이미 수집된 job 은 건너뜀"""
+    fetcher = FakeFetcher()
+    ingestor = _ingestor(session_factory, fetcher)
+    ingestor.run(market="US", now=NOW)
+
+    summary = ingestor.run(now=NOW + timedelta(minutes=5))
+    assert summary["jobs"] == 1          # KOSPI 만 남음
+    assert {c[1] for c in fetcher.calls[2:]} == {"005930"}
+
+    # 다음 장 마감 이후에는 다시 수집 대상, 시작일은 watermark 다음 날부터
+    ingestor.run(market="US", intervals=(1,), now=NOW + timedelta(days=1))
+    assert fetcher.calls[-1][2] == date(2025, 5, 16)
+
+def test_ingestor_retries_with_backoff_then_succeeds(session_factory):
+    fetcher = FakeFetcher(fail_times=2)
+    summary = _ingestor(session_factory, fetcher, retries=3).run(
+        market="KOSPI", intervals=(1,), now=NOW)
+
+    assert summary == {"jobs": 1, "ok": 1, "failed": 0, "rows": 1}
+    assert len(fetcher.calls) == 3
+
+def test_ingestor_failed_job_keeps_no_watermark(session_factory):
+    fetcher = FakeFetcher(fail_times=10)
+    summary = _ingestor(session_factory, fetcher, retries=2).run(
+        market="KOSPI", intervals=(1,), now=NOW)
+
+    assert summary["failed"] == 1
+    with session_factory() as s:
+        assert s.execute(select(IngestWatermark)).first() is None
+
+def test_ingestor_batches_us_tickers_into_one_upstream_call(session_factory):
+    """US 종목은 batch_size 개씩 묶어 history_many 1회로 받고 종목별로 분리해 저장"""
+    with session_factory() as s:
+        s.add_all(Ticker(ticker_code=f"US{i}", market="US") for i in range(5))
+        s.commit()
+
+    provider = FakeProvider()
+    previous = set_provider("US", provider)
+    try:
+        summary = ChartIngestor(session_factory, workers=2, rate_per_sec=0, batch_size=3,
+                                sleep=lambda _: None).run(market="US", intervals=(1,), now=NOW)
+    finally:
+        set_provider("US", previous)
+
+    # US 7종목 / batch 3 → upstream 3회, 종목별 호출 없음
+    assert [kind for kind, _ in provider.calls] == ["history_many"] * 3
+    assert summary["ok"] == 7 and summary["failed"] == 0
+    with session_factory() as s:
+        per_ticker = dict(s.execute(
+            select(ChartData.ticker_id, func.count()).group_by(ChartData.ticker_id)
+        ).all())
+    assert len(per_ticker) == 7
+    assert len(set(per_ticker.values())) == 1   # 모든 종목이 같은 구간을 받음
+
+def test_retry_with_backoff_grows_delay():
+    delays = []
+    attempts = iter([ValueError, ValueError, "ok"])
+
+    def flaky():
+        item = next(attempts)
+        if item is ValueError:
+            raise ValueError
+        return item
+
+    assert retry_with_backoff(flaky, attempts=3, base_delay=1.0, sleep=delays.append) == "ok"
+    assert 0.5 <= delays[0] <= 1.5 and 1.0 <= delays[1] <= 3.0
+
+def test_rate_limiter_spaces_calls():
+    clock = [0.0]
+    limiter = RateLimiter(2.0, clock=lambda: clock[0],
+                          sleep=lambda s: clock.__setitem__(0, clock[0] + s))
+    for _ in range(5):
+        limiter.acquire()
+    # burst 1 + 초당 2회 → 5번째 호출은 2초 시점
+    assert clock[0] == pytest.approx(2.0)
+
+def test_scheduler_next_run_picks_earliest_market_close():
+    scheduler = IngestScheduler(ingestor=object(), markets=("US", "KOSPI"))
+    market, due = scheduler.next_run(NOW)
+    # 다음은 KOSPI 5/16 15:30 KST(06:30 UTC) + 30분
+    assert market == "KOSPI"
+    assert due == datetime(2025, 5, 16, 7, 0, tzinfo=timezone.utc)
+
+@patch("app.crud.chart.yf.Ticker")
+def test_chart_request_path_reads_db_only_with_scheduler(mock_yf, db):
+    """scheduler 모드에서는 get_chart_data 가 upstream 을 호출하지 않음"""
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+
+    with patch.object(chart, "CHART_FETCH_ON_REQUEST", False):
+        assert chart.get_chart_data("AAPL", interval=1, session=db) == []
+    mock_yf.assert_not_called()
+
+class FakeModel:
+    def __init__(self, fail_codes=()):
+        self.calls = []
+        self.fail_codes = set(fail_codes)
+
+    def predict(self, ticker, horizon):
+        self.calls.append(("prediction", ticker.ticker_code, horizon))
+        if ticker.ticker_code in self.fail_codes:
+            raise ConnectionError("model server down")
+        return float(horizon)
+
+    def explain(self, ticker, horizon):
+        self.calls.append(("explanation", ticker.ticker_code, horizon))
+        return ["up", "down"], [0.25, 0.75]
+
+def _precomputer(session_factory, model, **kw):
+    return Precomputer(session_factory, model.predict, model.explain, workers=3, rate_per_sec=0,
+                       retries=2, sleep=lambda _: None, **kw)
+
+def test_precompute_as_of_dates_cover_until_next_close():
+    """금요일 US 마감 후 실행하면 다음 실행(월요일 마감 후)까지의 현지 날짜를 모두 덮음"""
+    friday = datetime(2025, 5, 16, 21, 0, tzinfo=timezone.utc)
+    dates = Precomputer.as_of_dates("US", friday)
+    assert dates[0] == friday.astimezone().date()
+    assert len(dates) == 4
+    assert dates == [dates[0] + timedelta(days=i) for i in range(4)]
+
+def test_precompute_fills_every_ticker_and_horizon_then_serves_from_db(session_factory):
+    model = FakeModel()
+    summary = _precomputer(session_factory, model).run(now=NOW)
+
+    # ticker 3 × horizon 3 × (prediction, explanation), 모델 서버는 job 마다 1회
+    assert summary["jobs"] == summary["ok"] == 18 and summary["failed"] == 0
+    assert summary["coverage"] == {"prediction": 1.0, "explanation": 1.0}
+    assert sorted(model.calls) == sorted(set(model.calls))
+    with session_factory() as s:
+        assert s.query(Prediction).count() + s.query(Explanation).count() == summary["rows"]
+
+    # 요청 경로는 모델 서버를 부르지 않고 DB 에서 응답
+    with session_factory() as s, freeze_time(NOW.astimezone().replace(tzinfo=None)), \
+         patch.object(model_client, "get_json") as get_json:
+        assert prediction.run_prediction("MSFT", 30, session=s)["result"] == 30.0
+        assert explanation.generate_explanation("005930", 7, session=s)["token_scores"] == [0.25, 0.75]
+    get_json.assert_not_called()
+
+def test_precompute_resumes_and_retries_only_failed_jobs(session_factory):
+    failing = FakeModel(fail_codes={"AAPL"})
+    summary = _precomputer(session_factory, failing).run(market="US", now=NOW)
+
+    # AAPL 예측 3개는 재시도(2회) 후 실패, 나머지는 저장
+    assert summary["jobs"] == 12 and summary["failed"] == 3
+    assert summary["coverage"] == {"prediction": 0.5, "explanation": 1.0}
+    assert failing.calls.count(("prediction", "AAPL", 7)) == 2
+
+    healthy = FakeModel()
+    summary = _precomputer(session_factory, healthy).run(market="US", now=NOW + timedelta(minutes=5))
+    assert sorted(healthy.calls) == [("prediction", "AAPL", h) for h in (1, 7, 30)]
+    assert summary["coverage"] == {"prediction": 1.0, "explanation": 1.0}
+
+def test_scheduler_precomputes_after_ingest():
+    order = []
+
+    class Stub:
+        def __init__(self, name):
+            self.name = name
+
+        def run(self, market):
+            order.append((self.name, market))
+            return {}
+
+    scheduler = IngestScheduler(ingestor=Stub("ingest"), markets=("US",), precomputer=Stub("precompute"))
+    scheduler.run_market("US")
+    assert order == [("ingest", "US"), ("precompute", "US")]
@@ -0,0 +1,128 @@
+# tests/test_search.py
+import asyncio
+import time
+
+import pytest
+
+from app.crud.search import SearchIndex, search_tickers_db, ticker_search
+from app.crud.tickers import TickerInfo, ticker_registry
+from app.routers.search import search_tickers
+from db.models.app_meta import bump_ticker_version
+from db.models.ticker import Ticker
+
+TICKERS = [
+    ("AAPL", "Apple Inc.", "US"),
+    ("APA", "APA Corporation", "US"),
+    ("APH", "Amphenol Corporation", "US"),
+    ("MA", "Mastercard Incorporated", "US"),
+    ("MAA", "Mid-America Apartment Communities", "US"),
+    ("AMAT", "Applied Materials, Inc.", "US"),
+    ("MAR", "Marriott International", "US"),
+    ("META", "Meta Platforms, Inc.", "US"),
+    ("T", "AT&T Inc.", "US"),
+    ("TT", "Trane Technologies", "US"),
+    ("TSLA", "Tesla, Inc.", "US"),
+    ("BRK-B", "Berkshire Hathaway", "US"),
+    ("XYZ", None, "US"),
+    ("005930", "삼성전자", "KOSPI"),
+    ("006400", "삼성SDI", "KOSPI"),
+    ("028260", "삼성물산", "KOSPI"),
+    ("000660", "SK하이닉스", "KOSPI"),
+    ("035420", "NAVER", "KOSPI"),
+    ("005380", "현대차", "KOSPI"),
+]
+
+KEYWORDS = [
+    "a", "A", "ap", "App", "appl", "apple", "ma", "MA", "mar", "tt", "t", "inc", "inc.",
+    "-", "brk-b", ", i", "ia", "삼", "삼성", "성전", "전자", "sk", "하이", "00", "0059", "005930",
+    "naver", "현대차", "zzz", "tion", "pl", " ",
+]
+
+@pytest.fixture
+def seeded(db):
+    db.add_all(Ticker(ticker_code=c, company_name=n, market=m) for c, n, m in TICKERS)
+    db.commit()
+    return db
+
+def _codes(rows):
+    return [t.ticker_code for t in rows]
+
+@pytest.mark.parametrize("keyword", KEYWORDS)
+def test_index_matches_db_path(seeded, keyword):
+    """앞부분 매칭 집합은 ILIKE '%kw%' DB 경로와 같아야 함 (순서만 다름). 한글 키 매칭은 그 뒤에만 붙음"""
+    expected = set(_codes(search_tickers_db(seeded, keyword, limit=None)))
+    got = _codes(ticker_search.search(seeded, keyword, limit=None))
+
+    assert len(got) == len(set(got))
+    assert set(got[:len(expected)]) == expected
+    assert all(t.market == "KOSPI" for t in ticker_search.search(seeded, keyword, limit=None)[len(expected):])
+
+    top = _codes(ticker_search.search(seeded, keyword))
+    assert top == got[:10]
+
+def test_ranking_exact_then_prefix_then_substring(seeded):
+    # MA: 코드 일치 > 코드 prefix(MAA, MAR) > 부분 문자열(AMAT ...)
+    got = _codes(ticker_search.search(seeded, "ma", limit=None))
+    assert got[0] == "MA"
+    assert set(got[1:3]) == {"MAA", "MAR"}
+    assert "AMAT" in got[3:]
+
+    # 이름 prefix 가 부분 문자열보다 앞섬
+    got = _codes(ticker_search.search(seeded, "apple", limit=None))
+    assert got == ["AAPL"]
+    got = _codes(ticker_search.search(seeded, "app", limit=None))
+    assert got == ["AAPL", "AMAT"]   # Apple(인기 종목) 이 Applied Materials 보다 앞
+
+def test_popular_boost_within_tier(seeded):
+    # 코드 prefix "T" 구간: 인기 종목 TSLA 가 TT 보다 앞 (코드 일치인 T 는 맨 앞)
+    got = _codes(ticker_search.search(seeded, "t", limit=None))
+    assert got[0] == "T"
+    assert got.index("TSLA") < got.index("TT")
+
+def test_empty_keyword_returns_popular_tickers(seeded):
+    expected = set(_codes(search_tickers_db(seeded, None)))
+    assert _codes(ticker_search.search(seeded, None)) == ["AAPL", "TSLA", "META", "BRK-B", "MA", "T", "AMAT"]
+    assert set(_codes(ticker_search.search(seeded, ""))) == expected
+
+def test_index_rebuilt_after_ticker_version_bump(seeded):
+    first = ticker_search.index(seeded)
+    assert ticker_search.index(seeded) is first     # 스냅샷이 같으면 재사용
+    assert _codes(ticker_search.search(seeded, "nvda")) == []
+
+    seeded.add(Ticker(ticker_code="NVDA", company_name="NVIDIA Corporation", market="US"))
+    seeded.commit()
+    bump_ticker_version(seeded)
+    ticker_registry.invalidate()    # TTL 경과 대신
+
+    assert ticker_search.index(seeded) is not first
+    assert _codes(ticker_search.search(seeded, "nvda")) == ["NVDA"]
+
+def test_router_response_shape(async_db):
+    db, AsyncSession = async_db
+    db.add_all(Ticker(ticker_code=c, company_name=n, market=m) for c, n, m in TICKERS)
+    db.commit()
+
+    async def call():
+        async with AsyncSession() as adb:
+            return await search_tickers(keyword="삼성전자", db=adb)
+
+    assert asyncio.run(call()) == [
+        {"ticker": "005930", "name": "삼성전자", "market": "KOSPI"}
+    ]
+
+def test_search_latency():
+    """약 3천 종목에서 자동완성 한 번이 1ms 미만"""
+    tickers = [
+        TickerInfo(id=i, ticker_code=f"T{i:04d}", company_name=f"Company {i} Holdings", market="US")
+        for i in range(3000)
+    ]
+    index = SearchIndex(tickers)
+    queries = ["c", "co", "com", "comp", "company 1", "t0", "hold", "12", "zz"]
+
+    start = time.perf_counter()
+    for _ in range(100):
+        for q in queries:
+            index.search(q)
+    per_query = (time.perf_counter() - start) / (100 * len(queries))
+
+    assert per_query < 1e-3
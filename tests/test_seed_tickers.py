@@ -0,0 +1,83 @@
+# tests/test_seed_tickers.py
+import threading
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from db.models.app_meta import TICKER_VERSION_KEY, AppMeta
+from db.models.ticker import Ticker
+from db.seeds.seed_us_tickers import NameCheckpoint, seed_us_tickers
+from db.session import Base
+
+NAMES = {"AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation", "NONAME": None}
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # worker thread 가 fetch 하는 동안 같은 DB 를 쓰므로 파일 기반 sqlite
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as s:
+        s.add(Ticker(ticker_code="AAPL", company_name="Apple (old)", market="US"))
+        s.commit()
+    return Session
+
+class FakeInfo:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self._lock:
+            self.calls.append(ticker)
+        if ticker in self.fail:
+            raise RuntimeError("rate limited")
+        return NAMES.get(ticker)
+
+def _seed(session_factory, checkpoint, fetch, tickers, **kwargs):
+    return seed_us_tickers(session_factory, tickers=tickers, checkpoint=checkpoint, fetch=fetch,
+                           workers=4, rate_per_sec=0, retries=2, sleep=lambda s: None, **kwargs)
+
+def _stored(session_factory):
+    with session_factory() as s:
+        return {t.ticker_code: (t.id, t.company_name) for t in s.execute(select(Ticker)).scalars()}
+
+def test_interrupted_seed_resumes_from_checkpoint(session_factory, tmp_path):
+    checkpoint = NameCheckpoint(str(tmp_path / "names.jsonl"))
+    first = FakeInfo(fail={"MSFT"})
+    summary = _seed(session_factory, checkpoint, first, ["AAPL", "MSFT", "NONAME"])
+    assert summary == {"symbols": 3, "resumed": 0, "fetched": 2, "failed": 1, "missing": 1, "upserted": 1}
+    assert sorted(first.calls) == ["AAPL", "MSFT", "MSFT", "NONAME"]   # 실패한 종목만 재시도
+    # 받은 만큼은 저장, checkpoint 는 남음 (이름이 없던 종목도 기록되어 다시 부르지 않음)
+    assert _stored(session_factory) == {"AAPL": (1, "Apple Inc.")}
+    assert checkpoint.load() == {"AAPL": "Apple Inc.", "NONAME": None}
+
+    second = FakeInfo()
+    summary = _seed(session_factory, checkpoint, second, ["AAPL", "MSFT", "NONAME"])
+    assert second.calls == ["MSFT"]
+    assert summary["resumed"] == 2 and summary["fetched"] == 1 and summary["upserted"] == 2
+    # 기존 행은 id 를 유지한 채 회사명만 갱신
+    assert _stored(session_factory) == {"AAPL": (1, "Apple Inc."), "MSFT": (2, "Microsoft Corporation")}
+    assert checkpoint.load() == {}   # 모두 끝나면 삭제
+    with session_factory() as s:
+        assert s.get(AppMeta, TICKER_VERSION_KEY) is not None
+
+def test_only_new_skips_stored_tickers(session_factory, tmp_path):
+    fetch = FakeInfo()
+    summary = _seed(session_factory, NameCheckpoint(str(tmp_path / "names.jsonl")), fetch,
+                    ["AAPL", "MSFT"], only_new=True)
+    assert fetch.calls == ["MSFT"] and summary["symbols"] == 1
+    assert _stored(session_factory)["AAPL"] == (1, "Apple (old)")
+
+def test_checkpoint_ignores_truncated_line(tmp_path):
+    path = tmp_path / "names.jsonl"
+    checkpoint = NameCheckpoint(str(path))
+    checkpoint.add("005930", "삼성전자")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('["MSFT", "Micro')   # 쓰는 도중 중단
+    assert checkpoint.load() == {"005930": "삼성전자"}
+    checkpoint.clear()
+    checkpoint.clear()   # 없어도 오류 없음
+    assert checkpoint.load() == {}
@@ -0,0 +1,163 @@
+# tests/test_singleflight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from freezegun import freeze_time
+from sqlalchemy import create_engine, event, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import prediction, singleflight
+from app.crud.model_client import model_client
+from app.crud.prediction import run_prediction
+from app.crud.singleflight import SingleFlight
+from app.crud.tickers import TickerInfo
+from db.session import Base
+from db.models.ticker import Ticker
+from db.models.prediction import Prediction
+
+def test_singleflight_shares_one_call():
+    """같은 key 의 동시 호출은 fn 을 한 번만 실행하고 결과를 공유"""
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"result": 42}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: flight.do("k", slow), range(8)))
+
+    assert len(calls) == 1
+    assert all(r == {"result": 42} for r in results)
+    assert flight.in_flight() == 0
+
+def test_singleflight_propagates_error_to_waiters():
+    flight = SingleFlight()
+    barrier = threading.Barrier(4)
+
+    def boom():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    def call(_):
+        barrier.wait()
+        with pytest.raises(RuntimeError):
+            flight.do("k", boom)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(call, range(4)))
+
+@pytest.fixture
+def file_db(tmp_path):
+    # 스레드마다 별도 connection 이 필요하므로 파일 기반 sqlite 사용
+    engine = create_engine(f"sqlite:///{tmp_path / 'sf.db'}", connect_args={"timeout": 10})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as s:
+        s.add(Ticker(ticker_code="AAPL", market="US"))
+        s.commit()
+    return Session
+
+@freeze_time("2025-05-15")
+def test_run_prediction_coalesces_concurrent_misses(file_db, monkeypatch):
+    """캐시 미스 동시 요청 N개 → 모델 서버 호출 1회"""
+    monkeypatch.setenv("NGROK_API_URL", "http://model.local/")
+    calls = []
+
+    def fake_get(path, params):
+        calls.append(params)
+        time.sleep(0.3)
+        return {"prediction_result": 123.4}
+
+    barrier = threading.Barrier(6)
+
+    def call(_):
+        barrier.wait()
+        with file_db() as s:
+            return run_prediction("AAPL", 7, session=s)
+
+    with patch.object(model_client, "get_json", side_effect=fake_get):
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(call, range(6)))
+
+    assert len(calls) == 1
+    assert all(r == {"predicted_date": "2025-05-22", "result": 123.4} for r in results)
+    with file_db() as s:
+        assert s.execute(select(func.count()).select_from(Prediction)).scalar_one() == 1
+
+@pytest.fixture
+def fake_mysql(tmp_path):
+    """
+    MySQL 처럼 동작하는 sqlite 파일 DB
+    - WAL + 첫 조회부터 BEGIN → transaction 안의 조회는 첫 조회 시점 snapshot (REPEATABLE READ 와 같음)
+    - GET_LOCK / RELEASE_LOCK 을 프로세스 안의 lock 으로 흉내
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'mysql.db'}", connect_args={"timeout": 10})
+    locks = {}
+
+    def get_lock(name, timeout):
+        return int(locks.setdefault(name, threading.Lock()).acquire(timeout=timeout))
+
+    def release_lock(name):
+        locks[name].release()
+        return 1
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, _):
+        dbapi_conn.isolation_level = None   # BEGIN 은 아래 begin 이벤트에서 직접
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+        dbapi_conn.create_function("GET_LOCK", 2, get_lock)
+        dbapi_conn.create_function("RELEASE_LOCK", 1, release_lock)
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    engine.dialect.name = "mysql"   # db_advisory_lock 이 잠금 경로를 타도록
+    Session = sessionmaker(bind=engine)
+    with Session() as s:
+        s.add(Ticker(ticker_code="AAPL", market="US"))
+        s.commit()
+    yield Session
+    engine.dispose()
+
+def test_db_lock_waiter_sees_row_committed_by_lock_holder(fake_mysql):
+    """
+    다른 worker(별도 SingleFlight)가 GET_LOCK 을 잡고 모델 서버를 부르는 동안 캐시 미스를 읽은 요청은
+    잠금을 얻은 뒤 그 worker 가 저장한 행을 읽고 모델 서버를 다시 부르지 않음
+    """
+    ticker = TickerInfo(1, "AAPL", None, "US")
+    pred_date = prediction.date(2025, 5, 22)
+    calls = []
+    fetching, waiter_read = threading.Event(), threading.Event()
+
+    def fake_fetch(ticker, horizon):
+        calls.append(horizon)
+        fetching.set()
+        waiter_read.wait(5)
+        return 123.4
+
+    def leader():
+        with fake_mysql() as s:
+            return prediction._predict_and_store(s, ticker, 7, pred_date)
+
+    with patch.object(singleflight, "SINGLEFLIGHT_DB_LOCK", True), \
+         patch.object(prediction, "fetch_prediction", fake_fetch), \
+         ThreadPoolExecutor(max_workers=1) as pool:
+        first = pool.submit(leader)
+        assert fetching.wait(5)
+        with fake_mysql() as s:
+            # 요청 경로처럼 캐시 조회가 먼저 transaction 을 엶 (이 시점에는 행이 없음)
+            assert prediction._find_cached(s, 1, 7, pred_date) is None
+            waiter_read.set()
+            second = prediction._predict_and_store(s, ticker, 7, pred_date)
+        assert first.result() == second == {"predicted_date": "2025-05-22", "result": 123.4}
+
+    assert len(calls) == 1
+    with fake_mysql() as s:
+        assert s.execute(select(func.count()).select_from(Prediction)).scalar_one() == 1
@@ -0,0 +1,78 @@
+# tests/test_stock_basic.py
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException, Request, Response
+
+from app.routers import stock
+
+CHART = [{"date": "2025-05-15", "open": 1.0, "close": 1.0, "high": 1.0, "low": 1.0}]
+NEWS = [{"title": "t", "summary": "s", "link": "l", "pubDate": "2025-05-15T00:00:00", "provider": "p"}]
+
+@pytest.fixture(autouse=True)
+def _no_versions():
+    # ETag 버전 조회는 test_conditional_get 에서 검증
+    with patch.object(stock, "basic_version_async", AsyncMock(return_value=None)):
+        yield
+
+def _basic(**kwargs):
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    return asyncio.run(stock.get_stock_basic(request, Response(), **kwargs))
+
+def _slow(value, delay):
+    # upstream 호출처럼 스레드에서 막히는 async crud 함수
+    async def _fn(*args, **kwargs):
+        await asyncio.to_thread(time.sleep, delay)
+        return value
+    return _fn
+
+def test_basic_fetches_chart_and_news_concurrently():
+    """chart·news 가 동시에 실행되어 지연이 합이 아닌 최댓값이 되는지 검증"""
+    with patch.object(stock, "get_chart_data_async", _slow(CHART, 0.3)), \
+         patch.object(stock, "get_recent_news_async", _slow(NEWS, 0.3)):
+        start = time.perf_counter()
+        resp = _basic(ticker="AAPL", horizon=7)
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert resp.partial is False
+    assert len(resp.chartData) == 1 and len(resp.news) == 1
+
+def test_basic_returns_partial_when_news_is_slow():
+    """news 가 deadline 을 넘기면 chart 만 담아 partial 응답"""
+    with patch.object(stock, "get_chart_data_async", _slow(CHART, 0.0)), \
+         patch.object(stock, "get_recent_news_async", _slow(NEWS, 1.0)), \
+         patch.object(stock, "BASIC_DEADLINE_SEC", 0.2):
+        resp = _basic(ticker="AAPL", horizon=7)
+
+    assert resp.partial is True
+    assert len(resp.chartData) == 1
+    assert resp.news == []
+
+def _failing(exc):
+    async def _fn(*args, **kwargs):
+        raise exc
+    return _fn
+
+def test_basic_reraises_when_every_part_fails():
+    """둘 다 예외로 끝나면 504 가 아니라 원래 오류 (DB 오류는 500, HTTPException 은 그 상태 코드)"""
+    with patch.object(stock, "get_chart_data_async", _failing(RuntimeError("db down"))), \
+         patch.object(stock, "get_recent_news_async", _failing(RuntimeError("db down"))):
+        with pytest.raises(RuntimeError, match="db down"):
+            _basic(ticker="AAPL", horizon=7)
+
+    with patch.object(stock, "get_chart_data_async", _failing(HTTPException(status_code=404))), \
+         patch.object(stock, "get_recent_news_async", _failing(RuntimeError("db down"))):
+        with pytest.raises(HTTPException) as e:
+            _basic(ticker="NOPE", horizon=7)
+    assert e.value.status_code == 404
+
+def test_basic_times_out_with_504_only_when_the_deadline_expires():
+    with patch.object(stock, "get_chart_data_async", _slow(CHART, 1.0)), \
+         patch.object(stock, "get_recent_news_async", _failing(RuntimeError("db down"))), \
+         patch.object(stock, "BASIC_DEADLINE_SEC", 0.2):
+        with pytest.raises(HTTPException) as e:
+            _basic(ticker="AAPL", horizon=7)
+    assert e.value.status_code == 504
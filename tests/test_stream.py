@@ -0,0 +1,165 @@
+# tests/test_stream.py
+import asyncio
+import threading
+from collections import Counter, defaultdict
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.crud import chart
+from app.crud.aggregate import rebuild_aggregates
+from app.crud.bars import bars_to_records
+from app.crud.providers import FakeProvider
+from app.crud.stream import UpdateCursor, UpdateHub, updates_since
+from app.crud.tickers import TickerInfo
+from app.routers import stock
+from db.models.news import News
+from db.models.ticker import Ticker
+
+class FakeFeed:
+    """DB 대신 ticker 별 event 목록을 읽는 fetch. cursor 는 이미 보낸 개수"""
+
+    def __init__(self):
+        self.rows = defaultdict(list)
+        self.calls = Counter()
+
+    async def __call__(self, code, cursor):
+        self.calls[code] += 1
+        if code == "NOPE":
+            return [], None
+        rows = self.rows[code]
+        start = len(rows) if cursor is None else cursor
+        return rows[start:], len(rows)
+
+    def add(self, code, n):
+        self.rows[code].extend({"type": "chart", "ticker": code, "n": i} for i in range(len(self.rows[code]), len(self.rows[code]) + n))
+
+async def _drain(sub, n, timeout=2):
+    return [await asyncio.wait_for(sub.queue.get(), timeout) for _ in range(n)]
+
+def test_one_poll_fans_out_to_every_subscriber():
+    feed = FakeFeed()
+    feed.add("AAPL", 2)   # 구독 전 데이터는 보내지 않음
+
+    async def scenario():
+        hub = UpdateHub(feed, poll_interval=60, queue_size=10)
+        subs = [await hub.subscribe(["AAPL"]) for _ in range(200)]
+        both = await hub.subscribe(["AAPL", "MSFT"])
+        polls_before = feed.calls["AAPL"]
+
+        feed.add("AAPL", 3)
+        hub.notify("AAPL")
+        received = await asyncio.gather(*(_drain(s, 3) for s in [*subs, both]))
+        assert hub.stats()["subscribers"] == 201 and hub.stats()["tickers"] == 2
+        for s in [*subs, both]:
+            hub.unsubscribe(s)
+        return received, feed.calls["AAPL"] - polls_before, hub.stats()
+
+    received, polls, stats = asyncio.run(scenario())
+    assert all([e["n"] for e in events] == [2, 3, 4] for events in received)
+    # 구독자 수와 무관하게 새 데이터 1번에 poll 1회
+    assert polls == 1
+    # 새 ticker 마다 현재 위치 조회 1회만 (같은 ticker 의 다음 구독자는 재사용)
+    assert feed.calls["MSFT"] == 1
+    assert stats["tickers"] == 0 and stats["subscribers"] == 0
+
+def test_slow_subscriber_gets_resync_without_blocking_others():
+    feed = FakeFeed()
+
+    async def scenario():
+        hub = UpdateHub(feed, poll_interval=60, queue_size=3)
+        slow = await hub.subscribe(["AAPL"])
+        fast = await hub.subscribe(["AAPL"])
+        got = []
+        for _ in range(3):
+            feed.add("AAPL", 2)
+            hub.notify("AAPL")
+            got += await _drain(fast, 2)
+        # slow 는 한 번도 읽지 않음: 쌓인 event 대신 resync 1개
+        pending = [slow.queue.get_nowait() for _ in range(slow.queue.qsize())]
+        return got, pending, slow.resyncs, hub.stats()
+
+    got, pending, resyncs, stats = asyncio.run(scenario())
+    assert [e["n"] for e in got] == list(range(6))
+    assert pending[0] == {"type": "resync", "tickers": ["AAPL"]}
+    assert len(pending) <= 3 and resyncs >= 1
+    assert stats["resyncs"] == resyncs and stats["events"] == 6
+
+def test_sse_stream_sends_heartbeat_and_events():
+    feed = FakeFeed()
+
+    async def scenario():
+        hub = UpdateHub(feed, poll_interval=60, queue_size=10)
+        sub = await hub.subscribe(["AAPL"])
+        body = hub.stream(sub, heartbeat=0.05)
+        chunks = [await body.__anext__(), await body.__anext__()]
+        feed.add("AAPL", 1)
+        hub.notify("AAPL")
+        chunks.append(await body.__anext__())
+        await body.aclose()
+        return chunks, hub.stats()
+
+    chunks, stats = asyncio.run(scenario())
+    assert chunks[0].startswith("retry: ")
+    assert chunks[1] == ": ping\n\n"
+    assert chunks[2] == 'event: chart\ndata: {"type": "chart", "ticker": "AAPL", "n": 0}\n\n'
+    # 연결 종료 시 구독 해제, poller 종료
+    assert stats["subscribers"] == 0 and stats["tickers"] == 0
+
+def test_notify_from_ingest_thread_and_unknown_ticker():
+    feed = FakeFeed()
+
+    async def scenario():
+        hub = UpdateHub(feed, poll_interval=60, queue_size=10)
+        with pytest.raises(LookupError):
+            await hub.subscribe(["AAPL", "NOPE"])
+        assert hub.stats()["tickers"] == 0   # 실패한 구독은 남지 않음
+
+        sub = await hub.subscribe(["AAPL"])
+
+        def ingest():
+            feed.add("AAPL", 1)
+            hub.notify("AAPL")
+
+        threading.Thread(target=ingest).start()
+        return await _drain(sub, 1)
+
+    assert asyncio.run(scenario())[0]["n"] == 0
+    UpdateHub(feed).notify("AAPL")   # 구독자가 없으면 아무것도 하지 않음
+
+def test_updates_since_reads_new_bars_and_news_only(db):
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"))
+    db.commit()
+    ticker = TickerInfo(1, "AAPL", "Apple Inc.", "US")
+    daily = FakeProvider()._frame("AAPL", date(2025, 1, 1), date(2025, 3, 12), 1)
+    records = bars_to_records(daily, date.min)
+    chart.store_chart_rows(db, 1, 1, [r for r in records if r["date"] <= date(2025, 3, 7)])
+    rebuild_aggregates(db, 1)
+    db.add(News(ticker_id=1, title="old", link="l0", pub_date=datetime(2025, 3, 7), provider="p"))
+    db.commit()
+
+    events, cursor = updates_since(db, ticker, None)
+    assert events == [] and cursor == UpdateCursor(date(2025, 3, 7), 1)
+    assert updates_since(db, ticker, cursor) == ([], cursor)
+
+    new = [r for r in records if r["date"] > date(2025, 3, 7)]
+    chart.store_chart_rows(db, 1, 1, new)
+    rebuild_aggregates(db, 1, since=new[0]["date"])
+    db.add(News(ticker_id=1, title="new", link="l1", pub_date=datetime(2025, 3, 10), provider="p"))
+    db.commit()
+
+    events, cursor = updates_since(db, ticker, cursor)
+    bars = [(e["interval"], e["bar"]["date"]) for e in events if e["type"] == "chart"]
+    assert bars == [(1, "2025-03-10"), (1, "2025-03-11"), (7, "2025-03-10"), (30, "2025-03-01")]
+    assert [e["item"]["title"] for e in events if e["type"] == "news"] == ["new"]
+    assert cursor == UpdateCursor(date(2025, 3, 11), 2)
+
+def test_stream_endpoint_validates_tickers(monkeypatch):
+    monkeypatch.setattr(stock, "update_hub", UpdateHub(FakeFeed(), poll_interval=60))
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(stock.stream_updates(tickers=",".join(f"T{i}" for i in range(stock.STREAM_MAX_TICKERS + 1))))
+    assert e.value.status_code == 400
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(stock.stream_updates(tickers="NOPE"))
+    assert e.value.status_code == 404
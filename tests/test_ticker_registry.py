@@ -0,0 +1,75 @@
+# tests/test_ticker_registry.py
+import pytest
+from sqlalchemy import event
+
+from app.crud.tickers import TickerRegistry
+from db.models.app_meta import bump_ticker_version
+from db.models.ticker import Ticker
+
+@pytest.fixture
+def statements(db):
+    """db session 의 engine 에서 실행된 SQL 기록"""
+    seen = []
+    engine = db.get_bind()
+
+    def _record(conn, cursor, statement, *args):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", _record)
+
+def _ticker_queries(seen):
+    return [s for s in seen if "FROM ticker" in s]
+
+def test_registry_serves_lookups_without_querying_ticker_table(db, statements):
+    db.add_all([
+        Ticker(ticker_code="AAPL", company_name="Apple Inc.", market="US"),
+        Ticker(ticker_code="005930", company_name="삼성전자", market="KOSPI"),
+    ])
+    db.commit()
+    registry = TickerRegistry(ttl=60)
+
+    first = registry.get(db, "AAPL")
+    statements.clear()
+    for _ in range(100):
+        info = registry.get(db, "005930")
+
+    assert first.market == "US" and first.company_name == "Apple Inc."
+    assert info.market == "KOSPI"
+    assert statements == []   # 스냅샷 로드 이후 DB 접근 없음
+
+def test_registry_reloads_after_version_bump(db):
+    db.add(Ticker(ticker_code="AAPL", company_name="Apple", market="US"))
+    db.commit()
+    registry = TickerRegistry(ttl=0)   # 매번 version 확인
+    assert registry.get(db, "AAPL").company_name == "Apple"
+
+    db.query(Ticker).filter_by(ticker_code="AAPL").update({"company_name": "Apple Inc."})
+    db.commit()
+    bump_ticker_version(db)
+
+    assert registry.get(db, "AAPL").company_name == "Apple Inc."
+
+def test_registry_keeps_snapshot_while_version_unchanged(db, statements):
+    db.add(Ticker(ticker_code="AAPL", market="US"))
+    db.commit()
+    bump_ticker_version(db)
+    registry = TickerRegistry(ttl=0)
+    registry.get(db, "AAPL")
+
+    statements.clear()
+    registry.get(db, "AAPL")
+    # version 한 행만 확인하고 ticker 테이블은 다시 읽지 않음
+    assert _ticker_queries(statements) == []
+    assert any("app_meta" in s for s in statements)
+
+def test_registry_picks_up_ticker_added_before_bump(db):
+    registry = TickerRegistry(ttl=60)
+    assert registry.get(db, "NVDA") is None
+
+    db.add(Ticker(ticker_code="NVDA", market="US"))
+    db.commit()
+
+    assert registry.get(db, "NVDA").market == "US"
+    assert registry.get(db, "NOPE") is None